@@ -0,0 +1,148 @@
+"""
+Validate the batched numeric tests in BivariateAnalysis against scipy and
+time them against a per-column scipy loop on wide synthetic frames. With
+--backends, also time the column tests (and univariate normality) under each
+joblib backend; process backends share the numeric block through shared memory.
+
+Usage:
+    python benchmarks/bivariate_benchmark.py --rows 100000 --cols 10 50 200
+    python benchmarks/bivariate_benchmark.py --rows 1000000 --cols 200 --backends threading loky --skip-scipy
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import numpy as np
+import pandas as pd
+import yaml
+from scipy import stats
+
+from utils.logger import Logger
+from eda.bivariate import BivariateAnalysis, mann_whitney_u, welch_t_test, _group_moments
+from eda.univariate import UnivariateAnalysis
+
+
+def make_frame(rows, cols, seed=42):
+    """Mixed continuous, skewed, discrete and sparse-null columns with a binary target"""
+    rng = np.random.default_rng(seed)
+    target = (rng.random(rows) < 0.64).astype(int)
+    data = {}
+    for i in range(cols):
+        kind = i % 4
+        shift = 0.05 * target if i % 3 == 0 else 0.0
+        if kind == 0:
+            values = rng.normal(shift, 1.0, rows)
+        elif kind == 1:
+            values = rng.lognormal(shift, 1.0, rows)
+        elif kind == 2:
+            values = rng.poisson(3 + shift, rows).astype(float)  # heavy ties
+        else:
+            values = rng.normal(shift, 2.0, rows)
+            values[rng.random(rows) < 0.2] = np.nan
+        data[f'x{i}'] = values
+    data['target'] = target
+    return pd.DataFrame(data)
+
+
+def scipy_loop(df, cols, target_col):
+    """The per-column reference: mask the frame and call scipy for each column"""
+    labels = df[target_col].unique()
+    results = {}
+    for col in cols:
+        group1 = df[df[target_col] == labels[0]][col].dropna()
+        group2 = df[df[target_col] == labels[1]][col].dropna()
+        results[col] = (
+            stats.mannwhitneyu(group1, group2, alternative='two-sided').pvalue,
+            stats.ttest_ind(group1, group2, equal_var=False).pvalue,
+        )
+    return results
+
+
+def validate(df, cols, target_col):
+    """Largest absolute p-value difference from scipy for each test"""
+    reference = scipy_loop(df, cols, target_col)
+    labels = df[target_col].unique()
+    block = df[cols].to_numpy(dtype=np.float64)
+    first, second = block[df[target_col].to_numpy() == labels[0]], block[df[target_col].to_numpy() == labels[1]]
+    u_p = mann_whitney_u(np.vstack([first, second]), len(first))[1]
+    t_p = welch_t_test(*_group_moments(first), *_group_moments(second))[1]
+    return {
+        'mann_whitney_max_abs_diff': float(max(abs(u_p[i] - reference[col][0]) for i, col in enumerate(cols))),
+        'welch_max_abs_diff': float(max(abs(t_p[i] - reference[col][1]) for i, col in enumerate(cols))),
+    }
+
+
+def time_backends(df, names, config, backends):
+    """Seconds per backend for the numeric tests and normality checks; results must agree across backends"""
+    timings, reference = {}, None
+    for backend in backends:
+        run_config = {**config, 'performance': {**config['performance'], 'backend': backend}}
+
+        start = time.perf_counter()
+        tests = BivariateAnalysis(run_config)._numeric_tests(df, names + ['target'], 'target')
+        timings[f'{backend}_tests_s'] = round(time.perf_counter() - start, 4)
+
+        start = time.perf_counter()
+        normality = UnivariateAnalysis(run_config).run_analysis(df[names])['normality_tests']
+        timings[f'{backend}_normality_s'] = round(time.perf_counter() - start, 4)
+
+        if reference is None:
+            reference = (tests, normality)
+        elif (tests, normality) != reference:
+            raise AssertionError(f"Backend '{backend}' results differ from '{backends[0]}'")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--cols', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--config', default='config/eda_config.yaml')
+    parser.add_argument('--backends', nargs='*', default=[], help='joblib backends to compare, e.g. threading loky')
+    parser.add_argument('--n-jobs', type=int, default=None, help='Override performance.n_jobs')
+    parser.add_argument('--skip-scipy', action='store_true', help='Skip the per-column scipy reference loop')
+    parser.add_argument('--output', default=None, help='Optional JSON file for the results')
+    args = parser.parse_args()
+
+    Logger().configure({'level': 'WARNING'})
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+    if args.n_jobs is not None:
+        config['performance']['n_jobs'] = args.n_jobs
+
+    results = {}
+    for cols in args.cols:
+        df = make_frame(args.rows, cols)
+        names = [c for c in df.columns if c != 'target']
+
+        results[cols] = time_backends(df, names, config, args.backends)
+        if args.skip_scipy:
+            continue
+
+        start = time.perf_counter()
+        scipy_loop(df, names, 'target')
+        loop_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        BivariateAnalysis(config)._numeric_tests(df, names + ['target'], 'target')
+        batch_seconds = time.perf_counter() - start
+
+        results[cols].update({
+            'scipy_loop_s': round(loop_seconds, 4),
+            'batched_s': round(batch_seconds, 4),
+            'speedup': round(loop_seconds / batch_seconds, 2),
+            **validate(df, names, 'target'),
+        })
+
+    print(pd.DataFrame(results).T.rename_axis(f'cols ({args.rows} rows)').to_string())
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'rows': args.rows, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Compare the NumPy and pyarrow dtype backends on the same raw extract.
+
+Usage:
+    python benchmarks/dtype_backend_benchmark.py --data data/raw/customer_churn.csv
+"""
+import argparse
+import json
+import time
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import pandas as pd
+import yaml
+
+from utils.logger import Logger
+from utils.file_utils import IOHandler
+from utils.dtypes import convert_dtype_backend, memory_usage_mb
+from eda.data_quality import DataQuality
+from preprocessing.missing_handler import MissingHandler
+from preprocessing.duplicate_handler import DuplicateHandler
+from preprocessing.feature_engineering import FeatureEngineer
+from preprocessing.encoding import FeatureEncoder
+
+STRING_COLUMNS = ['Description', 'Country', 'StockCode', 'Customer ID']
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, round(time.perf_counter() - start, 4)
+
+
+def benchmark_backend(data_path, backend, eda_config, prep_config):
+    """Time the string-heavy operations and the pipeline stages on one backend"""
+    io_handler = IOHandler()
+    timings = {}
+
+    df, timings['read_csv'] = _timed(io_handler.read_csv, data_path, dtype_backend=backend)
+    df = convert_dtype_backend(df, backend)
+    timings['memory_mb'] = memory_usage_mb(df)
+
+    present = [col for col in STRING_COLUMNS if col in df.columns]
+    _, timings['groupby'] = _timed(lambda: [df.groupby(col).size() for col in present])
+    _, timings['value_counts'] = _timed(lambda: [df[col].value_counts() for col in present])
+    _, timings['duplicated'] = _timed(lambda: df.duplicated().sum())
+    date_cols = [col for col in df.columns if 'date' in col.lower()]
+    _, timings['to_datetime'] = _timed(
+        lambda: [pd.to_datetime(df[col], errors='coerce') for col in date_cols]
+    )
+
+    _, timings['DataQuality'] = _timed(DataQuality(eda_config).run_quality_checks, df)
+    df, timings['MissingHandler'] = _timed(MissingHandler(prep_config).handle_missing, df)
+    df, timings['DuplicateHandler'] = _timed(DuplicateHandler(prep_config).handle_duplicates, df)
+    df, timings['FeatureEngineer'] = _timed(FeatureEngineer(prep_config).engineer_features, df.copy())
+    df, timings['FeatureEncoder'] = _timed(FeatureEncoder(prep_config).encode_features, df)
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default=None, help='CSV extract (defaults to data.file_path in the EDA config)')
+    parser.add_argument('--eda-config', default='config/eda_config.yaml')
+    parser.add_argument('--preprocessing-config', default='config/preprocessing_config.yaml')
+    parser.add_argument('--output', default=None, help='Optional JSON file for the results')
+    args = parser.parse_args()
+
+    logger = Logger().get_logger(__name__)
+    with open(args.eda_config) as f:
+        eda_config = yaml.safe_load(f)
+    with open(args.preprocessing_config) as f:
+        prep_config = yaml.safe_load(f)
+
+    data_path = args.data or eda_config['data']['file_path']
+    IOHandler.validate_file(data_path)
+
+    results = {}
+    for backend in ('numpy', 'pyarrow'):
+        logger.info(f"Benchmarking dtype backend: {backend}")
+        results[backend] = benchmark_backend(data_path, backend, eda_config, prep_config)
+
+    summary = pd.DataFrame(results)
+    summary['ratio'] = (summary['numpy'] / summary['pyarrow']).round(2)
+    print(summary.to_string())
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'data': str(data_path), 'results': results}, f, indent=2)
+        logger.info(f"Benchmark results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Guard start-up time: measure package import cost with `python -X importtime`.
+
+Each module is imported in a fresh interpreter (--repeat times, best kept)
+and its cumulative import time is compared against the budget file. The
+run also fails when a module pulls in a dependency that must stay deferred
+to first use (scipy, sklearn, joblib, ...).
+
+Usage:
+    python benchmarks/import_time_benchmark.py
+    python benchmarks/import_time_benchmark.py --update-budget
+    python benchmarks/import_time_benchmark.py --modules eda preprocessing --tolerance 0.5
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+SRC = ROOT / 'src'
+
+DEFAULT_MODULES = [
+    'utils',
+    'eda',
+    'preprocessing',
+    'utils.logger',
+    'utils.timer',
+    'eda.eda_pipeline',
+    'preprocessing.preprocessing_pipeline',
+    'training',
+    'training.training_pipeline',
+    'scoring',
+    'scoring.batch_scorer',
+]
+
+# Heavy dependencies that importing a module must not load
+DEFERRED = {
+    'utils': ['pandas', 'numpy', 'scipy', 'sklearn', 'joblib'],
+    'eda': ['pandas', 'numpy', 'scipy', 'sklearn', 'joblib'],
+    'preprocessing': ['pandas', 'numpy', 'scipy', 'sklearn', 'joblib'],
+    'training': ['pandas', 'numpy', 'scipy', 'sklearn', 'joblib'],
+    'utils.logger': ['pandas', 'numpy'],
+    'utils.timer': ['pandas', 'numpy'],
+    'eda.eda_pipeline': ['scipy', 'sklearn', 'joblib'],
+    'preprocessing.preprocessing_pipeline': ['scipy', 'sklearn', 'joblib'],
+    'training.training_pipeline': ['scipy', 'sklearn', 'joblib', 'lightgbm', 'xgboost'],
+    'scoring': ['pandas', 'numpy', 'scipy', 'sklearn', 'joblib'],
+    'scoring.batch_scorer': ['scipy', 'sklearn', 'joblib', 'lightgbm', 'xgboost'],
+}
+
+
+def import_profile(module):
+    """Cumulative import time of `module` in ms, and the top-level packages it loaded"""
+    probe = f"import sys, {module}; print(','.join(sorted({{name.split('.')[0] for name in sys.modules}})))"
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', probe], cwd=SRC, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip()}")
+
+    # stderr lines: "import time: self [us] | cumulative | imported package"
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if name.strip() == module:
+            cumulative_us = int(cumulative)
+    return cumulative_us / 1000, set(result.stdout.strip().split(','))
+
+
+def measure(modules, repeat):
+    """{module: {'ms': best cumulative import time, 'loaded': packages}}"""
+    results = {}
+    for module in modules:
+        timings, loaded = [], set()
+        for _ in range(repeat):
+            ms, loaded = import_profile(module)
+            timings.append(ms)
+        results[module] = {'ms': round(min(timings), 1), 'loaded': loaded}
+    return results
+
+
+def check(results, budget, tolerance, floor_ms):
+    """List of human-readable failures: budget overruns and eagerly loaded dependencies"""
+    failures = []
+    for module, current in results.items():
+        eager = sorted(set(DEFERRED.get(module, [])) & current['loaded'])
+        if eager:
+            failures.append(f"{module}: imports {', '.join(eager)} at start-up")
+
+        allowed = budget.get(module)
+        if allowed is None:
+            continue
+        limit = max(allowed * (1 + tolerance), allowed + floor_ms)
+        if current['ms'] > limit:
+            failures.append(f"{module}: {current['ms']} ms > budget {allowed} ms (limit {round(limit, 1)} ms)")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modules', nargs='+', default=DEFAULT_MODULES)
+    parser.add_argument('--budget', default='benchmarks/import_budget.json', help='Budget JSON {module: ms}')
+    parser.add_argument('--update-budget', action='store_true', help='Overwrite the budget with this run')
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters per module (best is kept)')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='Allowed relative slowdown')
+    parser.add_argument('--floor-ms', type=float, default=20.0, help='Allowed absolute slowdown for tiny budgets')
+    args = parser.parse_args()
+
+    results = measure(args.modules, args.repeat)
+    for module, current in results.items():
+        print(f"{module:<40} {current['ms']:>9.1f} ms")
+
+    budget_path = ROOT / args.budget
+    if args.update_budget:
+        with open(budget_path, 'w') as f:
+            json.dump({module: current['ms'] for module, current in results.items()}, f, indent=2)
+        print(f"\nBudget saved to {budget_path}")
+        return 0
+
+    budget = {}
+    if budget_path.exists():
+        with open(budget_path) as f:
+            budget = json.load(f)
+    else:
+        print(f"\nNo budget at {budget_path}; run with --update-budget to create one")
+
+    failures = check(results, budget, args.tolerance, args.floor_ms)
+    if not failures:
+        print(f"\nStart-up within budget (tolerance {args.tolerance:.0%})")
+        return 0
+
+    print("\nSTART-UP REGRESSIONS:")
+    for failure in failures:
+        print(f"  {failure}")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+Time and memory-profile every pipeline stage on synthetic extracts.
+
+Each stage class runs on its own (inputs are prepared by the preceding
+stages once per size), followed by EDAPipeline and PreprocessingPipeline
+end to end. Results are written as JSON and compared against a saved
+baseline; a stage is flagged when its time or peak memory grows by more
+than --threshold.
+
+Usage:
+    python benchmarks/stage_benchmarks.py --sizes 100k 1m
+    python benchmarks/stage_benchmarks.py --sizes 100k --save-baseline
+    python benchmarks/stage_benchmarks.py --sizes 100k --baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from utils.logger import Logger
+from utils.dtypes import resolve_dtype_backend
+from utils.dataset import load_dataset
+from utils.tracing import Tracer
+from utils.metrics import MetricsRegistry
+from utils.synthetic_data import SyntheticChurnGenerator, parse_size
+
+ROOT = Path(__file__).parent.parent
+
+
+def _measure(func, repeat, memory):
+    """Best-of-`repeat` wall time, then one tracemalloc pass for the peak"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        tracemalloc.start()
+        func()
+        peak_mb = round(tracemalloc.get_traced_memory()[1] / 1024 ** 2, 2)
+        tracemalloc.stop()
+
+    return result, {'seconds': round(min(timings), 4), 'peak_mb': peak_mb}
+
+
+def _rows(obj):
+    if isinstance(obj, tuple):
+        return sum(_rows(item) for item in obj)
+    return len(obj) if hasattr(obj, 'shape') else None
+
+
+class StageBenchmark:
+    """Run the per-stage and end-to-end benchmarks for one extract"""
+
+    def __init__(self, data_path, workdir, repeat=1, memory=True):
+        self.logger = Logger().get_logger(__name__)
+        self.data_path = Path(data_path)
+        self.workdir = Path(workdir)
+        self.repeat = repeat
+        self.memory = memory
+        self.eda_config_path, self.eda_config = self._write_config('eda_config.yaml', {
+            'output': {'results_dir': str(self.workdir / 'results')}
+        })
+        self.prep_config_path, self.prep_config = self._write_config('preprocessing_config.yaml', {
+            'output': {'processed_dir': str(self.workdir / 'processed')}
+        })
+        self.results = {}
+
+    def _write_config(self, name, overrides):
+        """Copy a repo config pointing at the extract, with outputs under the work dir"""
+        with open(ROOT / 'config' / name) as f:
+            config = yaml.safe_load(f)
+        config['data']['file_path'] = str(self.data_path)
+        for section, values in overrides.items():
+            config[section].update(values)
+        # Benchmarks measure the stages, not the instrumentation exports
+        config['tracing']['enabled'] = False
+        config['metrics']['enabled'] = False
+
+        path = self.workdir / name
+        with open(path, 'w') as f:
+            yaml.safe_dump(config, f)
+        return path, config
+
+    def run_stage(self, name, func, rows_in=None):
+        """Benchmark one callable; failures are recorded rather than aborting the suite"""
+        self.logger.warning(f"Benchmarking {name}")
+        try:
+            result, stats = _measure(func, self.repeat, self.memory)
+        except Exception as e:
+            self.logger.error(f"{name} failed: {e}")
+            self.results[name] = {'error': f"{type(e).__name__}: {e}"}
+            return None
+
+        stats['rows_in'] = rows_in
+        stats['rows_out'] = _rows(result)
+        if rows_in and stats['seconds']:
+            stats['rows_per_sec'] = round(rows_in / stats['seconds'], 1)
+        self.results[name] = stats
+        return result
+
+    def run(self):
+        from eda.data_loader import DataLoader
+        from eda.data_quality import DataQuality
+        from eda.univariate import UnivariateAnalysis
+        from eda.bivariate import BivariateAnalysis
+        from eda.report_generator import ReportGenerator
+        from eda.eda_pipeline import EDAPipeline
+        from preprocessing.preprocessing_pipeline import PreprocessingPipeline
+
+        eda, prep = self.eda_config, self.prep_config
+        target = eda.get('target_column')
+
+        # EDA stages
+        df = self.run_stage('eda.DataLoader', DataLoader(self.eda_config_path).load_data)
+        rows = len(df)
+        quality = self.run_stage('eda.DataQuality', lambda: DataQuality(eda).run_quality_checks(df), rows)
+        univariate = self.run_stage('eda.UnivariateAnalysis', lambda: UnivariateAnalysis(eda).run_analysis(df), rows)
+        bivariate = self.run_stage(
+            'eda.BivariateAnalysis', lambda: BivariateAnalysis(eda).run_analysis(df, target), rows
+        )
+        if quality is not None and univariate is not None and bivariate is not None:
+            self.run_stage(
+                'eda.ReportGenerator',
+                lambda: ReportGenerator(eda).generate(quality, univariate, bivariate).wait()
+            )
+        self.run_stage('eda.EDAPipeline', EDAPipeline(self.eda_config_path).execute, rows)
+
+        # Preprocessing stages, each fed the output of the previous one
+        pipeline = PreprocessingPipeline(prep)
+        # Typed and date-parsed exactly as the pipelines load it
+        raw = load_dataset({'file_path': self.data_path}, resolve_dtype_backend(prep))
+        self._run_preprocessing_stages(pipeline, raw)
+
+        end_to_end = PreprocessingPipeline(prep)
+        self.run_stage('preprocessing.PreprocessingPipeline', lambda: end_to_end.fit_transform(raw.copy()), len(raw))
+        return self.results
+
+    def _run_preprocessing_stages(self, pipeline, raw):
+        cleaning = [
+            ('MissingHandler', pipeline.missing_handler.handle_missing),
+            ('BusinessLogicHandler', pipeline.business_logic.handle_business_logic),
+            ('DuplicateHandler', pipeline.duplicate_handler.handle_duplicates),
+        ]
+        df = raw
+        for name, func in cleaning:
+            source = df
+            df = self.run_stage(f'preprocessing.{name}', lambda: func(source.copy()), len(source))
+            if df is None:
+                return
+
+        # Measured on its own; the default config keeps line-level rows for the stages below
+        self.run_stage('preprocessing.CustomerRollup', lambda: pipeline.rollup.rollup(df.copy(), fit=True), len(df))
+        
+        splits = self.run_stage('preprocessing.DataSplitter', lambda: pipeline.splitter.split_data(df), len(df))
+        if splits is None:
+            return
+        train = splits[0]
+
+        column_stages = [
+            ('OutlierHandler', pipeline.outlier_handler.handle_outliers),
+            ('DatetimeFeatureExtractor', pipeline.datetime_extractor.extract_features),
+            ('FeatureEngineer', pipeline.feature_engineer.engineer_features),
+            ('FeatureEncoder', pipeline.encoder.encode_features),
+            ('FeatureTransformer', pipeline.transformer.transform_features),
+        ]
+        self.run_stage(
+            'preprocessing.WindowFeatureEngineer',
+            lambda: pipeline.window_features.engineer_features(train.copy(), fit=True), len(train)
+        )
+        
+        scheduled_input = train
+        for name, func in column_stages:
+            source = train
+            train = self.run_stage(f'preprocessing.{name}', lambda: func(source.copy(), fit=True), len(source))
+            if train is None:
+                return
+
+        if pipeline.scheduler is not None:
+            self.run_stage(
+                'preprocessing.StageScheduler',
+                lambda: pipeline._transform_split(scheduled_input.copy(), fit=True, name='train'),
+                len(scheduled_input)
+            )
+
+
+def compare(results, baseline, threshold):
+    """List (size, stage, metric, baseline, current, change) rows that regressed beyond `threshold`"""
+    regressions = []
+    for size, stages in results.items():
+        for stage, current in stages.items():
+            previous = baseline.get(size, {}).get(stage)
+            if not previous or 'error' in current or 'error' in previous:
+                continue
+            for metric in ('seconds', 'peak_mb'):
+                old, new = previous.get(metric), current.get(metric)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old
+                if change > threshold:
+                    regressions.append((size, stage, metric, old, new, round(change * 100, 1)))
+    return regressions
+
+
+def _environment():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'commit': commit or None,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', default=['100k'], help='Extract sizes: 100k, 1m, 10m or row counts')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--data-dir', default='data/synthetic', help='Cache for generated extracts')
+    parser.add_argument('--output', default='results/benchmarks', help='Directory for result JSON files')
+    parser.add_argument('--baseline', default='benchmarks/baseline.json', help='Baseline JSON to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='Overwrite the baseline with this run')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed relative slowdown/memory growth')
+    parser.add_argument('--repeat', type=int, default=1, help='Timed repetitions per stage (best is kept)')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc pass')
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args()
+
+    Logger().configure({'level': args.log_level})
+    Tracer().configure({'enabled': False})
+    MetricsRegistry().configure({'enabled': False})
+    logger = Logger().get_logger(__name__)
+
+    generator = SyntheticChurnGenerator(seed=args.seed)
+    results = {}
+    for size in args.sizes:
+        n_rows = parse_size(size)
+        data_path = Path(args.data_dir) / f'churn_{size}_seed{args.seed}.csv'
+        if not data_path.exists():
+            generator.write_csv(data_path, n_rows)
+
+        with tempfile.TemporaryDirectory(prefix='churn_bench_') as workdir:
+            benchmark = StageBenchmark(data_path, workdir, repeat=args.repeat, memory=not args.no_memory)
+            results[size] = benchmark.run()
+
+        table = pd.DataFrame(results[size]).T
+        print(f"\n=== {size} rows ({n_rows}) ===")
+        print(table.to_string())
+
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    payload = {'environment': _environment(), 'seed': args.seed, 'results': results}
+    output_path = output_dir / f"stage_benchmarks_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_path, 'w') as f:
+        json.dump(payload, f, indent=2)
+    logger.warning(f"Benchmark results saved to {output_path}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        with open(baseline_path, 'w') as f:
+            json.dump(payload, f, indent=2)
+        logger.warning(f"Baseline saved to {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        logger.warning(f"No baseline at {baseline_path}; run with --save-baseline to create one")
+        return 0
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline['results'], args.threshold)
+    if not regressions:
+        print(f"\nNo regressions against {baseline_path} (threshold {args.threshold:.0%})")
+        return 0
+
+    print(f"\nREGRESSIONS against {baseline_path} (threshold {args.threshold:.0%}):")
+    print(pd.DataFrame(
+        regressions, columns=['size', 'stage', 'metric', 'baseline', 'current', 'change_pct']
+    ).to_string(index=False))
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
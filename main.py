@@ -1,5 +1,148 @@
-def main():
-    print("Hello from customer-churn-prediction!")
+"""
+Customer churn pipeline runner.
+
+    python main.py eda [--config config/eda_config.yaml]
+    python main.py preprocess [--config config/preprocessing_config.yaml]
+    python main.py train [--config config/training_config.yaml]
+    python main.py tune [--config config/training_config.yaml]
+    python main.py score [--config config/scoring_config.yaml]
+    python main.py all [--eda-config ...] [--preprocessing-config ...] [--training-config ...]
+
+`all` loads and types the raw extract once and hands the same in-memory
+frame to every phase; a phase whose config points at a different file or
+dtype backend loads its own copy. Chunked EDA modes (sampling, streaming,
+incremental) read the file themselves unless another phase loads it anyway.
+Training and tuning read the processed splits, not the raw extract; tuning
+only runs on request, never as part of `all`. Scoring streams its input file
+in chunks through the saved pipeline and model, also only on request.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# The one place the source tree is put on the import path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+import yaml
+
+from utils.logger import Logger
+from utils.timer import Timer
+from utils.dtypes import resolve_dtype_backend
+from utils.dataset import enable_copy_on_write, load_dataset
+
+PHASES = ('eda', 'preprocess', 'train')
+
+
+class PipelineRunner:
+    """Run pipeline phases in order over one shared raw dataset"""
+
+    def __init__(self, config_paths):
+        self.logger = Logger().get_logger(__name__)
+        self.config_paths = config_paths
+        self._datasets = {}
+        enable_copy_on_write()
+
+    @staticmethod
+    def _dataset_key(config):
+        data = config['data']
+        if 'file_path' not in data:
+            return None  # Phase does not read the raw extract
+        return (str(Path(data['file_path']).resolve()), data.get('encoding', 'utf-8'),
+                resolve_dtype_backend(config), data.get('max_rows'))
+
+    @staticmethod
+    def _needs_frame(phase, config):
+        """False for training/tuning/scoring and for EDA modes that read the file in chunks"""
+        if phase in ('train', 'tune', 'score'):
+            return False
+        if phase != 'eda':
+            return True
+        return not (config.get('sampling', {}).get('enabled') or config['performance'].get('streaming')
+                    or config.get('incremental', {}).get('enabled'))
+
+    def dataset(self, config):
+        """Raw frame for a phase config, loaded once per (file, encoding, backend, max_rows)"""
+        key = self._dataset_key(config)
+        if key not in self._datasets:
+            self._datasets[key] = load_dataset(config['data'], key[2])
+        else:
+            self.logger.info(f"Reusing the loaded dataset {key[0]}")
+        return self._datasets[key]
+
+    def run(self, phases):
+        configs = {}
+        for phase in phases:
+            with open(self.config_paths[phase]) as f:
+                configs[phase] = yaml.safe_load(f)
+        shared = {self._dataset_key(configs[phase]) for phase in phases if self._needs_frame(phase, configs[phase])}
+
+        results = {}
+        with Timer("Pipeline Runner"):
+            for phase in phases:
+                df = self.dataset(configs[phase]) if self._dataset_key(configs[phase]) in shared else None
+                with Timer(f"Phase: {phase}"):
+                    results[phase] = getattr(self, f'_run_{phase}')(self.config_paths[phase], df)
+        self._datasets.clear()
+        return results
+
+    def _run_eda(self, config_path, df):
+        from eda.eda_pipeline import EDAPipeline
+        return EDAPipeline(config_path).execute(df)
+
+    def _run_preprocess(self, config_path, df):
+        from preprocessing.preprocessing_pipeline import main as preprocess
+        return preprocess(config_path, df)
+
+    def _run_train(self, config_path, df):
+        from training.training_pipeline import main as train
+        return train(config_path)
+
+    def _run_tune(self, config_path, df):
+        from training.tuning import main as tune
+        return tune(config_path)
+
+    def _run_score(self, config_path, df):
+        from scoring.batch_scorer import main as score
+        return score(config_path)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    eda = commands.add_parser('eda', help='Exploratory data analysis')
+    eda.add_argument('--config', default='config/eda_config.yaml')
+
+    preprocess = commands.add_parser('preprocess', help='Clean, split and transform the extract')
+    preprocess.add_argument('--config', default='config/preprocessing_config.yaml')
+
+    train = commands.add_parser('train', help='Train and evaluate the configured models on the processed splits')
+    train.add_argument('--config', default='config/training_config.yaml')
+
+    tune = commands.add_parser('tune', help='Successive-halving / Hyperband search for LightGBM and XGBoost')
+    tune.add_argument('--config', default='config/training_config.yaml')
+
+    score = commands.add_parser('score', help='Chunked multi-process scoring of raw rows with the saved pipeline and model')
+    score.add_argument('--config', default='config/scoring_config.yaml')
+
+    combined = commands.add_parser('all', help='Every phase over one loaded dataset')
+    combined.add_argument('--eda-config', default='config/eda_config.yaml')
+    combined.add_argument('--preprocessing-config', default='config/preprocessing_config.yaml')
+    combined.add_argument('--training-config', default='config/training_config.yaml')
+    combined.add_argument('--skip', nargs='*', choices=PHASES, default=[], help='Phases to leave out')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'all':
+        config_paths = {'eda': args.eda_config, 'preprocess': args.preprocessing_config,
+                        'train': args.training_config}
+        phases = [phase for phase in PHASES if phase not in args.skip]
+    else:
+        config_paths = {args.command: args.config}
+        phases = [args.command]
+    return PipelineRunner(config_paths).run(phases)
 
 
 if __name__ == "__main__":
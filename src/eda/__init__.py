@@ -1,16 +1,26 @@
-from .data_loader import DataLoader
-from .data_quality import DataQuality
-from .univariate import UnivariateAnalysis
-from .bivariate import BivariateAnalysis
-from .report_generator import ReportGenerator
-from .eda_pipeline import EDAPipeline
+from importlib import import_module
 
+# Public names are imported from their submodule on first access (PEP 562),
+# so `import eda` does not pull in pandas, scipy or joblib up front
+_EXPORTS = {
+    'DataLoader': '.data_loader',
+    'DataQuality': '.data_quality',
+    'UnivariateAnalysis': '.univariate',
+    'BivariateAnalysis': '.bivariate',
+    'ReportGenerator': '.report_generator',
+    'EDAPipeline': '.eda_pipeline'
+}
 
-__all__ = [
-    'DataLoader',
-    'DataQuality',
-    'UnivariateAnalysis',
-    'BivariateAnalysis',
-    'ReportGenerator',
-    'EDAPipeline'
-]
\ No newline at end of file
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,17 +1,233 @@
 import pandas as pd
 import numpy as np
-from scipy import stats
-from scipy.stats import mannwhitneyu, chi2_contingency
-from joblib import Parallel, delayed
-import sys
-from pathlib import Path
 from utils.logger import Logger
 from utils.timer import Timer
+from utils.shared_arrays import attach_arrays, map_column_slabs, uses_processes
+from utils.concurrency import ConcurrencyGovernor
+from eda.univariate import _numeric_block, _shapiro
+
+
+def _group_moments(block):
+    """Per-column count, mean and sample variance of a (rows, columns) block"""
+    count = (~np.isnan(block)).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nanmean(block, axis=0) if len(block) else np.full(block.shape[1], np.nan)
+        var = np.nanvar(block, axis=0, ddof=1) if len(block) else np.full(block.shape[1], np.nan)
+    return count, mean, var
+
+
+def _sorted_runs(columns):
+    """
+    Sort each row of a C-contiguous (columns, rows) array once and assign
+    average ranks to runs of ties. Returns the sort order, the rank at each
+    sorted position (NaN for missing values) and the per-column tie term
+    sum(t^3 - t).
+    """
+    k, n = columns.shape
+    order = np.argsort(columns, axis=1)  # NaNs sort last
+    ordered = np.take_along_axis(columns, order, axis=1)
+    valid = ~np.isnan(ordered)
+    
+    starts_run = np.ones((k, n), dtype=bool)
+    starts_run[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    
+    flat_starts = starts_run.ravel()
+    run_id = np.cumsum(flat_starts) - 1
+    run_start = np.flatnonzero(flat_starts)
+    run_len = np.diff(np.r_[run_start, n * k])
+    run_rank = run_start % n + (run_len + 1) / 2
+    
+    ranked = run_rank[run_id].reshape(k, n)
+    ranked[~valid] = np.nan
+    
+    run_valid = valid.ravel()[run_start]
+    tie_term = np.bincount(
+        run_start[run_valid] // n, weights=(run_len ** 3 - run_len)[run_valid].astype(np.float64), minlength=k
+    )
+    return order, ranked, tie_term
+
+
+def rank_columns(block):
+    """Average ranks of every column of a (rows, columns) block (NaN stays NaN), plus tie terms"""
+    order, ranked, tie_term = _sorted_runs(np.ascontiguousarray(block.T))
+    ranks = np.empty_like(ranked)
+    np.put_along_axis(ranks, order, ranked, axis=1)
+    return ranks.T, tie_term
+
+
+def mann_whitney_u(block, n_first):
+    """
+    Two-sided Mann-Whitney U for every column: rows [:n_first] are the first
+    group. Normal approximation with tie and continuity correction, matching
+    scipy.stats.mannwhitneyu(method='asymptotic'). Returns (U1, p_values).
+    """
+    from scipy import stats
+    
+    order, ranked, tie_term = _sorted_runs(np.ascontiguousarray(block.T))
+    n1 = (~np.isnan(block[:n_first])).sum(axis=0)
+    n2 = (~np.isnan(block[n_first:])).sum(axis=0)
+    n = n1 + n2
+    
+    # Only the first group's rank sum is needed, so ranks never leave sorted order
+    r1 = np.nansum(np.where(order < n_first, ranked, np.nan), axis=1)
+    u1 = r1 - n1 * (n1 + 1) / 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sigma = np.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+        z = (np.abs(u1 - n1 * n2 / 2) - 0.5) / sigma
+    return u1, np.clip(2 * stats.norm.sf(z), 0, 1)
+
+
+def welch_t_test(n1, mean1, var1, n2, mean2, var2):
+    """Welch's unequal-variance t-test from group moments; returns (t, p_values)"""
+    from scipy import stats
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        se1, se2 = var1 / n1, var2 / n2
+        t = (mean1 - mean2) / np.sqrt(se1 + se2)
+        dof = (se1 + se2) ** 2 / (se1 ** 2 / (n1 - 1) + se2 ** 2 / (n2 - 1))
+        return t, 2 * stats.t.sf(np.abs(t), dof)
+
+
+def _exact_mann_whitney(first, second):
+    from scipy.stats import mannwhitneyu
+    return mannwhitneyu(first[~np.isnan(first)], second[~np.isnan(second)], alternative='two-sided')[1]
+
+
+CARDINALITY_MODES = ('skip', 'top_k', 'hash')
+
+
+def _level_codes(series):
+    """Integer codes per level (-1 for missing) and the number of observed levels"""
+    codes, uniques = pd.factorize(series)
+    return codes, len(uniques)
+
+
+def _reduce_levels(series, codes, max_levels, mode):
+    """
+    Cap a high-cardinality column at `max_levels` codes: the most frequent
+    levels plus an 'other' bucket (top_k), or hash buckets (hash), which
+    gives an approximate test of association.
+    """
+    if mode == 'top_k':
+        counts = np.bincount(codes[codes >= 0])
+        keep = np.argsort(counts, kind='stable')[::-1][:max_levels - 1]
+        remap = np.full(len(counts), max_levels - 1)
+        remap[keep] = np.arange(len(keep))
+        return np.where(codes >= 0, remap[np.maximum(codes, 0)], -1)
+    
+    hashed = (pd.util.hash_pandas_object(series, index=False).to_numpy() % np.uint64(max_levels)).astype(np.int64)
+    return np.where(codes >= 0, hashed, -1)
+
+
+def contingency_tables(codes, levels, target_codes, n_targets):
+    """
+    Level x target count tables for many columns from a single bincount:
+    each column's cells are offset into one shared code space. Rows with a
+    missing value in the column or target are left out, as in pd.crosstab.
+    Returns a zero-padded (columns, max_levels, n_targets) array.
+    """
+    if not codes:
+        return np.zeros((0, 0, n_targets))
+    offsets = np.r_[0, np.cumsum(np.asarray(levels) * n_targets)]
+    cells = []
+    for offset, col_codes in zip(offsets, codes):
+        valid = (col_codes >= 0) & (target_codes >= 0)
+        cells.append(offset + col_codes[valid] * n_targets + target_codes[valid])
+    counts = np.bincount(np.concatenate(cells), minlength=offsets[-1]).astype(np.float64)
+    
+    tables = np.zeros((len(codes), max(levels), n_targets))
+    for i, n_levels in enumerate(levels):
+        tables[i, :n_levels] = counts[offsets[i]:offsets[i + 1]].reshape(n_levels, n_targets)
+    return tables
+
+
+def chi_square_tests(tables):
+    """
+    Pearson chi-square, p-value and Cramer's V for a stack of contingency
+    tables. Empty rows/columns are ignored and Yates' correction is applied
+    when dof == 1, matching scipy.stats.chi2_contingency.
+    """
+    from scipy import stats
+    
+    n = tables.sum(axis=(1, 2))
+    row_sums = tables.sum(axis=2, keepdims=True)
+    col_sums = tables.sum(axis=1, keepdims=True)
+    n_rows = (row_sums[..., 0] > 0).sum(axis=1)
+    n_cols = (col_sums[:, 0, :] > 0).sum(axis=1)
+    dof = np.maximum(n_rows - 1, 0) * np.maximum(n_cols - 1, 0)
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        expected = row_sums * col_sums / n[:, None, None]
+        observed = tables
+        yates = (dof == 1)[:, None, None]
+        diff = expected - observed
+        observed = np.where(yates, observed + np.sign(diff) * np.minimum(0.5, np.abs(diff)), observed)
+        cells = np.where(expected > 0, (observed - expected) ** 2 / expected, 0.0)
+        chi2 = np.where(dof > 0, cells.sum(axis=(1, 2)), 0.0)
+        p_val = np.where(dof > 0, stats.chi2.sf(chi2, np.maximum(dof, 1)), 1.0)
+        
+        min_dim = np.minimum(n_rows, n_cols) - 1
+        cramers_v = np.where(min_dim > 0, np.sqrt(chi2 / (n * min_dim)), 0.0)
+    return chi2, p_val, cramers_v
+
+
+def _shapiro_samples(first, second, n1, n2):
+    """Column owners and per-group Shapiro-Wilk samples for columns with enough data"""
+    owners, samples = [], []
+    for i in range(first.shape[1]):
+        if n1[i] < 3 or n2[i] < 3:
+            continue
+        sample_size = min(5000, n1[i], n2[i])
+        for group in (first, second):
+            values = group[:, i]
+            values = values[~np.isnan(values)]
+            # Same draw as Series.sample(n, random_state=42)
+            samples.append(values[np.random.RandomState(42).choice(len(values), sample_size, replace=False)])
+            owners.append(i)
+    return owners, samples
+
+
+def _normal_flags(n_cols, owners, p_values, alpha):
+    """Per column: True when Shapiro-Wilk accepts normality in both groups"""
+    normal = np.ones(n_cols, dtype=bool)
+    for i, p_val in zip(owners, p_values):
+        normal[i] &= p_val >= alpha
+    return normal
+
+
+def _column_tests(first, second, normal):
+    """Group moments and both test p-values for every column of the two groups"""
+    n1, mean1, var1 = _group_moments(first)
+    n2, mean2, var2 = _group_moments(second)
+    u_p = mann_whitney_u(np.vstack([first, second]), len(first))[1]
+    t_p = welch_t_test(n1, mean1, var1, n2, mean2, var2)[1]
+    return n1, mean1, var1, n2, mean2, var2, u_p, t_p, normal(first, second, n1, n2)
+
+
+def _column_tests_slab(specs, columns, alpha):
+    """Process-pool task: _column_tests on a column slab of the shared block"""
+    arrays = attach_arrays(specs)
+    first = arrays['block'][np.ix_(arrays['first'], columns)]
+    second = arrays['block'][np.ix_(arrays['second'], columns)]
+    
+    def normal(first, second, n1, n2):
+        owners, samples = _shapiro_samples(first, second, n1, n2)
+        return _normal_flags(len(columns), owners, [_shapiro(values)[1] for values in samples], alpha)
+    
+    return _column_tests(first, second, normal)
+
+
+def target_groups(target):
+    """Row positions of the first two target labels, in order of appearance"""
+    return [
+        np.flatnonzero(target.eq(label).to_numpy(dtype=bool, na_value=False))
+        for label in target.dropna().unique()[:2]
+    ]
 
 
 class BivariateAnalysis:
     def __init__(self, config):
-        self.logger = Logger().get_logger()
+        self.logger = Logger().get_logger(__name__)
         self.config = config
         self.alpha = config['statistical_tests']['alpha']
     
@@ -43,111 +259,130 @@ class BivariateAnalysis:
                 self.logger.warning(f"Target {target_col} not binary or missing")
                 return {}
             
-            def test_numeric(col):
-                try:
-                    group1 = df[df[target_col] == df[target_col].unique()[0]][col].dropna()
-                    group2 = df[df[target_col] == df[target_col].unique()[1]][col].dropna()
-                    
-                    if len(group1) < 3 or len(group2) < 3:
-                        return {col: {'error': 'Insufficient data'}}
-                    
-                    sample_size = min(5000, len(group1), len(group2))
-                    _, p1 = stats.shapiro(
-                        group1.sample(min(sample_size, len(group1)), random_state=42)
-                    )
-                    _, p2 = stats.shapiro(
-                        group2.sample(min(sample_size, len(group2)), random_state=42)
-                    )
-                    
-                    if p1 < self.alpha or p2 < self.alpha:
-                        stat, p_val = mannwhitneyu(group1, group2, alternative='two-sided')
-                        test_type = 'Mann-Whitney U'
-                    else:
-                        stat, p_val = stats.ttest_ind(group1, group2, equal_var=False)
-                        test_type = "Welch's t-test"
-                    
-                    pooled_std = np.sqrt((group1.std()**2 + group2.std()**2) / len(df))
-                    cohens_d = abs(group1.mean() - group2.mean()) / pooled_std if pooled_std > 0 else 0
-                    
-                    effect = 'negligible' if cohens_d < 0.2 else 'small' if cohens_d < 0.5 else 'medium' if cohens_d < 0.8 else 'large'
-                    
-                    return {
-                        col: {
-                            'test_type': test_type,
-                            'group1_mean': round(float(group1.mean()), 4),
-                            'group2_mean': round(float(group2.mean()), 4),
-                            'p_value': round(float(p_val), 6),
-                            'significant': p_val < self.alpha,
-                            'cohens_d': round(float(cohens_d), 4),
-                            'effect': effect
-                        }
-                    }
-                except Exception as e:
-                    return {col: {'error': str(e)}}
+            cols = [col for col in numeric_cols if col != target_col]
+            
+            groups = target_groups(df[target_col])
+            block = _numeric_block(df, cols)
             
-            results = Parallel(
-                n_jobs=self.config['performance']['n_jobs'],
-                backend=self.config['performance']['backend']
-            )(delayed(test_numeric)(col) for col in numeric_cols if col != target_col)
+            performance = self.config['performance']
+            if uses_processes(performance):
+                # Workers attach to one shared copy of the block and test a slab of columns each
+                slabs = map_column_slabs(
+                    _column_tests_slab, {'block': block, 'first': groups[0], 'second': groups[1]},
+                    len(cols), performance['n_jobs'], performance['backend'], self.alpha
+                )
+                parts = zip(*slabs) if slabs else [[np.empty(0)]] * 9
+                n1, mean1, var1, n2, mean2, var2, u_p, t_p, normal = (np.concatenate(part) for part in parts)
+            else:
+                first, second = block[groups[0]], block[groups[1]]
+                n1, mean1, var1, n2, mean2, var2, u_p, t_p, normal = _column_tests(first, second, self._groups_normal)
+            
+            with np.errstate(invalid='ignore', divide='ignore'):
+                pooled_std = np.sqrt((var1 + var2) / 2)
+                cohens_d = np.where(pooled_std > 0, np.abs(mean1 - mean2) / pooled_std, 0.0)
             
             combined = {}
-            for r in results:
-                combined.update(r)
+            for i, col in enumerate(cols):
+                if n1[i] < 3 or n2[i] < 3:
+                    combined[col] = {'error': 'Insufficient data'}
+                    continue
+                
+                if not normal[i]:
+                    test_type = 'Mann-Whitney U'
+                    # scipy switches to the exact null distribution for small tie-free groups
+                    p_val = u_p[i] if n1[i] > 8 and n2[i] > 8 else _exact_mann_whitney(block[groups[0], i], block[groups[1], i])
+                else:
+                    test_type = "Welch's t-test"
+                    p_val = t_p[i]
+                
+                d = float(cohens_d[i])
+                effect = 'negligible' if d < 0.2 else 'small' if d < 0.5 else 'medium' if d < 0.8 else 'large'
+                
+                combined[col] = {
+                    'test_type': test_type,
+                    'group1_mean': round(float(mean1[i]), 4),
+                    'group2_mean': round(float(mean2[i]), 4),
+                    'p_value': round(float(p_val), 6),
+                    'significant': p_val < self.alpha,
+                    'cohens_d': round(d, 4),
+                    'effect': effect
+                }
             
             return combined
         except Exception as e:
             self.logger.error(f"Error in numeric tests: {e}")
             return {}
     
+    def _groups_normal(self, first, second, n1, n2):
+        """Per column: True when Shapiro-Wilk accepts normality in both groups"""
+        from joblib import delayed
+        
+        owners, samples = _shapiro_samples(first, second, n1, n2)
+        performance = self.config['performance']
+        with ConcurrencyGovernor().parallel(
+            performance['n_jobs'], performance['backend'], 'bivariate.normality'
+        ) as parallel:
+            results = parallel(delayed(_shapiro)(values) for values in samples)
+        return _normal_flags(first.shape[1], owners, [p_val for _, p_val in results], self.alpha)
+    
     def _categorical_tests(self, df, categorical_cols, target_col):
         """Chi-square tests"""
         try:
-            def test_categorical(col):
-                try:
-                    contingency = pd.crosstab(df[col], df[target_col])
-                    chi2, p_val, dof, expected = chi2_contingency(contingency)
-                    
-                    n = contingency.sum().sum()
-                    min_dim = min(contingency.shape) - 1
-                    cramers_v = np.sqrt(chi2 / (n * min_dim)) if min_dim > 0 else 0
-                    
-                    effect = 'negligible' if cramers_v < 0.1 else 'small' if cramers_v < 0.3 else 'medium' if cramers_v < 0.5 else 'high'
-                    
-                    return {
-                        col: {
-                            'chi2': round(float(chi2), 4),
-                            'p_value': round(float(p_val), 6),
-                            'cramers_v': round(float(cramers_v), 4),
-                            'effect': effect,
-                            'significant': p_val < self.alpha
-                        }
-                    }
-                except Exception as e:
-                    return {col: {'error': str(e)}}
-            
-            results = Parallel(
-                n_jobs=self.config['performance']['n_jobs'],
-                backend=self.config['performance']['backend']
-            )(delayed(test_categorical)(col) for col in categorical_cols if col != target_col)
+            combined, columns, tables = self.categorical_tables(df, categorical_cols, target_col)
+            chi2, p_val, cramers_v = chi_square_tests(tables)
             
-            combined = {}
-            for r in results:
-                combined.update(r)
+            for i, col in enumerate(columns):
+                v = float(cramers_v[i])
+                effect = 'negligible' if v < 0.1 else 'small' if v < 0.3 else 'medium' if v < 0.5 else 'high'
+                combined[col] = {
+                    'chi2': round(float(chi2[i]), 4),
+                    'p_value': round(float(p_val[i]), 6),
+                    'cramers_v': round(v, 4),
+                    'effect': effect,
+                    'significant': p_val[i] < self.alpha,
+                    **combined[col]
+                }
             
-            return combined
+            return {col: combined[col] for col in categorical_cols if col in combined}
         except Exception as e:
             self.logger.error(f"Error in categorical tests: {e}")
             return {}
     
+    def categorical_tables(self, df, categorical_cols, target_col):
+        """Per-column entries, the tested columns and their stacked contingency tables"""
+        tests = self.config['statistical_tests']
+        max_levels = tests.get('chi_square_max_levels', 50)
+        mode = tests.get('chi_square_high_cardinality', 'top_k')
+        if mode not in CARDINALITY_MODES:
+            raise ValueError(f"Unsupported chi_square_high_cardinality '{mode}', expected one of {CARDINALITY_MODES}")
+        
+        target_codes, target_levels = pd.factorize(df[target_col])
+        
+        combined, columns, codes, levels = {}, [], [], []
+        for col in categorical_cols:
+            if col == target_col:
+                continue
+            col_codes, n_levels = _level_codes(df[col])
+            entry = {'levels': n_levels}
+            if n_levels > max_levels:
+                if mode == 'skip':
+                    combined[col] = {'error': f'{n_levels} levels exceeds chi_square_max_levels ({max_levels})', **entry}
+                    continue
+                col_codes = _reduce_levels(df[col], col_codes, max_levels, mode)
+                entry['reduced'] = f'{mode}:{max_levels}'
+            combined[col] = entry
+            columns.append(col)
+            codes.append(col_codes)
+            levels.append(int(col_codes.max()) + 1 if len(col_codes) else 0)
+        
+        tables = contingency_tables(codes, levels, target_codes, len(target_levels))
+        return combined, columns, tables
+    
     def _correlation_analysis(self, df, numeric_cols):
         """Spearman correlation analysis"""
         try:
-            corr_matrix = df[numeric_cols].corr(method='spearman', numeric_only=True)
-            
-            return {
-                'correlation_matrix': corr_matrix.round(4).to_dict(),
-                'shape': corr_matrix.shape
-            }
+            from eda.correlation import SpearmanCorrelation
+            return SpearmanCorrelation(self.config).compute(df, numeric_cols)
         except Exception as e:
             self.logger.error(f"Error in correlation analysis: {e}")
             return {}
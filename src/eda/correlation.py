@@ -0,0 +1,158 @@
+import numpy as np
+from utils.logger import Logger
+from utils.timer import Timer
+
+
+def _blocked_product(a, b, block_size, symmetric=False):
+    """a.T @ b computed in column blocks so temporaries stay small for wide inputs"""
+    out = np.empty((a.shape[1], b.shape[1]), dtype=np.float64)
+    for i in range(0, a.shape[1], block_size):
+        j_start = i if symmetric else 0
+        for j in range(j_start, b.shape[1], block_size):
+            part = a[:, i:i + block_size].T @ b[:, j:j + block_size]
+            out[i:i + block_size, j:j + block_size] = part
+            if symmetric and j != i:
+                out[j:j + block_size, i:i + block_size] = part.T
+    return out
+
+
+def _subset_ranks(values, order, keep):
+    """
+    Average ranks among the rows where `keep` is true (NaN elsewhere), taken
+    from the column's precomputed sort order instead of sorting again
+    """
+    rows = order[keep[order]]
+    sorted_values = values[rows]
+    starts = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])
+    counts = np.diff(np.r_[starts, len(rows)])
+    ranks = np.full(len(values), np.nan)
+    ranks[rows] = np.repeat(starts + (counts + 1) / 2, counts)
+    return ranks
+
+
+def _pearson(a, b):
+    """Pearson r of two 1-D arrays; NaN for fewer than two rows or a constant side"""
+    if len(a) < 2:
+        return np.nan
+    a, b = a - a.mean(), b - b.mean()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (a @ b) / np.sqrt((a @ a) * (b @ b))
+
+
+class SpearmanCorrelation:
+    """
+    Spearman correlation from one ranking pass and a matrix product.
+    Columns without nulls use a single standardized Gram product. A pair
+    involving a column with nulls is re-ranked on the rows both columns
+    share, as DataFrame.corr('spearman') does, from each column's sort
+    order computed once; pairwise row counts come from presence masks.
+    """
+
+    def __init__(self, config):
+        self.logger = Logger().get_logger(__name__)
+        cfg = config.get('correlation', {})
+        self.dtype = np.dtype(cfg.get('dtype', 'float32'))
+        self.sample_rows = cfg.get('sample_rows')
+        self.block_size = cfg.get('block_size', 512)
+        self.top_k = cfg.get('top_pairs', 20)
+        self.random_state = cfg.get('random_state', 42)
+
+    @Timer.measure
+    def compute(self, df, numeric_cols):
+        """Correlation matrix (ndarray), labels, top-|rho| pairs and sampling error"""
+        from eda.univariate import _numeric_block
+        from eda.bivariate import rank_columns
+
+        block = _numeric_block(df, numeric_cols)
+        total_rows = len(block)
+        sampled = bool(self.sample_rows) and total_rows > self.sample_rows
+        if sampled:
+            rng = np.random.default_rng(self.random_state)
+            block = block[np.sort(rng.choice(total_rows, self.sample_rows, replace=False))]
+
+        ranks, _ = rank_columns(block)
+        matrix, pair_rows = self._correlate(ranks)
+        self._rerank_null_pairs(block, matrix)
+        np.fill_diagonal(matrix, np.where(np.isnan(np.diag(matrix)), np.nan, 1.0))
+
+        result = {
+            'matrix': matrix.astype(self.dtype),
+            'labels': list(numeric_cols),
+            'shape': matrix.shape,
+            'rows_used': len(block),
+            'sampled': sampled,
+            'top_pairs': self._top_pairs(matrix, numeric_cols),
+            'standard_error': None
+        }
+        if sampled:
+            # Fieller et al. approximation for the standard error of Spearman's rho
+            with np.errstate(invalid='ignore', divide='ignore'):
+                error = (1 - matrix ** 2) * np.sqrt(1.06 / (pair_rows - 3))
+            result['standard_error'] = error.astype(self.dtype)
+            result['max_standard_error'] = round(float(np.nanmax(error)), 6) if error.size else None
+            self.logger.info(
+                f"Spearman on {len(block)}/{total_rows} sampled rows, max standard error {result['max_standard_error']}"
+            )
+
+        self.logger.info(f"Spearman correlation computed for {len(numeric_cols)} columns")
+        return result
+
+    def _correlate(self, ranks):
+        present = ~np.isnan(ranks)
+        n = len(ranks)
+        if present.all():
+            with np.errstate(invalid='ignore', divide='ignore'):
+                z = ((ranks - ranks.mean(axis=0)) / (ranks.std(axis=0) * np.sqrt(n))).astype(self.dtype)
+            return _blocked_product(z, z, self.block_size, symmetric=True), np.full((ranks.shape[1],) * 2, n)
+
+        # Centre and scale before the products to keep float32 sums well conditioned
+        with np.errstate(invalid='ignore'):
+            centred = (ranks - np.nanmean(ranks, axis=0)) / max(n, 1)
+        x = np.where(present, centred, 0.0).astype(self.dtype)
+        mask = present.astype(self.dtype)
+
+        counts = _blocked_product(mask, mask, self.block_size, symmetric=True)
+        sum_x = _blocked_product(x, mask, self.block_size)            # [i, j]: sum of x_i where both present
+        sum_xx = _blocked_product(x * x, mask, self.block_size)
+        sum_xy = _blocked_product(x, x, self.block_size, symmetric=True)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = counts * sum_xy - sum_x * sum_x.T
+            var = (counts * sum_xx - sum_x ** 2) * (counts * sum_xx.T - sum_x.T ** 2)
+            matrix = np.where(counts > 1, cov / np.sqrt(var), np.nan)
+        return np.clip(matrix, -1, 1), counts
+
+    def _rerank_null_pairs(self, block, matrix):
+        """
+        Exact rho, in place, for every pair involving a column with nulls:
+        both columns are ranked on exactly the rows they share. Each column
+        is sorted once; a pair's ranks filter that order to the shared rows.
+        """
+        present = ~np.isnan(block)
+        has_nulls = ~present.all(axis=0)
+        if not has_nulls.any():
+            return matrix
+
+        # Every column is some null-bearing column's partner, so sort them all once
+        index_dtype = np.int32 if len(block) < 2 ** 31 else np.int64
+        orders = [np.argsort(block[:, j], kind='stable').astype(index_dtype) for j in range(block.shape[1])]
+
+        for i in np.flatnonzero(has_nulls):
+            # Null-free partners, and null-bearing ones not yet visited
+            for j in np.flatnonzero(~has_nulls | (np.arange(block.shape[1]) > i)):
+                shared = present[:, i] & present[:, j]
+                rank_i = _subset_ranks(block[:, i], orders[i], shared)[shared]
+                rank_j = _subset_ranks(block[:, j], orders[j], shared)[shared]
+                matrix[i, j] = matrix[j, i] = np.clip(_pearson(rank_i, rank_j), -1, 1)
+        return matrix
+
+    def _top_pairs(self, matrix, labels):
+        rows, cols = np.triu_indices(len(labels), k=1)
+        values = matrix[rows, cols]
+        keep = ~np.isnan(values)
+        rows, cols, values = rows[keep], cols[keep], values[keep]
+        order = np.argsort(-np.abs(values), kind='stable')[:self.top_k]
+        return [
+            {'feature_1': labels[rows[i]], 'feature_2': labels[cols[i]], 'rho': round(float(values[i]), 4)}
+            for i in order
+        ]
@@ -5,17 +5,15 @@ from pathlib import Path
 from utils.file_utils import IOHandler
 from utils.logger import Logger
 from utils.timer import Timer
-import sys
-
-sys.path.insert(0, Path(str(__file__)).parent.parent)
-
-from utils import IOHandler, Logger, Timer
+from utils.dtypes import resolve_dtype_backend, convert_dtype_backend
+from utils.dataset import load_dataset, parse_dates
 
 class DataLoader:
     def __init__(self, config_path='config/eda_config.yaml'):
-        self.logger = Logger().get_logger()
+        self.logger = Logger().get_logger(__name__)
         self.io_handler = IOHandler()
         self.config = self._load_config(config_path)
+        self.dtype_backend = resolve_dtype_backend(self.config)
     
     def _load_config(self, config_path):
         """Load YAML configuration"""
@@ -32,21 +30,34 @@ class DataLoader:
     @Timer.measure
     def load_data(self):
         """Load and preprocess data"""
+        df = self.prepare(load_dataset(self.config['data'], self.dtype_backend, self.io_handler))
+        self.logger.info(f"Data loading complete: {df.shape} ({self.dtype_backend} dtypes)")
+        return df
+    
+    def prepare(self, df):
+        """EDA typing on an already loaded raw frame; the caller's frame is left untouched"""
+        df = df.copy(deep=False)
+        self._preprocess_types(df)
+        return df
+    
+    def iter_chunks(self, file_path=None, offset=0):
+        """Yield the extract (or one partition from a byte offset) in `performance.chunk_size` chunks, typed like load_data()"""
         cfg = self.config['data']
-        file_path = cfg['file_path']
+        file_path = file_path or cfg['file_path']
         
         IOHandler.validate_file(file_path)
         
-        df = self.io_handler.read_csv(
+        chunks = self.io_handler.iter_csv(
             file_path,
+            self.config['performance']['chunk_size'],
             encoding=cfg['encoding'],
+            dtype_backend=self.dtype_backend,
+            offset=offset,
             nrows=cfg['max_rows']
         )
-        
-        self._preprocess_types(df)
-        
-        self.logger.info(f"Data loading complete: {df.shape}")
-        return df
+        for chunk in chunks:
+            self._preprocess_types(chunk)
+            yield convert_dtype_backend(chunk, self.dtype_backend)
     
     def _preprocess_types(self, df):
         """Convert types and handle edge cases"""
@@ -58,9 +69,7 @@ class DataLoader:
                 if col in df.columns:
                     df[col] = df[col].round(decimals)
             
-            date_cols = [col for col in df.columns if 'date' in col.lower()]
-            for col in date_cols:
-                df[col] = pd.to_datetime(df[col], errors='coerce')
+            parse_dates(df)
             
             self.logger.debug(f"Type preprocessing completed")
         except Exception as e:
@@ -10,7 +10,7 @@ from utils.timer import Timer
 
 class DataQuality:
     def __init__(self, config):
-        self.logger = Logger().get_logger()
+        self.logger = Logger().get_logger(__name__)
         self.config = config['quality_checks']
     
     @Timer.measure
@@ -31,31 +31,33 @@ class DataQuality:
     def _check_missing_values(self, df):
         """Check for missing values"""
         try:
-            missing = df.isnull().sum()
-            missing = missing[missing > 0].sort_values(ascending=False)
-            
-            if len(missing) == 0:
-                self.logger.info("No missing values detected")
-                return {'count': 0, 'details': {}}
-            
-            missing_pct = (missing / len(df)) * 100
-            max_missing = self.config['max_missing_pct']
-            
-            summary = pd.DataFrame({
-                'missing': missing,
-                'missing_pct': missing_pct.round(2)
-            })
-            
-            problematic = summary[summary['missing_pct'] > max_missing]
-            if len(problematic) > 0:
-                self.logger.warning(f"Columns with >{max_missing}% missing: {problematic.index.tolist()}")
-            
-            return summary 
-        
+            return self._summarize_missing(df.isnull().sum(), len(df))
         except Exception as e:
             self.logger.error(f"Error checking missing values: {e}")
             return {'count': 0, 'details': {}, 'error': str(e)}
     
+    def _summarize_missing(self, missing, n_rows):
+        """Missing-value summary from per-column null counts"""
+        missing = missing[missing > 0].sort_values(ascending=False)
+        
+        if len(missing) == 0:
+            self.logger.info("No missing values detected")
+            return {'count': 0, 'details': {}}
+        
+        missing_pct = (missing / n_rows) * 100
+        max_missing = self.config['max_missing_pct']
+        
+        summary = pd.DataFrame({
+            'missing': missing,
+            'missing_pct': missing_pct.round(2)
+        })
+        
+        problematic = summary[summary['missing_pct'] > max_missing]
+        if len(problematic) > 0:
+            self.logger.warning(f"Columns with >{max_missing}% missing: {problematic.index.tolist()}")
+        
+        return summary 
+    
     def _check_duplicates(self, df):
         """Check for duplicate rows"""
         try:
@@ -80,19 +82,24 @@ class DataQuality:
                 lower_bound = Q1 - 1.5 * IQR
                 upper_bound = Q3 + 1.5 * IQR
                 
-                outliers = df[(df[col] < lower_bound) | (df[col] > upper_bound)]
+                # Nullable (pyarrow) comparisons propagate NA, which sum() skips
+                outliers = int(((df[col] < lower_bound) | (df[col] > upper_bound)).sum())
                 
-                outlier_summary[col] = {
-                    'count': len(outliers),
-                    'pct': round((len(outliers) / len(df)) * 100, 2),
-                    'range': f"({round(lower_bound, 2)} - {round(upper_bound, 2)})"
-                }
+                outlier_summary[col] = self._outlier_entry(outliers, len(df), lower_bound, upper_bound)
             
             return outlier_summary
         except Exception as e:
             self.logger.error(f"Error checking outliers: {e}")
             return {}
     
+    @staticmethod
+    def _outlier_entry(count, n_rows, lower_bound, upper_bound):
+        return {
+            'count': count,
+            'pct': round((count / n_rows) * 100, 2),
+            'range': f"({round(lower_bound, 2)} - {round(upper_bound, 2)})"
+        }
+    
     def _get_data_types(self, df):
         """Get data type summary"""
         try:
@@ -1,61 +1,137 @@
 import warnings
 warnings.filterwarnings('ignore')
-from pathlib import Path
-import sys
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
 
 from eda.data_loader import DataLoader
 from eda.data_quality import DataQuality
 from eda.univariate import UnivariateAnalysis
 from eda.bivariate import BivariateAnalysis
 from eda.report_generator import ReportGenerator
+from eda.streaming import StreamingProfile
+from eda.sampling import SampleCollector, ErrorBounds
+from eda.result_store import ResultStore
 from utils import Logger, Timer
+from utils.tracing import Tracer
+from utils.metrics import MetricsRegistry
+from utils.concurrency import ConcurrencyGovernor
 
 
 class EDAPipeline:
     """Main EDA execution pipeline"""
     
     def __init__(self, config_path='config/eda_config.yaml'):
-        self.logger = Logger().get_logger()
+        self.logger = Logger().get_logger(__name__)
         self.config_path = config_path
         self.logger.info("=" * 80)
         self.logger.info("PRODUCTION-LEVEL EDA FRAMEWORK INITIALIZED")
         self.logger.info("=" * 80)
     
-    @Timer.measure
-    def execute(self):
-        """Execute complete EDA pipeline"""
+    def execute(self, df=None):
+        """Execute complete EDA pipeline (on `df` when a runner has already loaded the raw data)"""
         try:
             self.logger.info("Starting EDA pipeline execution...")
             
-            # Stage 1: Data Loading
-            with Timer("Data Loading"):
-                loader = DataLoader(self.config_path)
-                df = loader.load_data()
-                config = loader.get_config()
+            loader = DataLoader(self.config_path)
+            config = loader.get_config()
+            Logger().configure(config.get('logging'))
+            tracer = Tracer().configure(config.get('tracing'))
+            tracer.reset()
+            metrics = MetricsRegistry().configure(config.get('metrics'))
+            metrics.reset()
+            ConcurrencyGovernor().configure(config.get('concurrency'))
             
-            # Stage 2: Data Quality Checks
-            with Timer("Data Quality Checks"):
-                quality_checker = DataQuality(config)
-                quality_results = quality_checker.run_quality_checks(df)
+            streaming = config['performance'].get('streaming', False)
+            sampling = config.get('sampling', {}).get('enabled', False)
+            incremental = config.get('incremental', {}).get('enabled', False) and not sampling
+            sampling_summary = incremental_summary = None
+            if sampling and (streaming or config.get('incremental', {}).get('enabled', False)):
+                self.logger.warning("Sampling is enabled alongside streaming/incremental; running the sampled EDA")
+            if df is not None and incremental:
+                self.logger.info("Incremental EDA scans the stored partitions itself; the loaded frame is not used")
             
-            # Stage 3: Univariate Analysis
-            with Timer("Univariate Analysis"):
-                univariate = UnivariateAnalysis(config)
-                univariate_results = univariate.run_analysis(df)
+            # A frame handed over by the runner is read in place of the file
+            frame = None if df is None else loader.prepare(df)
+            chunks = loader.iter_chunks if frame is None else (lambda: iter([frame]))
             
-            # Stage 4: Bivariate Analysis
-            target_col = config.get('target_column')
-            with Timer("Bivariate Analysis"):
-                bivariate = BivariateAnalysis(config)
-                bivariate_results = bivariate.run_analysis(df, target_col)
+            with Timer("EDA Pipeline"):
+                if sampling:
+                    # One read of the whole extract; every stage then runs on the sample
+                    with Timer("Sampling"):
+                        df, population_rows, population_duplicates = SampleCollector(config).collect(chunks())
+                        data_shape = (population_rows, df.shape[1])
+                    
+                    with Timer("Data Quality Checks"):
+                        quality_results = DataQuality(config).run_quality_checks(df)
+                    
+                    with Timer("Univariate Analysis"):
+                        univariate_results = UnivariateAnalysis(config).run_analysis(df)
+                elif streaming or incremental:
+                    # Stages 1-3 in one chunked pass; bivariate tests run on the row reservoir
+                    with Timer("Streaming Profile"):
+                        if incremental:
+                            # Only new partitions and appended rows are scanned into the stored profile
+                            store = ResultStore(config)
+                            profile, pending = store.plan(config['data']['file_path'])
+                            profile = profile or StreamingProfile.from_config(config)
+                            for path, offset in pending:
+                                profile.consume(loader.iter_chunks(path, offset))
+                        else:
+                            profile = StreamingProfile.from_config(config).consume(chunks())
+                        quality_results = profile.quality_results(config)
+                        univariate_results = profile.univariate_results(config)
+                        df = profile.sample()
+                        data_shape = profile.shape
+                    self.logger.info(f"Bivariate analysis runs on a {len(df)}-row uniform sample")
+                else:
+                    # Stage 1: Data Loading
+                    with Timer("Data Loading"):
+                        df = loader.load_data() if frame is None else frame
+                        data_shape = df.shape
+                    
+                    # Stage 2: Data Quality Checks
+                    with Timer("Data Quality Checks"):
+                        quality_checker = DataQuality(config)
+                        quality_results = quality_checker.run_quality_checks(df)
+                    
+                    # Stage 3: Univariate Analysis
+                    with Timer("Univariate Analysis"):
+                        univariate = UnivariateAnalysis(config)
+                        univariate_results = univariate.run_analysis(df)
+                
+                # Stage 4: Bivariate Analysis
+                target_col = config.get('target_column')
+                with Timer("Bivariate Analysis"):
+                    bivariate = BivariateAnalysis(config)
+                    bivariate_results = bivariate.run_analysis(df, target_col)
+                
+                if sampling:
+                    with Timer("Error Bounds"):
+                        sampling_summary = ErrorBounds(config).annotate(
+                            df, population_rows, population_duplicates,
+                            quality_results, univariate_results, bivariate_results, target_col
+                        )
+                
+                # Stage 5: Report Generation (writers run in the background until wait())
+                with Timer("Report Generation"):
+                    mode = 'sampled' if sampling else 'incremental' if incremental else 'streaming' if streaming else 'full'
+                    report_gen = ReportGenerator(config, run_id=store.run_id if incremental else None)
+                    report_gen.generate(quality_results, univariate_results, bivariate_results, metadata={
+                        'mode': mode,
+                        'data_path': config['data']['file_path'],
+                        'rows': data_shape[0],
+                        'columns': data_shape[1],
+                        'analysed_rows': len(df),
+                        'config_path': self.config_path
+                    })
+                    if incremental:
+                        run_diff = store.commit(profile, quality_results, univariate_results, bivariate_results)
+                        report_gen._save_run_diff(run_diff, store.run_id)
+                        incremental_summary = store.summary
+                
+                metrics.gauge('dataset_rows', 'Rows in the analysed dataset', run='eda').set(data_shape[0])
+                reports = report_gen.wait()
             
-            # Stage 5: Report Generation
-            with Timer("Report Generation"):
-                report_gen = ReportGenerator(config)
-                report_gen._save_csv_reports(quality_results, univariate_results, bivariate_results)
+            tracer.write_reports('eda')
+            metrics.write_snapshot('eda')
             
             self.logger.info("=" * 80)
             self.logger.info("EDA PIPELINE EXECUTION COMPLETED SUCCESSFULLY")
@@ -66,13 +142,12 @@ class EDAPipeline:
                 'quality': quality_results,
                 'univariate': univariate_results,
                 'bivariate': bivariate_results,
-                'data_shape': df.shape
+                'data_shape': data_shape,
+                'sampling': sampling_summary,
+                'incremental': incremental_summary,
+                'reports': reports
             }
         
         except Exception as e:
             self.logger.error(f"Pipeline execution failed: {e}", exc_info=True)
             raise
-
-if __name__ == '__main__':
-    pipeline = EDAPipeline('config/eda_config.yaml')
-    results = pipeline.execute()
\ No newline at end of file
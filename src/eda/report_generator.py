@@ -1,59 +1,198 @@
+import numpy as np
 import pandas as pd
-from pathlib import Path
 import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from utils.logger import Logger
 from utils.file_utils import IOHandler
 from utils.timer import Timer
+from utils.concurrency import ConcurrencyGovernor
+
+REPORT_FORMATS = ('csv', 'json', 'html', 'sqlite')
+
+
+def _column_frame(results):
+    """{column: {statistic: value}} as a frame with the column name in the first field"""
+    frame = pd.DataFrame.from_dict(results, orient='index')
+    return frame.rename_axis('column').reset_index()
+
+
+def report_tables(quality, univariate, bivariate):
+    """Flatten the stage results into named report tables"""
+    tables = {}
+
+    shape = quality.get('shape', {})
+    duplicates = quality.get('duplicates', {})
+    tables['dataset_summary'] = pd.DataFrame([{
+        **shape,
+        **{f'duplicates_{key}': value for key, value in duplicates.items() if key != 'error'}
+    }])
+
+    missing = quality.get('missing_values')
+    if isinstance(missing, pd.DataFrame) and len(missing):
+        tables['missing_values'] = missing.rename_axis('column').reset_index()
+
+    for name, results in (
+        ('outliers', quality.get('outliers')),
+        ('numeric_types', quality.get('data_types', {}).get('numeric')),
+        ('categorical_types', quality.get('data_types', {}).get('categorical')),
+        ('normality_tests', univariate.get('normality_tests')),
+        ('confidence_intervals', univariate.get('confidence_intervals')),
+        ('descriptive_stats', univariate.get('descriptive_stats')),
+        ('numeric_vs_target', bivariate.get('numeric_vs_target')),
+        ('categorical_vs_target', bivariate.get('categorical_vs_target'))
+    ):
+        if results:
+            tables[name] = _column_frame(results)
+
+    target = bivariate.get('target_distribution') or {}
+    if target.get('distribution'):
+        frame = pd.DataFrame({
+            'count': pd.Series(target['distribution']),
+            'pct': pd.Series(target.get('distribution_pct', {}))
+        })
+        if target.get('distribution_pct_error'):
+            frame['pct_error'] = pd.Series(target['distribution_pct_error'])
+        tables['target_distribution'] = frame.rename_axis('label').reset_index()
+
+    corr = bivariate.get('correlation') or {}
+    if corr.get('top_pairs'):
+        tables['correlation_top_pairs'] = pd.DataFrame(corr['top_pairs'])
+    return tables
+
+
+def correlation_long(corr):
+    """Upper triangle of the correlation matrix as (feature_1, feature_2, rho[, standard_error]) rows"""
+    labels = np.asarray(corr['labels'], dtype=object)
+    rows, cols = np.triu_indices(len(labels), k=1)
+    frame = pd.DataFrame({
+        'feature_1': labels[rows],
+        'feature_2': labels[cols],
+        'rho': corr['matrix'][rows, cols].astype(np.float64)
+    })
+    if corr.get('standard_error') is not None:
+        frame['standard_error'] = corr['standard_error'][rows, cols].astype(np.float64)
+    return frame
+
 
 class ReportGenerator:
-    def __init__(self, config):
-        self.logger = Logger().get_logger()
+    """
+    Writes every format in `output.formats` concurrently on background threads.
+    generate() returns as soon as the writers are submitted; wait() collects them.
+    """
+
+    def __init__(self, config, run_id=None):
+        self.logger = Logger().get_logger(__name__)
         self.config = config
-        self.io_handler = IOHandler(config['output']['results_dir'])
-    
+        output = config['output']
+        self.io_handler = IOHandler(output['results_dir'])
+        self.report_name = output.get('report_name', 'eda_report')
+        self.sqlite_db = output.get('sqlite_db', 'eda_results.db')
+        self.formats = [fmt for fmt in output.get('formats', ['csv']) if fmt in REPORT_FORMATS]
+        unknown = set(output.get('formats', [])) - set(REPORT_FORMATS)
+        if unknown:
+            self.logger.warning(f"Ignoring unsupported report formats: {sorted(unknown)}")
+        self.run_id = run_id or datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        self._futures = {}
+
     @Timer.measure
+    def generate(self, quality, univariate, bivariate, metadata=None):
+        """Submit one writer per configured format (plus the correlation archive) and return"""
+        tables = report_tables(quality, univariate, bivariate)
+        run = pd.DataFrame([{
+            'pipeline': 'eda',
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'formats': ','.join(self.formats),
+            **{key: (json.dumps(value, default=str) if isinstance(value, (dict, list, tuple)) else value)
+               for key, value in (metadata or {}).items()}
+        }])
 
-    
-    def _save_csv_reports(self, quality, univariate, bivariate):
-        """Save results as CSV files"""
-        try:
-            # Missing values
-            if quality['missing_values']['count'] > 0:
-                missing_df = pd.DataFrame(quality['missing_values']['details']).T
-                self.io_handler.save_csv(missing_df, 'missing_values')
-            
-            # Outliers
-            outliers_df = pd.DataFrame(quality['outliers']).T
-            self.io_handler.save_csv(outliers_df, 'outliers')
-            
-            # Normality tests
-            normality_df = pd.DataFrame(univariate['normality_tests']).T
-            self.io_handler.save_csv(normality_df, 'normality_tests')
-            
-            # Confidence intervals
-            ci_df = pd.DataFrame(univariate['confidence_intervals']).T
-            self.io_handler.save_csv(ci_df, 'confidence_intervals')
-            
-            self.logger.info("CSV reports saved")
-        except Exception as e:
-            self.logger.error(f"Error saving CSV reports: {e}")
-    
-    def _save_sqlite_reports(self, quality, univariate, bivariate):
-        """Save results to SQLite"""
+        writers = {
+            'csv': lambda: self._write_csv(tables),
+            'json': lambda: self._write_json(tables, run),
+            'html': lambda: self._write_html(tables, run),
+            'sqlite': lambda: self._write_sqlite(tables, run, bivariate),
+            'correlation': lambda: self._save_correlation(bivariate)
+        }
+        lease = ConcurrencyGovernor().lease(len(self.formats) + 1, 'report_writers')
+        executor = ThreadPoolExecutor(max_workers=lease.workers, thread_name_prefix='report')
+        self._futures = {name: executor.submit(writers[name]) for name in self.formats + ['correlation']}
+        executor.shutdown(wait=False)
+
+        # Hand the cores back when the last writer finishes, whether or not wait() is called
+        pending = set(self._futures.values())
+        def finished(future):
+            pending.discard(future)
+            if not pending:
+                lease.release()
+        for future in self._futures.values():
+            future.add_done_callback(finished)
+        self.logger.info(f"Report writers started for run {self.run_id}: {self.formats}")
+        return self
+
+    @Timer.measure
+    def wait(self):
+        """Block until every writer has finished; returns {format: output path or error}"""
+        written = {}
+        for name, future in self._futures.items():
+            try:
+                written[name] = str(future.result()) if future.result() is not None else None
+            except Exception as e:
+                self.logger.error(f"Error writing {name} report: {e}")
+                written[name] = f'error: {e}'
+        self.logger.info(f"Reports written for run {self.run_id}")
+        return written
+
+    def _write_csv(self, tables):
+        """Save each report table as CSV"""
+        for name, frame in tables.items():
+            self.io_handler.save_csv(frame, name)
+        return self.io_handler.results_dir
+
+    def _write_json(self, tables, run):
+        """Save all tables and the run metadata as one JSON document"""
+        payload = {
+            'run_id': self.run_id,
+            'run': run.iloc[0].to_dict(),
+            'tables': {name: frame.to_dict('records') for name, frame in tables.items()}
+        }
+        return self.io_handler.save_json(payload, self.report_name)
+
+    def _write_html(self, tables, run):
+        """Save a single self-contained HTML page with every table"""
+        sections = ''.join(
+            f"<h2>{name.replace('_', ' ').title()}</h2>\n{frame.to_html(index=False, na_rep='', border=0)}\n"
+            for name, frame in tables.items()
+        )
+        html = (
+            f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{self.report_name} {self.run_id}</title>"
+            "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;font-size:13px}"
+            "td,th{padding:3px 8px;border-bottom:1px solid #ddd;text-align:right}</style></head><body>\n"
+            f"<h1>EDA report {self.run_id}</h1>\n{run.to_html(index=False, border=0)}\n{sections}</body></html>\n"
+        )
+        return self.io_handler.save_html(html, self.report_name)
+
+    def _write_sqlite(self, tables, run, bivariate):
+        """Append this run's tables (tagged with run_id) to the shared database in one transaction"""
+        tables = {'runs': run, **tables}
+        corr = bivariate.get('correlation') or {}
+        if corr.get('matrix') is not None:
+            tables['correlation'] = correlation_long(corr)
+        return self.io_handler.save_tables_to_sqlite(tables, self.sqlite_db, run_id=self.run_id)
+
+    def _save_correlation(self, bivariate):
+        """Save the correlation matrix as .npz"""
+        corr = bivariate.get('correlation') or {}
+        if corr.get('matrix') is None:
+            return None
+        arrays = {'matrix': corr['matrix'], 'labels': np.array(corr['labels'])}
+        if corr.get('standard_error') is not None:
+            arrays['standard_error'] = corr['standard_error']
+        return self.io_handler.save_npz('correlation_matrix', **arrays)
+
+    def _save_run_diff(self, diff, run_id):
+        """Save the statistics that changed since the previous stored run"""
         try:
-            # Missing values
-            if quality['missing_values']['count'] > 0:
-                missing_df = pd.DataFrame(quality['missing_values']['details']).T.reset_index()
-                self.io_handler.save_to_sqlite(missing_df, 'missing_values')
-            
-            # Outliers
-            outliers_df = pd.DataFrame(quality['outliers']).T.reset_index()
-            self.io_handler.save_to_sqlite(outliers_df, 'outliers')
-            
-            # Normality tests
-            normality_df = pd.DataFrame(univariate['normality_tests']).T.reset_index()
-            self.io_handler.save_to_sqlite(normality_df, 'normality_tests')
-            
-            self.logger.info("SQLite reports saved")
+            self.io_handler.save_csv(diff, f'eda_run_diff_{run_id}')
         except Exception as e:
-            self.logger.error(f"Error saving SQLite reports: {e}")
\ No newline at end of file
+            self.logger.error(f"Error saving run diff: {e}")
@@ -0,0 +1,197 @@
+"""
+Incremental EDA result store.
+
+The dataset is a set of CSV partitions (a file, or the *.csv files of a
+directory), each fingerprinted by size and sha256. The store keeps the merged
+StreamingProfile from the last run; on the next run only new partitions and
+rows appended to known ones are scanned and folded in. A changed or removed
+partition, or a config change that affects the accumulators, rebuilds the
+profile from scratch.
+"""
+import hashlib
+import json
+import pickle
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from utils.logger import Logger
+from utils.timer import Timer
+
+STATE_VERSION = 1
+BLOCK_SIZE = 1 << 23
+
+
+def dataset_partitions(file_path):
+    """CSV partitions behind `data.file_path`, in a stable order"""
+    path = Path(file_path)
+    if path.is_dir():
+        return sorted(str(p) for p in path.glob('*.csv'))
+    return [str(path)]
+
+
+def file_fingerprint(path, prefix_size=None):
+    """Size, sha256 and trailing-newline flag of a file, plus the sha256 of its first `prefix_size` bytes"""
+    digest, prefix = hashlib.sha256(), None
+    size, last = 0, b''
+    with open(path, 'rb') as handle:
+        while block := handle.read(BLOCK_SIZE):
+            start, size, last = size, size + len(block), block[-1:]
+            if prefix_size is not None and prefix is None and size >= prefix_size:
+                cut = prefix_size - start
+                digest.update(block[:cut])
+                prefix = digest.copy().hexdigest()
+                block = block[cut:]
+            digest.update(block)
+    return {
+        'size': size,
+        'sha256': digest.hexdigest(),
+        'prefix_sha256': prefix,
+        'ends_with_newline': last == b'\n'
+    }
+
+
+def config_fingerprint(config):
+    """Hash of the settings that change what the stored accumulators contain"""
+    relevant = {
+        'data': config.get('data'),
+        'currencies': config.get('currencies'),
+        'sample_rows': config['performance'].get('sample_rows'),
+        'normality_sample_size': config['statistical_tests']['normality_sample_size']
+    }
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def flatten_results(results, prefix=''):
+    """Every numeric/boolean leaf of a nested result dict as {'section/key/metric': float}"""
+    flat = {}
+    for key, value in results.items():
+        name = f'{prefix}/{key}' if prefix else str(key)
+        if isinstance(value, pd.DataFrame):
+            value = value.to_dict('index')
+        if isinstance(value, dict):
+            flat.update(flatten_results(value, name))
+        elif isinstance(value, (bool, int, float, np.bool_, np.integer, np.floating)):
+            flat[name] = float(value)
+    return flat
+
+
+def diff_results(previous, current):
+    """Statistics that were added, removed or changed between two flattened runs"""
+    keys = sorted(set(previous) | set(current))
+    frame = pd.DataFrame({
+        'statistic': keys,
+        'previous': [previous.get(key, np.nan) for key in keys],
+        'current': [current.get(key, np.nan) for key in keys]
+    })
+    frame['change'] = frame['current'] - frame['previous']
+    same = np.isclose(frame['previous'], frame['current'], rtol=0, atol=0, equal_nan=True)
+    frame['status'] = np.select(
+        [~frame['statistic'].isin(list(previous)), ~frame['statistic'].isin(list(current)), ~same],
+        ['added', 'removed', 'changed'],
+        'unchanged'
+    )
+    return frame[frame['status'] != 'unchanged'].reset_index(drop=True)
+
+
+class ResultStore:
+    """Persist the merged StreamingProfile with partition and config fingerprints between EDA runs"""
+
+    def __init__(self, config):
+        self.logger = Logger().get_logger(__name__)
+        cfg = config.get('incremental', {})
+        self.store_dir = Path(cfg.get('store_dir', './results/store'))
+        self.state_path = self.store_dir / 'eda_state.pkl'
+        self.config_hash = config_fingerprint(config)
+        self.run_id = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        self.previous = None
+        self.fingerprints = {}
+        self.summary = {}
+
+    def _load(self):
+        if not self.state_path.exists():
+            return None
+        try:
+            with open(self.state_path, 'rb') as f:
+                state = pickle.load(f)
+            return state if state.get('version') == STATE_VERSION else None
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable result store {self.state_path}: {e}")
+            return None
+
+    @Timer.measure
+    def plan(self, file_path):
+        """Stored profile (None when it must be rebuilt) and the (path, byte offset) ranges still to scan"""
+        partitions = dataset_partitions(file_path)
+        self.previous = self._load()
+        stored = self.previous['partitions'] if self.previous else {}
+
+        rebuild = None
+        if self.previous is None:
+            rebuild = 'no stored results'
+        elif self.previous['config_hash'] != self.config_hash:
+            rebuild = 'config changed'
+        elif set(stored) - set(partitions):
+            rebuild = f"partitions removed: {sorted(set(stored) - set(partitions))}"
+
+        pending, status = [], {}
+        for path in partitions:
+            known = stored.get(path)
+            fingerprint = file_fingerprint(path, known['size'] if known else None)
+            self.fingerprints[path] = fingerprint
+            if known is None:
+                status[path] = 'new'
+                pending.append((path, 0))
+            elif fingerprint['sha256'] == known['sha256']:
+                status[path] = 'unchanged'
+            elif fingerprint['prefix_sha256'] == known['sha256'] and known['ends_with_newline']:
+                status[path] = 'appended'
+                pending.append((path, known['size']))
+            else:
+                status[path] = 'modified'
+                rebuild = rebuild or f'partition modified: {path}'
+
+        if rebuild:
+            self.logger.info(f"Rebuilding EDA profile ({rebuild})")
+            pending = [(path, 0) for path in partitions]
+            profile = None
+        else:
+            profile = self.previous['profile']
+            self.logger.info(f"Incremental EDA: {len(pending)} of {len(partitions)} partitions have new rows")
+
+        self.summary = {
+            'run_id': self.run_id,
+            'mode': 'full' if rebuild else 'incremental',
+            'reason': rebuild,
+            'partitions': status,
+            'scanned_bytes': sum(self.fingerprints[path]['size'] - offset for path, offset in pending)
+        }
+        return profile, pending
+
+    @Timer.measure
+    def commit(self, profile, quality, univariate, bivariate):
+        """Save the merged profile and this run's statistics; return the diff against the stored run"""
+        current = flatten_results({'quality': quality, 'univariate': univariate, 'bivariate': bivariate})
+        diff = diff_results(self.previous['results'] if self.previous else {}, current)
+
+        state = {
+            'version': STATE_VERSION,
+            'run_id': self.run_id,
+            'config_hash': self.config_hash,
+            'partitions': {
+                path: {key: fp[key] for key in ('size', 'sha256', 'ends_with_newline')}
+                for path, fp in self.fingerprints.items()
+            },
+            'profile': profile,
+            'results': current
+        }
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so an interrupted run never leaves a truncated store
+        tmp_path = self.state_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(self.state_path)
+
+        self.summary['changed_statistics'] = len(diff)
+        self.logger.info(f"Result store updated ({self.run_id}): {len(diff)} statistics changed")
+        return diff
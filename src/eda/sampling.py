@@ -0,0 +1,277 @@
+import numpy as np
+import pandas as pd
+from statistics import NormalDist
+from eda.streaming import RowReservoir, HashSet
+from eda.univariate import _numeric_block, DESCRIBE_QUANTILES
+from eda.bivariate import BivariateAnalysis, chi_square_tests, target_groups, _group_moments
+from utils.logger import Logger
+from utils.timer import Timer
+
+SAMPLING_METHODS = ('reservoir', 'stratified')
+
+
+def _wilson_error(count, n, z):
+    """Half-width (in percent) of the Wilson score interval for count / n; non-zero even at 0 or n"""
+    count = np.asarray(count, dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = count / n
+        half = z / (1 + z ** 2 / n) * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2))
+    return np.round(half * 100, 2)
+
+
+class StratifiedReservoir:
+    """
+    One row reservoir per stratum. Class counts are only known at the end of the
+    read, so each reservoir holds up to `size` rows and sample() keeps the
+    smallest-key rows of each in proportion to its class count.
+    """
+
+    def __init__(self, size, column, seed=42):
+        self.size = size
+        self.column = column
+        self.seed = seed
+        self.reservoirs = {}
+        self.counts = {}
+
+    def update(self, chunk):
+        for label, rows in chunk.groupby(chunk[self.column], dropna=False, sort=False):
+            label = None if pd.isna(label) else label
+            if label not in self.reservoirs:
+                self.reservoirs[label] = RowReservoir(self.size, seed=[self.seed, len(self.reservoirs)])
+                self.counts[label] = 0
+            self.reservoirs[label].update(rows)
+            self.counts[label] += len(rows)
+
+    def sample(self):
+        total = sum(self.counts.values())
+        parts = []
+        for label, reservoir in self.reservoirs.items():
+            take = min(len(reservoir.keys), int(round(self.size * self.counts[label] / total)))
+            keep = np.sort(np.argsort(reservoir.keys, kind='stable')[:take])
+            parts.append(reservoir.rows.iloc[keep])
+        if not parts:
+            return pd.DataFrame()
+        # Chunk indexes run on through the file, so sorting restores read order
+        return pd.concat(parts).sort_index().reset_index(drop=True)
+
+
+class SampleCollector:
+    """Draws the EDA sample while the extract is read chunk by chunk (whole file, not the head)"""
+
+    def __init__(self, config):
+        self.logger = Logger().get_logger(__name__)
+        cfg = config.get('sampling', {})
+        self.method = cfg.get('method', 'stratified')
+        self.size = cfg.get('size', 50000)
+        self.seed = cfg.get('random_state', 42)
+        self.stratify_column = cfg.get('stratify_column') or config.get('target_column')
+        if self.method not in SAMPLING_METHODS:
+            raise ValueError(f"Unsupported sampling method '{self.method}', expected one of {SAMPLING_METHODS}")
+
+    @Timer.measure
+    def collect(self, chunks):
+        """Return (sample, population_rows, population_duplicates) after one pass over the chunks"""
+        sampler, population_rows = None, 0
+        # Duplicates are counted over the whole read: a sample only sees a fraction of each pair
+        row_hashes = HashSet()
+        for chunk in chunks:
+            if sampler is None:
+                sampler = self._sampler(chunk)
+            sampler.update(chunk)
+            row_hashes.add(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+            population_rows += len(chunk)
+
+        sample = sampler.sample() if sampler is not None else pd.DataFrame()
+        population_duplicates = population_rows - len(row_hashes)
+        self.logger.info(f"Sampled {len(sample)} of {population_rows} rows ({self.method})")
+        return sample, population_rows, population_duplicates
+
+    def _sampler(self, chunk):
+        if self.method == 'stratified':
+            if self.stratify_column in chunk.columns:
+                return StratifiedReservoir(self.size, self.stratify_column, self.seed)
+            self.logger.warning(f"Stratify column '{self.stratify_column}' not found, using a uniform reservoir")
+        return RowReservoir(self.size, self.seed)
+
+
+class ErrorBounds:
+    """
+    Attach sample sizes and sampling errors to the DataQuality, UnivariateAnalysis
+    and BivariateAnalysis results computed on a sample. Errors are half-widths of
+    `confidence_level` intervals: Wilson for percentages, normal theory for means,
+    standard deviations and Cohen's d, order statistics for quartiles, Fieller for
+    Spearman's rho and a multinomial bootstrap of the contingency table for Cramer's V.
+    """
+
+    def __init__(self, config):
+        self.logger = Logger().get_logger(__name__)
+        self.config = config
+        cfg = config.get('sampling', {})
+        self.confidence = config['statistical_tests']['confidence_level']
+        self.z = NormalDist().inv_cdf((1 + self.confidence) / 2)
+        self.iterations = cfg.get('bootstrap_iterations', 200)
+        self.seed = cfg.get('random_state', 42)
+
+    @Timer.measure
+    def annotate(self, sample, population_rows, population_duplicates, quality, univariate, bivariate,
+                 target_col=None):
+        """Add `n` and `*_error` fields in place; returns the sampling summary"""
+        n = len(sample)
+        numeric_cols = sample.select_dtypes(include=[np.number]).columns.tolist()
+        block = _numeric_block(sample, numeric_cols)
+
+        self._quality(sample, n, population_rows, population_duplicates, quality)
+        self._univariate(block, numeric_cols, univariate)
+        self._bivariate(sample, block, numeric_cols, target_col, bivariate)
+
+        summary = {
+            'sample_rows': n,
+            'population_rows': population_rows,
+            'fraction': round(n / population_rows, 6) if population_rows else None,
+            'confidence': self.confidence
+        }
+        self.logger.info(f"Error bounds attached at {self.confidence:.0%} confidence for a {n}-row sample")
+        return summary
+
+    def _quality(self, sample, n, population_rows, population_duplicates, quality):
+        try:
+            quality['shape'] = {**quality['shape'], 'observations': population_rows, 'sample_rows': n}
+
+            missing = quality.get('missing_values')
+            if isinstance(missing, pd.DataFrame):
+                missing['missing_pct_error'] = _wilson_error(missing['missing'], n, self.z)
+                missing['n'] = n
+            elif isinstance(missing, dict):
+                missing['n'] = n
+
+            # Exact over the full read, so no sampling error; the sample count is kept alongside
+            duplicates = quality.setdefault('duplicates', {})
+            duplicates.update({
+                'sample_count': int(duplicates.get('count', 0)),
+                'count': int(population_duplicates),
+                'n': population_rows,
+                'pct': round(population_duplicates / population_rows * 100, 2) if population_rows else None
+            })
+
+            for entry in quality.get('outliers', {}).values():
+                entry['pct_error'] = float(_wilson_error(entry['count'], n, self.z))
+                entry['n'] = n
+
+            types = quality.get('data_types', {})
+            for col, entry in types.get('numeric', {}).items():
+                present = int(sample[col].notna().sum())
+                # Expected share of the population inside the sample [min, max]
+                entry['n'] = present
+                entry['range_coverage'] = round((present - 1) / (present + 1), 6) if present else None
+            for col, entry in types.get('categorical', {}).items():
+                frequencies = sample[col].value_counts().value_counts()
+                singletons, doubletons = int(frequencies.get(1, 0)), int(frequencies.get(2, 0))
+                # Bias-corrected Chao1: sample distinct counts undercount rare levels
+                entry['n'] = int(sample[col].notna().sum())
+                entry['unique_estimate'] = int(round(
+                    entry['unique'] + singletons * (singletons - 1) / (2 * (doubletons + 1))
+                ))
+        except Exception as e:
+            self.logger.error(f"Error attaching quality error bounds: {e}")
+
+    def _univariate(self, block, numeric_cols, univariate):
+        try:
+            counts = (~np.isnan(block)).sum(axis=0)
+            sample_size = self.config['statistical_tests']['normality_sample_size']
+            for i, col in enumerate(numeric_cols):
+                for key, n in (('normality_tests', min(sample_size, counts[i])), ('confidence_intervals', counts[i])):
+                    entry = univariate.get(key, {}).get(col)
+                    if entry is not None:
+                        entry['n'] = int(n)
+
+            ordered = np.sort(block, axis=0)
+            for i, col in enumerate(numeric_cols):
+                entry = univariate.get('descriptive_stats', {}).get(col)
+                n = counts[i]
+                if entry is None or n < 2:
+                    continue
+                std = entry['std']
+                entry['mean_error'] = round(float(self.z * std / np.sqrt(n)), 4)
+                entry['std_error'] = round(float(self.z * std / np.sqrt(2 * (n - 1))), 4)
+                for q in DESCRIBE_QUANTILES:
+                    # Distribution-free interval between two order statistics
+                    spread = self.z * np.sqrt(n * q * (1 - q))
+                    lower = int(np.clip(np.floor(n * q - spread), 0, n - 1))
+                    upper = int(np.clip(np.ceil(n * q + spread), 0, n - 1))
+                    entry[f'{q:.0%}_error'] = round(float(ordered[upper, i] - ordered[lower, i]) / 2, 4)
+        except Exception as e:
+            self.logger.error(f"Error attaching univariate error bounds: {e}")
+
+    def _bivariate(self, sample, block, numeric_cols, target_col, bivariate):
+        try:
+            if target_col and target_col in sample.columns:
+                self._numeric_tests(sample, block, numeric_cols, target_col, bivariate.get('numeric_vs_target', {}))
+                self._categorical_tests(sample, target_col, bivariate.get('categorical_vs_target', {}))
+                self._target_distribution(sample, target_col, bivariate.get('target_distribution', {}))
+            self._correlation(block, numeric_cols, bivariate.get('correlation', {}))
+        except Exception as e:
+            self.logger.error(f"Error attaching bivariate error bounds: {e}")
+
+    def _numeric_tests(self, sample, block, numeric_cols, target_col, results):
+        if not results:
+            return
+        groups = target_groups(sample[target_col])
+        n1, mean1, var1 = _group_moments(block[groups[0]])
+        n2, mean2, var2 = _group_moments(block[groups[1]])
+        for i, col in enumerate(numeric_cols):
+            entry = results.get(col)
+            if entry is None or 'error' in entry:
+                continue
+            d = entry['cohens_d']
+            entry.update({
+                'n1': int(n1[i]),
+                'n2': int(n2[i]),
+                'group1_mean_error': round(float(self.z * np.sqrt(var1[i] / n1[i])), 4),
+                'group2_mean_error': round(float(self.z * np.sqrt(var2[i] / n2[i])), 4),
+                'cohens_d_error': round(float(self.z * np.sqrt(
+                    (n1[i] + n2[i]) / (n1[i] * n2[i]) + d ** 2 / (2 * (n1[i] + n2[i]))
+                )), 4)
+            })
+
+    def _categorical_tests(self, sample, target_col, results):
+        tested = [col for col, entry in results.items() if 'cramers_v' in entry]
+        if not tested:
+            return
+        _, columns, tables = BivariateAnalysis(self.config).categorical_tables(sample, tested, target_col)
+        rng = np.random.default_rng(self.seed)
+        tail = (1 - self.confidence) / 2 * 100
+        for table, col in zip(tables, columns):
+            n = int(table.sum())
+            # Resampling n rows with replacement is a multinomial draw over the cells
+            draws = rng.multinomial(n, table.ravel() / n, size=self.iterations).reshape((-1,) + table.shape)
+            cramers_v = chi_square_tests(draws)[2]
+            low, high = np.nanpercentile(cramers_v, [tail, 100 - tail])
+            results[col]['n'] = n
+            results[col]['cramers_v_error'] = round(float(high - low) / 2, 4)
+
+    def _target_distribution(self, sample, target_col, results):
+        if not results:
+            return
+        n = int(sample[target_col].notna().sum())
+        results['n'] = n
+        results['distribution_pct_error'] = {
+            label: float(_wilson_error(count, n, self.z)) for label, count in results['distribution'].items()
+        }
+
+    def _correlation(self, block, numeric_cols, results):
+        if results.get('matrix') is None:
+            return
+        labels = results['labels']
+        present = ~np.isnan(block[:, [numeric_cols.index(label) for label in labels]])
+        if results.get('standard_error') is None:
+            pair_rows = present.T.astype(np.float64) @ present.astype(np.float64)
+            matrix = results['matrix'].astype(np.float64)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                error = (1 - matrix ** 2) * np.sqrt(1.06 / (pair_rows - 3))
+            results['standard_error'] = error.astype(results['matrix'].dtype)
+            results['max_standard_error'] = round(float(np.nanmax(error)), 6) if error.size else None
+        error = results['standard_error']
+        index = {label: i for i, label in enumerate(labels)}
+        for pair in results.get('top_pairs', []):
+            pair['rho_error'] = round(float(self.z * error[index[pair['feature_1']], index[pair['feature_2']]]), 4)
+        results['n'] = int(results.get('rows_used', len(block)))
@@ -0,0 +1,489 @@
+"""
+Single-pass, bounded-memory profiling for extracts too large to load.
+
+Every accumulator is mergeable (profiles built on separate partitions
+combine with `merge`) and picklable, so partitions can be profiled in
+worker processes. Quantiles and outlier counts of high-cardinality numeric
+columns, and distinct counts above `distinct_capacity`, are sketch
+estimates; everything else is exact.
+"""
+import copy
+import numpy as np
+import pandas as pd
+from utils.logger import Logger
+from utils.timer import Timer
+
+
+class MomentAccumulator:
+    """Per-column count, mean, M2 (Welford/Chan), min and max over 2-D blocks"""
+
+    def __init__(self, n_cols):
+        self.count = np.zeros(n_cols, dtype=np.int64)
+        self.mean = np.zeros(n_cols)
+        self.m2 = np.zeros(n_cols)
+        self.min = np.full(n_cols, np.inf)
+        self.max = np.full(n_cols, -np.inf)
+
+    def update(self, block):
+        """Fold a (rows, columns) float block with NaN for missing values"""
+        count = (~np.isnan(block)).sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(count > 0, np.nansum(block, axis=0) / count, 0.0)
+            m2 = np.nansum((block - mean) ** 2, axis=0)
+        other = MomentAccumulator(block.shape[1])
+        other.count, other.mean, other.m2 = count, mean, m2
+        if len(block):
+            missing = np.isnan(block)
+            other.min = np.where(missing, np.inf, block).min(axis=0)
+            other.max = np.where(missing, -np.inf, block).max(axis=0)
+        self.merge(other)
+
+    def merge(self, other):
+        """Chan et al. parallel combination of two accumulators"""
+        total = self.count + other.count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = other.mean - self.mean
+            weight = np.where(total > 0, other.count / total, 0.0)
+            self.mean = self.mean + delta * weight
+            self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * weight
+        self.count = total
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+
+    def std(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 1, np.sqrt(self.m2 / (self.count - 1)), np.nan)
+
+
+class QuantileSketch:
+    """
+    Merging-digest quantile sketch: centroids are re-clustered on the
+    arcsine scale, so clusters stay small in the tails and the sketch
+    holds about `compression / 2` centroids regardless of input size.
+    Columns with at most `max_exact` distinct values also keep an exact
+    frequency table, so flags, codes and small integers stay exact.
+    """
+
+    def __init__(self, compression=500, max_exact=2048):
+        self.compression = compression
+        self.max_exact = max_exact
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.values = np.empty(0)
+        self.frequencies = np.empty(0, dtype=np.int64)
+        self.exact = True
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        """Fold non-null finite values"""
+        if len(values) == 0:
+            return
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        if self.exact:
+            self._tally(*np.unique(values, return_counts=True))
+        self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, np.ones(len(values))]))
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if self.exact and other.exact:
+            self._tally(other.values, other.frequencies)
+        else:
+            self._drop_exact()
+        self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+
+    def _tally(self, values, frequencies):
+        self.values, inverse = np.unique(np.concatenate([self.values, values]), return_inverse=True)
+        self.frequencies = np.bincount(inverse, weights=np.concatenate([self.frequencies, frequencies])).astype(np.int64)
+        if len(self.values) > self.max_exact:
+            self._drop_exact()
+
+    def _drop_exact(self):
+        self.exact = False
+        self.values = np.empty(0)
+        self.frequencies = np.empty(0, dtype=np.int64)
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind='mergesort')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights / 2) / total
+        cluster = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * q - 1))
+        starts = np.flatnonzero(np.r_[True, cluster[1:] != cluster[:-1]])
+        merged = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged
+        self.weights = merged
+        self.count = int(round(total))
+
+    def _positions(self):
+        """Rank positions of the centroid centres, bracketed by min and max"""
+        centres = np.cumsum(self.weights) - self.weights / 2
+        return np.r_[0.0, centres, self.count], np.r_[self.min, self.means, self.max]
+
+    def quantile(self, q):
+        """Linear-interpolated quantile, as pandas computes it"""
+        if self.count == 0:
+            return np.nan
+        position = q * (self.count - 1)
+        if self.exact:
+            ends = np.cumsum(self.frequencies)
+            low = self.values[np.searchsorted(ends, np.floor(position), side='right')]
+            high = self.values[np.searchsorted(ends, np.ceil(position), side='right')]
+            return float(low + (position - np.floor(position)) * (high - low))
+        ranks, values = self._positions()
+        return float(np.interp(position + 0.5, ranks, values))
+
+    def rank(self, x):
+        """Number of values below `x` (estimated once the column outgrows the exact table)"""
+        if self.count == 0:
+            return 0.0
+        if self.exact:
+            return float(self.frequencies[self.values < x].sum())
+        ranks, values = self._positions()
+        return float(np.interp(x, values, ranks, left=0.0, right=self.count))
+
+    def rank_above(self, x):
+        """Number of values above `x`"""
+        if self.exact:
+            return float(self.frequencies[self.values > x].sum())
+        return self.count - self.rank(x)
+
+
+class StreamingHistogram:
+    """
+    Fixed-width histogram whose bin width doubles (merging neighbouring
+    bins) whenever the observed range needs more than `max_bins` bins.
+    Widths are powers of two, so histograms of different partitions align.
+    """
+
+    def __init__(self, max_bins=64):
+        self.max_bins = max_bins
+        self.width = None
+        self.keys = np.empty(0, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    def update(self, values):
+        if len(values) == 0:
+            return
+        if self.width is None:
+            span = float(values.max() - values.min())
+            self.width = 2.0 ** np.ceil(np.log2(span / self.max_bins)) if span > 0 else 1.0
+        keys, counts = np.unique(np.floor(values / self.width).astype(np.int64), return_counts=True)
+        self._add(keys, counts)
+
+    def merge(self, other):
+        if other.width is None:
+            return
+        if self.width is None:
+            self.width = other.width
+        keys, counts = other.keys, other.counts
+        while self.width < other.width:
+            self._coarsen()
+        width = other.width
+        while width < self.width:
+            keys, width = np.floor_divide(keys, 2), width * 2
+        self._add(keys, counts)
+
+    def _add(self, keys, counts):
+        keys = np.concatenate([self.keys, keys])
+        counts = np.concatenate([self.counts, counts])
+        self.keys, inverse = np.unique(keys, return_inverse=True)
+        self.counts = np.bincount(inverse, weights=counts).astype(np.int64)
+        while len(self.keys) and self.keys[-1] - self.keys[0] + 1 > self.max_bins:
+            self._coarsen()
+
+    def _coarsen(self):
+        self.width *= 2
+        self.keys, inverse = np.unique(np.floor_divide(self.keys, 2), return_inverse=True)
+        self.counts = np.bincount(inverse, weights=self.counts).astype(np.int64)
+
+    def to_dict(self):
+        """Dense bin edges and counts"""
+        if self.width is None:
+            return {'edges': [], 'counts': []}
+        keys = np.arange(self.keys[0], self.keys[-1] + 1)
+        counts = np.zeros(len(keys), dtype=np.int64)
+        counts[self.keys - self.keys[0]] = self.counts
+        edges = np.r_[keys, keys[-1] + 1] * self.width
+        return {'edges': edges.round(6).tolist(), 'counts': counts.tolist()}
+
+
+class DistinctCounter:
+    """Exact distinct count of 64-bit hashes up to `capacity`, K-minimum-values estimate beyond"""
+
+    def __init__(self, capacity=65536):
+        self.capacity = capacity
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.saturated = False
+
+    def update(self, hashes):
+        merged = np.unique(np.concatenate([self.hashes, hashes]))
+        if len(merged) > self.capacity:
+            merged = merged[:self.capacity]
+            self.saturated = True
+        self.hashes = merged
+
+    def merge(self, other):
+        self.saturated = self.saturated or other.saturated
+        self.update(other.hashes)
+
+    def estimate(self):
+        if not self.saturated:
+            return len(self.hashes)
+        return int(round((self.capacity - 1) / (float(self.hashes[-1]) / 2.0 ** 64)))
+
+
+class HashSet:
+    """Exact set of 64-bit row hashes, kept as size-tiered sorted runs"""
+
+    def __init__(self):
+        self.runs = []
+
+    def add(self, hashes):
+        self.runs.append(np.unique(hashes))
+        # Merge neighbouring runs of similar size: amortised O(n log n) overall
+        while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+            last = self.runs.pop()
+            self.runs[-1] = np.union1d(self.runs[-1], last)
+
+    def merge(self, other):
+        for run in other.runs:
+            self.add(run)
+
+    def __len__(self):
+        if len(self.runs) > 1:
+            self.runs = [np.unique(np.concatenate(self.runs))]
+        return len(self.runs[0]) if self.runs else 0
+
+
+class RowReservoir:
+    """Uniform row sample of fixed size: keeps the rows with the smallest random keys"""
+
+    def __init__(self, size, seed=42):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.keys = np.empty(0)
+        self.rows = None
+
+    def update(self, chunk):
+        self._offer(self.rng.random(len(chunk)), chunk)
+
+    def merge(self, other):
+        if other.rows is not None:
+            self._offer(other.keys, other.rows)
+
+    def _offer(self, keys, rows):
+        if self.rows is not None and len(self.keys) >= self.size:
+            keep = np.flatnonzero(keys < self.keys.max())
+            keys, rows = keys[keep], rows.iloc[keep]
+            if len(keys) == 0:
+                return
+        keys = np.concatenate([self.keys, keys])
+        rows = rows if self.rows is None else pd.concat([self.rows, rows])
+        if len(keys) > self.size:
+            keep = np.sort(np.argpartition(keys, self.size - 1)[:self.size])
+            keys, rows = keys[keep], rows.iloc[keep]
+        self.keys, self.rows = keys, rows
+
+    def sample(self):
+        return self.rows.reset_index(drop=True) if self.rows is not None else pd.DataFrame()
+
+
+class StreamingProfile:
+    """Mergeable one-pass profile producing the DataQuality / UnivariateAnalysis result structure"""
+
+    def __init__(self, sample_rows=100000, compression=500, max_bins=64, distinct_capacity=65536, seed=42):
+        self.logger = Logger().get_logger(__name__)
+        self.sample_rows = sample_rows
+        self.compression = compression
+        self.max_bins = max_bins
+        self.distinct_capacity = distinct_capacity
+        self.seed = seed
+        self.rows = 0
+        self.columns = None
+
+    @classmethod
+    def from_config(cls, config, seed=42):
+        perf = config['performance']
+        sample_rows = max(perf.get('sample_rows', 100000), config['statistical_tests']['normality_sample_size'])
+        return cls(sample_rows=sample_rows, seed=seed)
+
+    def _init_schema(self, chunk):
+        """Fix the column layout from the first chunk"""
+        self.columns = chunk.columns.tolist()
+        self.numeric_cols = chunk.select_dtypes(include=[np.number]).columns.tolist()
+        self.categorical_cols = chunk.select_dtypes(exclude=[np.number]).columns.tolist()
+        self.dtypes = {col: str(chunk[col].dtype) for col in self.columns}
+        self.null_counts = np.zeros(len(self.columns), dtype=np.int64)
+        self.moments = MomentAccumulator(len(self.numeric_cols))
+        self.sketches = {col: QuantileSketch(self.compression) for col in self.numeric_cols}
+        self.histograms = {col: StreamingHistogram(self.max_bins) for col in self.numeric_cols}
+        self.distinct = {col: DistinctCounter(self.distinct_capacity) for col in self.categorical_cols}
+        self.examples = {col: [] for col in self.categorical_cols}
+        self.row_hashes = HashSet()
+        self.reservoir = RowReservoir(self.sample_rows, self.seed)
+
+    def _conform(self, chunk):
+        """Coerce later chunks onto the first chunk's numeric/categorical split"""
+        chunk = chunk[self.columns]
+        for col in self.numeric_cols:
+            if not pd.api.types.is_numeric_dtype(chunk[col]):
+                chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+        for col in self.categorical_cols:
+            # A chunk where a text column is entirely null parses as float
+            if pd.api.types.is_numeric_dtype(chunk[col]):
+                chunk[col] = chunk[col].astype(object)
+        return chunk
+
+    def update(self, chunk):
+        """Fold one chunk into every accumulator"""
+        if self.columns is None:
+            self._init_schema(chunk)
+        chunk = self._conform(chunk.copy())
+        self.rows += len(chunk)
+        self.null_counts += chunk.isna().sum().to_numpy()
+
+        block = chunk[self.numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+        self.moments.update(block)
+        for i, col in enumerate(self.numeric_cols):
+            values = block[:, i]
+            values = values[np.isfinite(values)]
+            self.sketches[col].update(values)
+            self.histograms[col].update(values)
+
+        for col in self.categorical_cols:
+            series = chunk[col]
+            self.distinct[col].update(pd.util.hash_pandas_object(series.dropna(), index=False).to_numpy())
+            if len(self.examples[col]) < 3:
+                for value in series.unique():
+                    if len(self.examples[col]) == 3:
+                        break
+                    if not any(_same(value, seen) for seen in self.examples[col]):
+                        self.examples[col].append(value)
+
+        self.row_hashes.add(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+        self.reservoir.update(chunk)
+        return self
+
+    @Timer.measure
+    def consume(self, chunks):
+        """Profile an iterable of chunks in one pass"""
+        for i, chunk in enumerate(chunks, 1):
+            self.update(chunk)
+            self.logger.debug(f"Profiled chunk {i} ({self.rows} rows so far)")
+        self.logger.info(f"Streaming profile complete: {self.rows} rows, {len(self.columns or [])} columns")
+        return self
+
+    def merge(self, other):
+        """Combine a profile built on another partition with the same columns"""
+        if other.columns is None:
+            return self
+        if self.columns is None:
+            self.__dict__.update(copy.deepcopy({k: v for k, v in other.__dict__.items() if k != 'logger'}))
+            return self
+        self.rows += other.rows
+        self.null_counts += other.null_counts
+        self.moments.merge(other.moments)
+        for col in self.numeric_cols:
+            self.sketches[col].merge(other.sketches[col])
+            self.histograms[col].merge(other.histograms[col])
+        for col in self.categorical_cols:
+            self.distinct[col].merge(other.distinct[col])
+            for value in other.examples[col]:
+                if len(self.examples[col]) < 3 and not any(_same(value, seen) for seen in self.examples[col]):
+                    self.examples[col].append(value)
+        self.row_hashes.merge(other.row_hashes)
+        self.reservoir.merge(other.reservoir)
+        return self
+
+    @property
+    def shape(self):
+        return (self.rows, len(self.columns or []))
+
+    def sample(self):
+        """Uniform row sample for tests that need raw rows"""
+        return self.reservoir.sample()
+
+    def quality_results(self, config):
+        """Same structure as DataQuality.run_quality_checks"""
+        from eda.data_quality import DataQuality
+
+        quality = DataQuality(config)
+        missing = pd.Series(self.null_counts, index=self.columns)
+        duplicates = self.rows - len(self.row_hashes)
+        self.logger.info(f"Duplicate rows detected: {duplicates}")
+
+        outliers = {}
+        for col in self.numeric_cols:
+            sketch = self.sketches[col]
+            q1, q3 = sketch.quantile(0.25), sketch.quantile(0.75)
+            iqr = q3 - q1
+            lower_bound, upper_bound = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+            count = 0
+            if sketch.count:
+                count = int(round(sketch.rank(lower_bound) + sketch.rank_above(upper_bound)))
+            outliers[col] = quality._outlier_entry(count, self.rows, lower_bound, upper_bound)
+
+        numeric_summary = {}
+        for i, col in enumerate(self.numeric_cols):
+            has_values = self.moments.count[i] > 0
+            numeric_summary[col] = {
+                'type': self.dtypes[col],
+                'min': round(float(self.moments.min[i]), 4) if has_values else None,
+                'max': round(float(self.moments.max[i]), 4) if has_values else None
+            }
+        categorical_summary = {
+            col: {
+                'type': self.dtypes[col],
+                'unique': self.distinct[col].estimate(),
+                'examples': list(self.examples[col])
+            }
+            for col in self.categorical_cols
+        }
+
+        return {
+            'shape': {'observations': self.rows, 'features': len(self.columns)},
+            'missing_values': quality._summarize_missing(missing, self.rows),
+            'duplicates': {'count': duplicates},
+            'outliers': outliers,
+            'data_types': {'numeric': numeric_summary, 'categorical': categorical_summary}
+        }
+
+    def univariate_results(self, config):
+        """Same structure as UnivariateAnalysis.run_analysis, plus per-column histograms"""
+        from eda.univariate import UnivariateAnalysis, _numeric_block
+
+        univariate = UnivariateAnalysis(config)
+        counts = self.moments.count
+
+        sample = self.sample()
+        sample_block = _numeric_block(sample, self.numeric_cols)
+        sample_counts = (~np.isnan(sample_block)).sum(axis=0)
+
+        table = {
+            'count': counts.astype(np.float64),
+            'mean': self.moments.mean,
+            'std': self.moments.std(),
+            'min': self.moments.min,
+        }
+        for q in (0.25, 0.5, 0.75):
+            table[f'{q:.0%}'] = np.array([self.sketches[col].quantile(q) for col in self.numeric_cols])
+        table['max'] = self.moments.max
+
+        return {
+            'normality_tests': univariate._test_normality(sample_block, self.numeric_cols, sample_counts),
+            'confidence_intervals': univariate._ci_from_moments(
+                self.numeric_cols, counts, self.moments.mean, self.moments.std()
+            ),
+            'descriptive_stats': univariate._describe_table(self.numeric_cols, counts, table),
+            'histograms': {col: self.histograms[col].to_dict() for col in self.numeric_cols}
+        }
+
+
+def _same(a, b):
+    return (pd.isna(a) and pd.isna(b)) if (pd.isna(a) or pd.isna(b)) else a == b
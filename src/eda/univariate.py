@@ -1,15 +1,40 @@
 import pandas as pd
 import numpy as np
-from scipy import stats
-from joblib import Parallel, delayed
-import sys
-from pathlib import Path
 from utils.logger import Logger
 from utils.timer import Timer
+from utils.shared_arrays import attach_arrays, map_column_slabs, uses_processes
+from utils.concurrency import ConcurrencyGovernor
+
+DESCRIBE_QUANTILES = (0.25, 0.5, 0.75)
+
+
+def _numeric_block(df, numeric_cols):
+    """Numeric columns as one float64 (rows, columns) array with NaN for missing values"""
+    return df[numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _shapiro(values):
+    from scipy import stats
+    stat, p_val = stats.shapiro(values)
+    return float(stat), float(p_val)
+
+
+def _normality_sample(values, sample_size):
+    values = values[~np.isnan(values)]
+    # Same draw as Series.sample(n, random_state=42)
+    picks = np.random.RandomState(42).choice(len(values), min(sample_size, len(values)), replace=False)
+    return values[picks]
+
+
+def _normality_slab(specs, slab, sample_size):
+    """Process-pool task: Shapiro-Wilk for a slab of the shared block's tested columns"""
+    arrays = attach_arrays(specs)
+    return [_shapiro(_normality_sample(arrays['block'][:, i], sample_size)) for i in arrays['columns'][slab]]
+
 
 class UnivariateAnalysis:
     def __init__(self, config):
-        self.logger = Logger().get_logger()
+        self.logger = Logger().get_logger(__name__)
         self.config = config
         self.alpha = config['statistical_tests']['alpha']
         self.confidence = config['statistical_tests']['confidence_level']
@@ -21,89 +46,87 @@ class UnivariateAnalysis:
         
         self.logger.info("Starting univariate analysis...")
         numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+        block = _numeric_block(df, numeric_cols)
+        counts = (~np.isnan(block)).sum(axis=0)
         
-        results['normality_tests'] = self._test_normality(df, numeric_cols)
-        results['confidence_intervals'] = self._calculate_ci(df, numeric_cols)
-        results['descriptive_stats'] = self._descriptive_stats(df, numeric_cols)
+        results['normality_tests'] = self._test_normality(block, numeric_cols, counts)
+        results['confidence_intervals'] = self._calculate_ci(block, numeric_cols, counts)
+        results['descriptive_stats'] = self._descriptive_stats(block, numeric_cols, counts)
         
         self.logger.info("Univariate analysis completed")
         return results
     
-    def _test_normality(self, df, numeric_cols):
-        """Shapiro-Wilk normality test"""
+    def _test_normality(self, block, numeric_cols, counts):
+        """Shapiro-Wilk normality test, parallelised over pre-sampled columns"""
         try:
             sample_size = self.config['statistical_tests']['normality_sample_size']
             
-            def test_col(col):
-                try:
-                    series = df[col].dropna()
-                    if len(series) < 3:
-                        return {col: {'error': 'Insufficient data'}}
-                    
-                    stat, p_val = stats.shapiro(
-                        series.sample(min(sample_size, len(series)), random_state=42)
-                    )
-                    
-                    return {
-                        col: {
-                            'statistic': round(float(stat), 4),
-                            'p_value': round(float(p_val), 6),
-                            'is_normal': p_val >= self.alpha
-                        }
-                    }
-                except Exception as e:
-                    return {col: {'error': str(e)}}
+            combined = {col: {'error': 'Insufficient data'} for i, col in enumerate(numeric_cols) if counts[i] < 3}
+            tested = np.flatnonzero(counts >= 3)
             
-            results = Parallel(
-                n_jobs=self.config['performance']['n_jobs'],
-                backend=self.config['performance']['backend']
-            )(delayed(test_col)(col) for col in numeric_cols)
+            performance = self.config['performance']
+            if uses_processes(performance):
+                # Sampling scans every row, so workers draw from one shared copy of the block
+                slabs = map_column_slabs(
+                    _normality_slab, {'block': block, 'columns': tested},
+                    len(tested), performance['n_jobs'], performance['backend'], sample_size
+                )
+                results = [result for slab in slabs for result in slab]
+            else:
+                from joblib import delayed
+                
+                # Workers only see the small sampled arrays, never the frame
+                samples = [_normality_sample(block[:, i], sample_size) for i in tested]
+                with ConcurrencyGovernor().parallel(
+                    performance['n_jobs'], performance['backend'], 'univariate.normality'
+                ) as parallel:
+                    results = parallel(delayed(_shapiro)(values) for values in samples)
             
-            combined = {}
-            for r in results:
-                combined.update(r)
+            for i, (stat, p_val) in zip(tested, results):
+                combined[numeric_cols[i]] = {
+                    'statistic': round(stat, 4),
+                    'p_value': round(p_val, 6),
+                    'is_normal': p_val >= self.alpha
+                }
             
+            combined = {col: combined[col] for col in numeric_cols}
             self.logger.info(f"Normality tests completed for {len(numeric_cols)} columns")
             return combined
         except Exception as e:
             self.logger.error(f"Error in normality tests: {e}")
             return {}
     
-    def _calculate_ci(self, df, numeric_cols):
-        """Calculate confidence intervals"""
+    def _calculate_ci(self, block, numeric_cols, counts):
+        """t-based confidence intervals for all columns at once"""
         try:
-            def calc_ci(col):
-                try:
-                    clean = df[col].dropna()
-                    if len(clean) < 3:
-                        return {col: {'error': 'Insufficient data'}}
-                    
-                    mean = float(np.mean(clean))
-                    std_err = float(stats.sem(clean))
-                    margin = std_err * stats.t.ppf(
-                        (1 + self.confidence) / 2, len(clean) - 1
-                    )
-                    
-                    return {
-                        col: {
-                            'mean': round(mean, 4),
-                            'lower_bound': round(mean - margin, 4),
-                            'upper_bound': round(mean + margin, 4),
-                            'margin_of_error': round(margin, 4),
-                            'confidence': self.confidence
-                        }
-                    }
-                except Exception as e:
-                    return {col: {'error': str(e)}}
+            with np.errstate(invalid='ignore', divide='ignore'):
+                means = np.nanmean(block, axis=0)
+                stds = np.nanstd(block, axis=0, ddof=1)
+            return self._ci_from_moments(numeric_cols, counts, means, stds)
+        except Exception as e:
+            self.logger.error(f"Error calculating CI: {e}")
+            return {}
+    
+    def _ci_from_moments(self, numeric_cols, counts, means, stds):
+        """Confidence intervals from per-column count, mean and sample standard deviation"""
+        try:
+            from scipy import stats
             
-            results = Parallel(
-                n_jobs=self.config['performance']['n_jobs'],
-                backend=self.config['performance']['backend']
-            )(delayed(calc_ci)(col) for col in numeric_cols)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                margins = stds / np.sqrt(counts) * stats.t.ppf((1 + self.confidence) / 2, counts - 1)
             
             combined = {}
-            for r in results:
-                combined.update(r)
+            for i, col in enumerate(numeric_cols):
+                if counts[i] < 3:
+                    combined[col] = {'error': 'Insufficient data'}
+                    continue
+                combined[col] = {
+                    'mean': round(float(means[i]), 4),
+                    'lower_bound': round(float(means[i] - margins[i]), 4),
+                    'upper_bound': round(float(means[i] + margins[i]), 4),
+                    'margin_of_error': round(float(margins[i]), 4),
+                    'confidence': self.confidence
+                }
             
             self.logger.info(f"Confidence intervals calculated for {len(numeric_cols)} columns")
             return combined
@@ -111,10 +134,42 @@ class UnivariateAnalysis:
             self.logger.error(f"Error calculating CI: {e}")
             return {}
     
-    def _descriptive_stats(self, df, numeric_cols):
-        """Calculate descriptive statistics"""
+    def _descriptive_stats(self, block, numeric_cols, counts):
+        """describe()-equivalent statistics from one column-wise sort"""
+        try:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                ordered = np.sort(block, axis=0)  # NaNs sort last
+                columns = np.arange(block.shape[1])
+                last = np.maximum(counts - 1, 0)
+                
+                table = {
+                    'count': counts.astype(np.float64),
+                    'mean': np.nanmean(block, axis=0),
+                    'std': np.nanstd(block, axis=0, ddof=1),
+                    'min': ordered[0, columns] if len(block) else np.full(len(columns), np.nan),
+                }
+                for q in DESCRIBE_QUANTILES:
+                    # Linear interpolation between order statistics, as pandas does
+                    position = q * last
+                    lower = np.floor(position).astype(np.intp)
+                    upper = np.ceil(position).astype(np.intp)
+                    if len(block):
+                        low, high = ordered[lower, columns], ordered[upper, columns]
+                        table[f'{q:.0%}'] = low + (position - lower) * (high - low)
+                    else:
+                        table[f'{q:.0%}'] = np.full(len(columns), np.nan)
+                table['max'] = ordered[last, columns] if len(block) else np.full(len(columns), np.nan)
+            return self._describe_table(numeric_cols, counts, table)
+        except Exception as e:
+            self.logger.error(f"Error calculating descriptive stats: {e}")
+            return {}
+    
+    def _describe_table(self, numeric_cols, counts, table):
+        """Format describe() columns (count, mean, std, min, quartiles, max) per numeric column"""
         try:
-            stats_df = df[numeric_cols].describe().T
+            stats_df = pd.DataFrame(table, index=numeric_cols)
+            stats_df.loc[counts == 0, stats_df.columns.drop('count')] = np.nan
+            stats_df.loc[counts < 2, 'std'] = np.nan
             stats_dict = stats_df.round(4).to_dict('index')
             self.logger.info(f"Descriptive statistics calculated for {len(numeric_cols)} columns")
             return stats_dict
@@ -1,25 +1,34 @@
-from .data_splitter import DataSplitter
-from .business_logic import BusinessLogicHandler
-from .datetime_features import DatetimeFeatureExtractor
-from .duplicate_handler import DuplicateHandler
-from .encoding import FeatureEncoder
-from .feature_engineering import FeatureEngineer
-from .missing_handler import MissingHandler
-from .outlier_handler import OutlierHandler
-from .transformations import FeatureTransformer
-from .preprocessing_pipeline import PreprocessingPipeline, load_config, main
+from importlib import import_module
 
-__all__ = [
-    'DataSplitter',
-    'BusinessLogicHandler',
-    'DatetimeFeatureExtractor',
-    'DuplicateHandler',
-    'FeatureEncoder',
-    'FeatureEngineer',
-    'MissingHandler',
-    'OutlierHandler',
-    'FeatureTransformer',
-    'PreprocessingPipeline',
-    'load_config',
-    'main'
-]
\ No newline at end of file
+# Public names are imported from their submodule on first access (PEP 562),
+# so `import preprocessing` does not pull in pandas or sklearn up front
+_EXPORTS = {
+    'DataSplitter': '.data_splitter',
+    'BusinessLogicHandler': '.business_logic',
+    'DatetimeFeatureExtractor': '.datetime_features',
+    'DuplicateHandler': '.duplicate_handler',
+    'CustomerRollup': '.customer_rollup',
+    'FeatureEncoder': '.encoding',
+    'FeatureEngineer': '.feature_engineering',
+    'WindowFeatureEngineer': '.window_features',
+    'MissingHandler': '.missing_handler',
+    'OutlierHandler': '.outlier_handler',
+    'FeatureTransformer': '.transformations',
+    'PreprocessingPipeline': '.preprocessing_pipeline',
+    'load_config': '.preprocessing_pipeline',
+    'main': '.preprocessing_pipeline'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -2,12 +2,13 @@ import pandas as pd
 import numpy as np
 from utils.logger import Logger
 from utils.timer import Timer
+from utils.metrics import MetricsRegistry
 
 class BusinessLogicHandler:
     """Handle business logic errors"""
     
     def __init__(self, config):
-        self.logger = Logger().get_logger()
+        self.logger = Logger().get_logger(__name__)
         self.config = config['business_logic']
     
     @Timer.measure
@@ -32,6 +33,9 @@ class BusinessLogicHandler:
                 
                 dropped = invalid_rows.sum()
                 df = df[~invalid_rows]
+                MetricsRegistry().counter(
+                    'rows_dropped_total', 'Rows removed by cleaning rules', rule='business_logic:zero_price_or_revenue'
+                ).inc(int(dropped))
                 
                 self.logger.info(f"Dropped {dropped} rows with business logic errors")
             
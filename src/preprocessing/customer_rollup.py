@@ -0,0 +1,191 @@
+import pandas as pd
+import numpy as np
+from utils.logger import Logger
+from utils.timer import Timer
+from utils.dtypes import resolve_dtype_backend
+
+ROLLUP_OPERATIONS = ('sum', 'mean', 'min', 'max', 'count', 'nunique')
+
+FLOAT_DTYPES = {'numpy': 'float64', 'numpy_nullable': 'Float64', 'pyarrow': 'float64[pyarrow]'}
+
+INT64_MAX = np.iinfo(np.int64).max
+NAT = np.iinfo(np.int64).min
+
+
+def _float_values(series):
+    return series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _datetime_values(series):
+    """int64 nanoseconds since the epoch, NaT as int64 min"""
+    if not pd.api.types.is_datetime64_any_dtype(series):
+        series = pd.to_datetime(series, errors='coerce')
+    elif isinstance(series.dtype, pd.ArrowDtype):
+        series = series.astype('datetime64[ns]')
+    return series.to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+
+class CustomerRollup:
+    """
+    Collapse transaction lines into one row per customer.
+    The key is factorized once and every aggregate is computed from the
+    shared group codes (bincount) or one sort by key (reduceat), so many
+    aggregates cost a single pass each instead of one groupby apiece.
+    """
+    
+    def __init__(self, config):
+        self.logger = Logger().get_logger(__name__)
+        self.config = config.get('rollup', {})
+        self.enabled = self.config.get('enabled', False)
+        self.key = self.config.get('key', 'Customer ID')
+        self.dtype_backend = resolve_dtype_backend(config)
+        self.share_levels = {}  # Levels per share column, learned at fit
+    
+    @Timer.measure
+    def rollup(self, df, fit=True):
+        """One row per customer: key, latest attributes, aggregates, level shares and line count"""
+        try:
+            self.logger.info(f"Rolling up {len(df)} lines by {self.key}...")
+            
+            codes, keys = pd.factorize(df[self.key], sort=True)
+            order, starts, counts = self._group_order(df, codes)
+            n_groups = len(keys)
+            
+            result = {self.key: pd.Series(keys)}
+            last_rows = order[starts + counts - 1]
+            for col in self.config.get('keep_last', []):
+                if col not in df.columns:
+                    self.logger.warning(f"Column {col} not found for rollup")
+                    continue
+                result[col] = df[col].take(last_rows).reset_index(drop=True)
+            
+            floats = []
+            for col, operations in (self.config.get('aggregations') or {}).items():
+                if col not in df.columns:
+                    self.logger.warning(f"Column {col} not found for rollup")
+                    continue
+                features = self._aggregate(df[col], col, operations, codes, order, starts, n_groups)
+                floats += [name for name, values in features.items() if values.dtype.kind == 'f']
+                result.update(features)
+            
+            if fit:
+                self.share_levels = {
+                    col: pd.factorize(df[col], sort=True)[1].tolist()
+                    for col in self.config.get('shares', []) if col in df.columns
+                }
+            for col, levels in self.share_levels.items():
+                if col not in df.columns:
+                    self.logger.warning(f"Column {col} not found for rollup")
+                    continue
+                features = self._shares(df[col], col, levels, codes, counts)
+                floats += list(features)
+                result.update(features)
+            
+            result[self.config.get('count_column', 'line_count')] = counts
+            
+            rolled = pd.DataFrame(result)
+            rolled[floats] = rolled[floats].astype(FLOAT_DTYPES[self.dtype_backend])
+            
+            self.logger.info(
+                f"Rolled up {len(df)} lines into {len(rolled)} customers "
+                f"({len(df) / max(len(rolled), 1):.1f}x fewer rows, {rolled.shape[1]} columns)"
+            )
+            return rolled
+        
+        except Exception as e:
+            self.logger.error(f"Error in customer rollup: {e}")
+            raise
+    
+    def _group_order(self, df, codes):
+        """Row order grouped by key (latest `order_by` last within a group), group starts and sizes"""
+        order_by = self.config.get('order_by')
+        if order_by in df.columns:
+            order = np.lexsort((_datetime_values(df[order_by]), codes))
+        else:
+            order = np.argsort(codes, kind='stable')
+        
+        # Rows with a missing key have code -1 and sort first
+        order = order[codes[order] >= 0]
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) if len(order) else np.array([], int)
+        counts = np.diff(np.r_[starts, len(order)])
+        return order, starts, counts
+    
+    def _aggregate(self, series, col, operations, codes, order, starts, n_groups):
+        """Configured operations for one column as a name -> array mapping"""
+        features = {}
+        valid = codes >= 0
+        is_datetime = pd.api.types.is_datetime64_any_dtype(series)
+        values = None
+        value_ops = set(operations) - {'count', 'nunique'}
+        if is_datetime or (value_ops and not pd.api.types.is_numeric_dtype(series)):
+            # Unparsed date strings are coerced the same way as `order_by`; count
+            # and nunique work on the raw values, so columns with only those skip it
+            coerced = _datetime_values(series)
+            if is_datetime or (coerced != NAT).any():
+                is_datetime, values = True, coerced
+        
+        for op in operations:
+            name = f"{op}_{col}"
+            if op not in ROLLUP_OPERATIONS:
+                self.logger.warning(f"Unsupported rollup operation {op} for {col}")
+            elif op == 'count':
+                features[name] = np.bincount(codes[valid & series.notna().to_numpy()], minlength=n_groups)
+            elif op == 'nunique':
+                value_codes, uniques = pd.factorize(series)
+                seen = valid & (value_codes >= 0)
+                pairs = pd.unique(codes[seen].astype(np.int64) * len(uniques) + value_codes[seen])
+                features[name] = np.bincount(pairs // max(len(uniques), 1), minlength=n_groups)
+            elif is_datetime:
+                if op not in ('min', 'max'):
+                    self.logger.warning(f"Rollup operation {op} is not defined for datetime column {col}")
+                    continue
+                features[name] = self._datetime_extreme(values[order], starts, op)
+            else:
+                values = _float_values(series) if values is None else values
+                if op in ('sum', 'mean'):
+                    present = valid & ~np.isnan(values)
+                    sums = np.bincount(codes[present], weights=values[present], minlength=n_groups)
+                    if op == 'sum':
+                        features[name] = sums
+                    else:
+                        with np.errstate(invalid='ignore', divide='ignore'):
+                            features[name] = sums / np.bincount(codes[present], minlength=n_groups)
+                else:
+                    features[name] = self._float_extreme(values[order], starts, op)
+        
+        return features
+    
+    @staticmethod
+    def _float_extreme(values, starts, op):
+        """Per-group NaN-ignoring min/max over values sorted by group"""
+        if not len(starts):
+            return np.array([], dtype=np.float64)
+        missing = np.isnan(values)
+        fill, reduce = (np.inf, np.minimum) if op == 'min' else (-np.inf, np.maximum)
+        extreme = reduce.reduceat(np.where(missing, fill, values), starts)
+        all_missing = np.logical_and.reduceat(missing, starts)
+        return np.where(all_missing, np.nan, extreme)
+    
+    @staticmethod
+    def _datetime_extreme(values, starts, op):
+        """Per-group NaT-ignoring min/max over int64 timestamps sorted by group"""
+        if not len(starts):
+            return np.array([], dtype='datetime64[ns]')
+        if op == 'max':
+            # NaT is the smallest int64, so it only wins when a group has no dates
+            return np.maximum.reduceat(values, starts).view('datetime64[ns]')
+        extreme = np.minimum.reduceat(np.where(values == NAT, INT64_MAX, values), starts)
+        return np.where(extreme == INT64_MAX, NAT, extreme).view('datetime64[ns]')
+    
+    @staticmethod
+    def _shares(series, col, levels, codes, counts):
+        """Fraction of each customer's lines per learned level; unseen levels count toward no share"""
+        level_codes = pd.Categorical(series, categories=levels).codes
+        seen = (codes >= 0) & (level_codes >= 0)
+        n_groups, n_levels = len(counts), len(levels)
+        table = np.bincount(
+            codes[seen].astype(np.int64) * n_levels + level_codes[seen], minlength=n_groups * n_levels
+        ).reshape(n_groups, n_levels)
+        shares = table / np.maximum(counts, 1)[:, None]
+        return {f"{col}_share_{level}": shares[:, j] for j, level in enumerate(levels)}
@@ -1,14 +1,13 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from utils.logger import Logger
+from utils.logger import Logger, lazy
 from utils.timer import Timer
 
 class DataSplitter:
     """Split data before any transformations to prevent leakage"""
     
     def __init__(self, config):
-        self.logger = Logger().get_logger()
+        self.logger = Logger().get_logger(__name__)
         self.config = config['data_split']
     
     @Timer.measure
@@ -25,6 +24,8 @@ class DataSplitter:
             random_state = self.config['random_state']
             stratify_col = self.config['stratify_column']
             
+            from sklearn.model_selection import train_test_split
+            
             total_size = len(df)
             self.logger.info(f"Total observations: {total_size}")
             
@@ -60,13 +61,11 @@ class DataSplitter:
     def _validate_split(self, full, train, dev, test, stratify_col):
         """Validate class distribution across splits"""
         if stratify_col:
-            full_dist = full[stratify_col].value_counts(normalize=True)
-            train_dist = train[stratify_col].value_counts(normalize=True)
-            dev_dist = dev[stratify_col].value_counts(normalize=True)
-            test_dist = test[stratify_col].value_counts(normalize=True)
+            def distribution(df):
+                return df[stratify_col].value_counts(normalize=True).to_dict()
             
-            self.logger.info(f"Full dataset {stratify_col} distribution: {full_dist.to_dict()}")
-            self.logger.info(f"Train {stratify_col} distribution: {train_dist.to_dict()}")
-            self.logger.info(f"Dev {stratify_col} distribution: {dev_dist.to_dict()}")
-            self.logger.info(f"Test {stratify_col} distribution: {test_dist.to_dict()}")
+            self.logger.info("Full dataset %s distribution: %s", stratify_col, lazy(distribution, full))
+            self.logger.info("Train %s distribution: %s", stratify_col, lazy(distribution, train))
+            self.logger.info("Dev %s distribution: %s", stratify_col, lazy(distribution, dev))
+            self.logger.info("Test %s distribution: %s", stratify_col, lazy(distribution, test))
 
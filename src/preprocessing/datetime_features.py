@@ -2,12 +2,13 @@ import pandas as pd
 import numpy as np
 from utils.logger import Logger
 from utils.timer import Timer
+from preprocessing.stage_scheduler import StageNode
 
 class DatetimeFeatureExtractor:
     """Extract datetime features with cyclical encoding"""
     
     def __init__(self, config):
-        self.logger = Logger().get_logger()
+        self.logger = Logger().get_logger(__name__)
         self.config = config['datetime']
     
     @Timer.measure
@@ -23,26 +24,8 @@ class DatetimeFeatureExtractor:
                     self.logger.warning(f"Column {col} not found")
                     continue
                 
-                df[col] = pd.to_datetime(df[col], errors='coerce')
-                
-                # Basic temporal components
-                df[f'Year_{col}'] = df[col].dt.year
-                df[f'Month_{col}'] = df[col].dt.month
-                df[f'Day_{col}'] = df[col].dt.day
-                df[f'Quarter_{col}'] = df[col].dt.quarter
-                df[f'Hour_{col}'] = df[col].dt.hour
-                df[f'Minute_{col}'] = df[col].dt.minute
-                df[f'Seconds_{col}'] = df[col].dt.second
-                df[f'DayOfWeek_{col}'] = df[col].dt.dayofweek
-                df[f'WeekOfYear_{col}'] = df[col].dt.isocalendar().week
-                
-                # Binary features
-                df[f'Is_weekend_{col}'] = (df[col].dt.dayofweek > 4).astype(int)
-                df[f'Is_night_{col}'] = (df[col].dt.hour > 17).astype(int)
-                
-                # Cyclical encoding
-                if self.config['cyclical_encoding']:
-                    df = self._add_cyclical_features(df, col)
+                for name, values in self._column_features(df[col], col).items():
+                    df[name] = values
             
             self.logger.info("Datetime feature extraction completed")
             return df
@@ -51,20 +34,74 @@ class DatetimeFeatureExtractor:
             self.logger.error(f"Error extracting datetime features: {e}")
             raise
     
-    def _add_cyclical_features(self, df, col):
+    def get_stages(self, df, fit=True):
+        """One scheduler node per datetime column"""
+        stages = []
+        for col in self.config['datetime_columns']:
+            if col not in df.columns:
+                self.logger.warning(f"Column {col} not found")
+                continue
+            
+            stages.append(StageNode(
+                f'datetime[{col}]',
+                lambda frame, col=col: self._column_features(frame[col], col),
+                reads=[col],
+                writes=self._feature_names(col)
+            ))
+        return stages
+    
+    def _feature_names(self, col):
+        """Names written for one datetime column, in output order"""
+        names = [col] + [
+            f'{part}_{col}' for part in
+            ['Year', 'Month', 'Day', 'Quarter', 'Hour', 'Minute', 'Seconds', 'DayOfWeek', 'WeekOfYear',
+             'Is_weekend', 'Is_night']
+        ]
+        if self.config['cyclical_encoding']:
+            names += [f'{part}_{col}_{fn}' for part in ['Month', 'DayOfWeek', 'Hour'] for fn in ['sin', 'cos']]
+        return names
+    
+    def _column_features(self, series, col):
+        """Compute all features for one datetime column"""
+        dates = pd.to_datetime(series, errors='coerce')
+        features = {col: dates}
+        
+        # Basic temporal components
+        features[f'Year_{col}'] = dates.dt.year
+        features[f'Month_{col}'] = dates.dt.month
+        features[f'Day_{col}'] = dates.dt.day
+        features[f'Quarter_{col}'] = dates.dt.quarter
+        features[f'Hour_{col}'] = dates.dt.hour
+        features[f'Minute_{col}'] = dates.dt.minute
+        features[f'Seconds_{col}'] = dates.dt.second
+        features[f'DayOfWeek_{col}'] = dates.dt.dayofweek
+        features[f'WeekOfYear_{col}'] = dates.dt.isocalendar().week
+        
+        # Binary features
+        features[f'Is_weekend_{col}'] = (dates.dt.dayofweek > 4).astype(int)
+        features[f'Is_night_{col}'] = (dates.dt.hour > 17).astype(int)
+        
+        # Cyclical encoding
+        if self.config['cyclical_encoding']:
+            features.update(self._cyclical_features(features, col))
+        
+        return features
+    
+    def _cyclical_features(self, features, col):
         """Add sin/cos cyclical encoding for circular features"""
         cyclical_config = self.config['cyclical_columns']
+        cyclical = {}
         
         # Month cyclical (12 months)
-        df[f'Month_{col}_sin'] = np.sin(2 * np.pi * df[f'Month_{col}'] / cyclical_config['month'])
-        df[f'Month_{col}_cos'] = np.cos(2 * np.pi * df[f'Month_{col}'] / cyclical_config['month'])
+        cyclical[f'Month_{col}_sin'] = np.sin(2 * np.pi * features[f'Month_{col}'] / cyclical_config['month'])
+        cyclical[f'Month_{col}_cos'] = np.cos(2 * np.pi * features[f'Month_{col}'] / cyclical_config['month'])
         
         # Day of week cyclical (7 days)
-        df[f'DayOfWeek_{col}_sin'] = np.sin(2 * np.pi * df[f'DayOfWeek_{col}'] / cyclical_config['day_of_week'])
-        df[f'DayOfWeek_{col}_cos'] = np.cos(2 * np.pi * df[f'DayOfWeek_{col}'] / cyclical_config['day_of_week'])
+        cyclical[f'DayOfWeek_{col}_sin'] = np.sin(2 * np.pi * features[f'DayOfWeek_{col}'] / cyclical_config['day_of_week'])
+        cyclical[f'DayOfWeek_{col}_cos'] = np.cos(2 * np.pi * features[f'DayOfWeek_{col}'] / cyclical_config['day_of_week'])
         
         # Hour cyclical (24 hours)
-        df[f'Hour_{col}_sin'] = np.sin(2 * np.pi * df[f'Hour_{col}'] / cyclical_config['hour'])
-        df[f'Hour_{col}_cos'] = np.cos(2 * np.pi * df[f'Hour_{col}'] / cyclical_config['hour'])
+        cyclical[f'Hour_{col}_sin'] = np.sin(2 * np.pi * features[f'Hour_{col}'] / cyclical_config['hour'])
+        cyclical[f'Hour_{col}_cos'] = np.cos(2 * np.pi * features[f'Hour_{col}'] / cyclical_config['hour'])
         
-        return df
\ No newline at end of file
+        return cyclical
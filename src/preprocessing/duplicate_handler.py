@@ -1,12 +1,13 @@
 import pandas as pd
 from utils.logger import Logger
 from utils.timer import Timer
+from utils.metrics import MetricsRegistry
 
 class DuplicateHandler:
     """Handle duplicate rows"""
     
     def __init__(self, config):
-        self.logger = Logger().get_logger()
+        self.logger = Logger().get_logger(__name__)
         self.config = config['duplicates']
     
     @Timer.measure
@@ -18,6 +19,9 @@ class DuplicateHandler:
             if self.config['check_duplicates']:
                 duplicates_count = df.duplicated().sum()
                 self.logger.info(f"Exact duplicates found: {duplicates_count}")
+                MetricsRegistry().counter(
+                    'rows_dropped_total', 'Rows removed by cleaning rules', rule='duplicates:exact'
+                ).inc(int(duplicates_count))
                 
                 if duplicates_count > 0:
                     df = df.drop_duplicates()
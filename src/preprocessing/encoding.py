@@ -1,14 +1,54 @@
 import pandas as pd
+import numpy as np
 from utils.logger import Logger
 from utils.timer import Timer
+from preprocessing.stage_scheduler import StageNode
+
+# Odd 64-bit constant (golden ratio) to spread hashed values before taking buckets
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def hash_features(df, columns, n_buckets):
+    """
+    Signed feature hashing of `columns` into one (rows, n_buckets) CSR matrix.
+    Values are hashed with pandas' fixed-key hash mixed with the column name,
+    so the mapping is the same in every process and needs no vocabulary.
+    Missing values contribute nothing; colliding entries are summed.
+    """
+    from scipy import sparse
+    
+    rows, buckets, signs = [], [], []
+    for col in columns:
+        present = df[col].notna().to_numpy()
+        seed = pd.util.hash_array(np.array([col], dtype=object))[0]
+        hashed = (pd.util.hash_pandas_object(df[col], index=False).to_numpy()[present] ^ seed) * HASH_MULTIPLIER
+        rows.append(np.flatnonzero(present))
+        buckets.append((hashed >> np.uint64(33)) % np.uint64(n_buckets))
+        signs.append(np.where((hashed >> np.uint64(32)) & np.uint64(1), -1.0, 1.0).astype(np.float32))
+    
+    if not rows:
+        return sparse.csr_matrix((len(df), n_buckets), dtype=np.float32)
+    matrix = sparse.csr_matrix(
+        (np.concatenate(signs), (np.concatenate(rows), np.concatenate(buckets).astype(np.int64))),
+        shape=(len(df), n_buckets)
+    )
+    matrix.sum_duplicates()
+    matrix.eliminate_zeros()
+    return matrix
 
 class FeatureEncoder:
     """Encode categorical features"""
     
     def __init__(self, config):
-        self.logger = Logger().get_logger()
+        self.logger = Logger().get_logger(__name__)
         self.config = config['encoding']
-        self.encoding_cache = {}  # Cache frequency/target mappings
+        self.encoding_cache = {}  # Cache one-hot levels and frequency/target mappings
+        self.hashing_columns = self.config.get('hashing_columns', [])
+        self.hashing_buckets = self.config.get('hashing_buckets', 1024)
+        self.target_col = self.config.get('target_column')
+        self.smoothing = self.config.get('target_smoothing', 20)
+        self.n_folds = self.config.get('target_folds', 5)
+        self.random_state = self.config.get('target_random_state', 42)
     
     @Timer.measure
     def encode_features(self, df, fit=True):
@@ -16,6 +56,7 @@ class FeatureEncoder:
         Apply encoding strategies:
         - One-hot for low cardinality
         - Frequency for high cardinality
+        - Label codes and out-of-fold smoothed target means
         """
         try:
             self.logger.info("Encoding categorical features...")
@@ -26,6 +67,10 @@ class FeatureEncoder:
             # Frequency encoding
             df = self._frequency_encode(df, fit)
             
+            # Label and target encoding share the fitted level codes
+            df = self._code_encode(df, 'label', fit)
+            df = self._code_encode(df, 'target', fit)
+            
             self.logger.info("Feature encoding completed")
             return df
         
@@ -33,6 +78,46 @@ class FeatureEncoder:
             self.logger.error(f"Error encoding features: {e}")
             raise
     
+    def get_stages(self, df, fit=True):
+        """One scheduler node per encoded column"""
+        stages = []
+        
+        for col in self.config['one_hot_columns']:
+            if col not in df.columns:
+                self.logger.warning(f"Column {col} not found for one-hot encoding")
+                continue
+            stages.append(StageNode(
+                f'one_hot[{col}]',
+                lambda frame, col=col: self._one_hot_features(frame[col], col, fit),
+                reads=[col],
+                writes=[f'{col}_*'],  # dummy names depend on the fitted levels
+                drops=[col]
+            ))
+        
+        for col in self.config['frequency_columns']:
+            if col not in df.columns:
+                self.logger.warning(f"Column {col} not found for frequency encoding")
+                continue
+            stages.append(StageNode(
+                f'frequency[{col}]',
+                lambda frame, col=col: self._frequency_features(frame[col], col, fit),
+                reads=[col],
+                writes=[f'{col}_frequency'],
+                drops=[col]
+            ))
+        
+        for kind in ('label', 'target'):
+            for col in self._code_columns(df, kind, fit):
+                stages.append(StageNode(
+                    f'{kind}[{col}]',
+                    lambda frame, col=col, kind=kind: self._code_features(frame, col, kind, fit),
+                    reads=[col, self.target_col] if kind == 'target' and fit else [col],
+                    writes=[f'{col}_{kind}'],
+                    drops=[col]
+                ))
+        
+        return stages
+    
     def _one_hot_encode(self, df, fit=True):
         """One-hot encode low cardinality features"""
         try:
@@ -43,11 +128,9 @@ class FeatureEncoder:
                     self.logger.warning(f"Column {col} not found for one-hot encoding")
                     continue
                 
-                dummies = pd.get_dummies(df[col], prefix=col, drop_first=True, dtype=int)
+                dummies = pd.DataFrame(self._one_hot_features(df[col], col, fit), index=df.index)
                 df = pd.concat([df, dummies], axis=1)
                 df = df.drop(columns=[col])
-                
-                self.logger.debug(f"One-hot encoded {col} into {len(dummies.columns)} features")
             
             return df
         
@@ -55,6 +138,19 @@ class FeatureEncoder:
             self.logger.error(f"Error in one-hot encoding: {e}")
             raise
     
+    def _one_hot_features(self, series, col, fit=True):
+        """
+        Dummy columns for one feature as a name -> Series mapping. Levels are
+        learned on the training split, so every later frame gets the same
+        columns and drops the same first level; unseen levels encode as all 0.
+        """
+        if fit or f"{col}_one_hot" not in self.encoding_cache:
+            self.encoding_cache[f"{col}_one_hot"] = pd.Index(pd.unique(series.dropna())).sort_values()
+        levels = series.astype(pd.CategoricalDtype(self.encoding_cache[f"{col}_one_hot"]))
+        dummies = pd.get_dummies(levels, prefix=col, drop_first=True, dtype=int)
+        self.logger.debug(f"One-hot encoded {col} into {len(dummies.columns)} features")
+        return {name: dummies[name] for name in dummies.columns}
+    
     def _frequency_encode(self, df, fit=True):
         """Frequency encode high cardinality features"""
         try:
@@ -65,15 +161,8 @@ class FeatureEncoder:
                     self.logger.warning(f"Column {col} not found for frequency encoding")
                     continue
                 
-                if fit:
-                    freq_map = df[col].value_counts(normalize=True).to_dict()
-                    self.encoding_cache[f"{col}_freq"] = freq_map
-                
-                freq_map = self.encoding_cache.get(f"{col}_freq", {})
-                feature_name = f"{col}_frequency"
-                df[feature_name] = df[col].map(freq_map)
-                
-                self.logger.debug(f"Frequency encoded {col}")
+                for name, values in self._frequency_features(df[col], col, fit).items():
+                    df[name] = values
                 df = df.drop(columns=[col])
             
             return df
@@ -81,3 +170,122 @@ class FeatureEncoder:
         except Exception as e:
             self.logger.error(f"Error in frequency encoding: {e}")
             raise
+    
+    def _code_columns(self, df, kind, fit=True):
+        """Configured label/target columns present in `df`"""
+        columns = self.config.get(f'{kind}_encoding_columns') or []
+        if kind == 'target' and columns and fit and self.target_col not in df.columns:
+            self.logger.warning(f"Target column {self.target_col} not found for target encoding")
+            return []
+        
+        present = []
+        for col in columns:
+            if col not in df.columns:
+                self.logger.warning(f"Column {col} not found for {kind} encoding")
+                continue
+            present.append(col)
+        return present
+    
+    def _code_encode(self, df, kind, fit=True):
+        """Replace each label/target column by its encoded feature"""
+        try:
+            for col in self._code_columns(df, kind, fit):
+                for name, values in self._code_features(df, col, kind, fit).items():
+                    df[name] = values
+                df = df.drop(columns=[col])
+            return df
+        
+        except Exception as e:
+            self.logger.error(f"Error in {kind} encoding: {e}")
+            raise
+    
+    def _level_codes(self, series, col, fit=True):
+        """Integer level codes learned on the training split; unseen and missing levels are -1"""
+        if fit or f"{col}_levels" not in self.encoding_cache:
+            codes, levels = pd.factorize(series, sort=True)
+            self.encoding_cache[f"{col}_levels"] = pd.Index(levels)
+            return codes
+        return self.encoding_cache[f"{col}_levels"].get_indexer(series)
+    
+    def _code_features(self, df, col, kind, fit=True):
+        """Label or target feature for one column as a name -> Series mapping"""
+        codes = self._level_codes(df[col], col, fit)
+        if kind == 'label':
+            values = codes
+        elif fit:
+            target = df[self.target_col].to_numpy(dtype=np.float64, na_value=np.nan)
+            values = self._fit_target_encoding(codes, target, col)
+        else:
+            encoding = self.encoding_cache[f"{col}_target"]
+            values = np.where(codes >= 0, encoding[codes], self.encoding_cache[f"{col}_prior"])
+        
+        self.logger.debug(f"{kind.capitalize()} encoded {col}")
+        return {f"{col}_{kind}": pd.Series(values, index=df.index)}
+    
+    def _fit_target_encoding(self, codes, target, col):
+        """
+        Smoothed target mean per level, (sum + m * prior) / (count + m).
+        The full-training encoding is cached for transform; training rows get
+        the encoding computed without their own fold, so no row sees its label.
+        """
+        n_levels = len(self.encoding_cache[f"{col}_levels"])
+        labelled = ~np.isnan(target)
+        y = np.where(labelled, target, 0.0)
+        seen = (codes >= 0) & labelled
+        
+        # Folds fixed by the seed, so refits on the same rows are reproducible
+        folds = np.random.default_rng(self.random_state).permutation(len(codes)) % self.n_folds
+        
+        # (fold, level) sums and counts in one bincount each
+        cells = folds[seen] * n_levels + codes[seen]
+        fold_sums = np.bincount(cells, weights=y[seen], minlength=self.n_folds * n_levels).reshape(self.n_folds, n_levels)
+        fold_counts = np.bincount(cells, minlength=self.n_folds * n_levels).reshape(self.n_folds, n_levels)
+        sums, counts = fold_sums.sum(axis=0), fold_counts.sum(axis=0)
+        
+        prior = y[labelled].sum() / max(labelled.sum(), 1)
+        self.encoding_cache[f"{col}_target"] = (sums + self.smoothing * prior) / (counts + self.smoothing)
+        self.encoding_cache[f"{col}_prior"] = prior
+        
+        # Out-of-fold: everything except the row's own fold
+        fold_y = np.bincount(folds[labelled], weights=y[labelled], minlength=self.n_folds)
+        fold_n = np.bincount(folds[labelled], minlength=self.n_folds)
+        fold_prior = (y[labelled].sum() - fold_y) / np.maximum(labelled.sum() - fold_n, 1)
+        row_prior = fold_prior[folds]
+        level = np.clip(codes, 0, None)
+        oof_sums = sums[level] - fold_sums[folds, level]
+        oof_counts = counts[level] - fold_counts[folds, level]
+        encoded = (oof_sums + self.smoothing * row_prior) / (oof_counts + self.smoothing)
+        return np.where(codes >= 0, encoded, row_prior)
+    
+    @Timer.measure
+    def hash_encode(self, df):
+        """
+        Hashing-trick encoding of high-cardinality columns as a sparse CSR matrix
+        Stateless, so dev/test/scoring need nothing fitted and it serializes for free
+        """
+        try:
+            columns = [col for col in self.hashing_columns if col in df.columns]
+            missing = [col for col in self.hashing_columns if col not in df.columns]
+            if missing:
+                self.logger.warning(f"Columns {missing} not found for hashing")
+            
+            matrix = hash_features(df, columns, self.hashing_buckets)
+            self.logger.info(
+                f"Hashed {columns} into {self.hashing_buckets} buckets: {matrix.nnz} non-zeros "
+                f"({matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes} bytes)"
+            )
+            return matrix
+        
+        except Exception as e:
+            self.logger.error(f"Error in hashing encoding: {e}")
+            raise
+    
+    def _frequency_features(self, series, col, fit=True):
+        """Frequency feature for one column as a name -> Series mapping"""
+        if fit:
+            freq_map = series.value_counts(normalize=True)
+            self.encoding_cache[f"{col}_freq"] = freq_map
+        
+        freq_map = self.encoding_cache.get(f"{col}_freq", pd.Series(dtype=float))
+        self.logger.debug(f"Frequency encoded {col}")
+        return {f"{col}_frequency": series.map(freq_map)}
@@ -1,12 +1,13 @@
 import pandas as pd
 from utils.logger import Logger
 from utils.timer import Timer
+from preprocessing.stage_scheduler import StageNode
 
 class FeatureEngineer:
     """Create derived features via aggregations"""
     
     def __init__(self, config):
-        self.logger = Logger().get_logger()
+        self.logger = Logger().get_logger(__name__)
         self.config = config['feature_engineering']
         self.aggregation_cache = {}  # Cache computed aggregations from training
     
@@ -19,7 +20,7 @@ class FeatureEngineer:
         try:
             self.logger.info("Feature engineering...")
             
-            for agg in self.config['aggregations']:
+            for agg in self._available(df):
                 if agg['type'] == 'groupby':
                     df = self._groupby_aggregation(df, agg, fit)
                 elif agg['type'] == 'count':
@@ -32,67 +33,110 @@ class FeatureEngineer:
             self.logger.error(f"Error in feature engineering: {e}")
             raise
     
+    def get_stages(self, df, fit=True):
+        """One scheduler node per configured aggregation"""
+        stages = []
+        for agg in self._available(df):
+            col, agg_col = agg['column'], agg['agg_col']
+            if agg['type'] == 'groupby':
+                stages.append(StageNode(
+                    f"groupby[{col}.{agg_col}]",
+                    lambda frame, agg=agg: self._groupby_features(frame, agg, fit),
+                    reads=[col, agg_col],
+                    writes=[f"{op}_{col}_{agg_col}" for op in agg['operations']]
+                ))
+            elif agg['type'] == 'count':
+                stages.append(StageNode(
+                    f"count[{col}.{agg_col}]",
+                    lambda frame, agg=agg: self._count_features(frame, agg, fit),
+                    reads=[col],
+                    writes=[f"{col}_count_{agg_col}"]
+                ))
+        return stages
+    
+    def _available(self, df):
+        """Configured aggregations whose columns are present (e.g. not rolled up away)"""
+        available = []
+        for agg in self.config['aggregations']:
+            needed = [agg['column']] + ([agg['agg_col']] if agg['type'] == 'groupby' else [])
+            missing = [col for col in needed if col not in df.columns]
+            if missing:
+                self.logger.warning(f"Columns {missing} not found for {agg['type']} aggregation")
+                continue
+            available.append(agg)
+        return available
+    
     def _groupby_aggregation(self, df, agg_config, fit=True):
         """Create groupby aggregation features"""
         try:
-            col = agg_config['column']
-            agg_col = agg_config['agg_col']
-            operations = agg_config['operations']
-            
-            cache_key = f"{col}_{agg_col}"
-            
-            if fit:
-                # Compute aggregations from training data
-                agg_dict = {}
-                for op in operations:
-                    feature_name = f"{op}_{col}_{agg_col}"
-                    agg_dict[op] = (agg_col, op)
-                    
-                    result = df.groupby(col)[agg_col].agg(op).to_dict()
-                    self.aggregation_cache[f"{cache_key}_{op}"] = result
-                    
-                    df[feature_name] = df[col].map(result)
-                    self.logger.debug(f"Created feature: {feature_name}")
-            else:
-                # Apply cached aggregations to dev/test
-                for op in operations:
-                    feature_name = f"{op}_{col}_{agg_col}"
-                    cache_key_op = f"{cache_key}_{op}"
-                    
-                    if cache_key_op in self.aggregation_cache:
-                        df[feature_name] = df[col].map(self.aggregation_cache[cache_key_op])
-                    else:
-                        self.logger.warning(f"Cache miss for {cache_key_op}")
-            
+            for name, values in self._groupby_features(df, agg_config, fit).items():
+                df[name] = values
             return df
         
         except Exception as e:
             self.logger.error(f"Error in groupby aggregation: {e}")
             raise
     
+    def _groupby_features(self, df, agg_config, fit=True):
+        """Compute groupby aggregation features as a name -> Series mapping"""
+        col = agg_config['column']
+        agg_col = agg_config['agg_col']
+        operations = agg_config['operations']
+        
+        cache_key = f"{col}_{agg_col}"
+        features = {}
+        
+        if fit:
+            # Compute aggregations from training data
+            for op in operations:
+                feature_name = f"{op}_{col}_{agg_col}"
+                
+                # Kept as a Series: map() then does an index lookup and preserves the dtype backend
+                result = df.groupby(col)[agg_col].agg(op)
+                self.aggregation_cache[f"{cache_key}_{op}"] = result
+                
+                features[feature_name] = df[col].map(result)
+                self.logger.debug(f"Created feature: {feature_name}")
+        else:
+            # Apply cached aggregations to dev/test
+            for op in operations:
+                feature_name = f"{op}_{col}_{agg_col}"
+                cache_key_op = f"{cache_key}_{op}"
+                
+                if cache_key_op in self.aggregation_cache:
+                    features[feature_name] = df[col].map(self.aggregation_cache[cache_key_op])
+                else:
+                    self.logger.warning(f"Cache miss for {cache_key_op}")
+        
+        return features
+    
     def _count_aggregation(self, df, agg_config, fit=True):
         """Create count aggregation features"""
         try:
-            col = agg_config['column']
-            agg_col = agg_config['agg_col']
-            feature_name = f"{col}_count_{agg_col}"
-            
-            cache_key = feature_name
-            
-            if fit:
-                result = df.groupby(col).size().to_dict()
-                self.aggregation_cache[cache_key] = result
-                df[feature_name] = df[col].map(result)
-                self.logger.debug(f"Created feature: {feature_name}")
-            else:
-                if cache_key in self.aggregation_cache:
-                    df[feature_name] = df[col].map(self.aggregation_cache[cache_key])
-                else:
-                    self.logger.warning(f"Cache miss for {cache_key}")
-            
+            for name, values in self._count_features(df, agg_config, fit).items():
+                df[name] = values
             return df
         
         except Exception as e:
             self.logger.error(f"Error in count aggregation: {e}")
             raise
-
+    
+    def _count_features(self, df, agg_config, fit=True):
+        """Compute count aggregation features as a name -> Series mapping"""
+        col = agg_config['column']
+        agg_col = agg_config['agg_col']
+        feature_name = f"{col}_count_{agg_col}"
+        
+        cache_key = feature_name
+        
+        if fit:
+            result = df.groupby(col).size()
+            self.aggregation_cache[cache_key] = result
+            self.logger.debug(f"Created feature: {feature_name}")
+            return {feature_name: df[col].map(result)}
+        
+        if cache_key in self.aggregation_cache:
+            return {feature_name: df[col].map(self.aggregation_cache[cache_key])}
+        
+        self.logger.warning(f"Cache miss for {cache_key}")
+        return {}
@@ -1,14 +1,16 @@
 
+import logging
 import pandas as pd
 import numpy as np
 from utils.logger import Logger
 from utils.timer import Timer
+from utils.metrics import MetricsRegistry
 
 class MissingHandler:
     """Handle missing values"""
     
     def __init__(self, config):
-        self.logger = Logger().get_logger()
+        self.logger = Logger().get_logger(__name__)
         self.config = config['missing_values']
         self.drop_columns = self.config['drop_columns']
     
@@ -26,16 +28,22 @@ class MissingHandler:
             # Drop rows with Customer ID null
             for col in self.drop_columns:
                 if col in df.columns:
+                    before = len(df)
                     df = df.dropna(subset=[col])
+                    MetricsRegistry().counter(
+                        'rows_dropped_total', 'Rows removed by cleaning rules', rule=f'missing:{col}'
+                    ).inc(before - len(df))
                     self.logger.info(f"Dropped rows with null {col}: {initial_rows - len(df)} rows removed")
             
             self.logger.info(f"Handling missing values - After: {len(df)} rows")
             
-            missing_summary = df.isnull().sum()
-            if missing_summary.sum() > 0:
-                self.logger.warning(f"Remaining missing values:\n{missing_summary[missing_summary > 0]}")
-            else:
-                self.logger.info("No missing values remaining")
+            # The per-column summary is a full scan, so only build it if it will be emitted
+            if self.logger.isEnabledFor(logging.WARNING):
+                missing_summary = df.isnull().sum()
+                if missing_summary.sum() > 0:
+                    self.logger.warning("Remaining missing values:\n%s", missing_summary[missing_summary > 0])
+                else:
+                    self.logger.info("No missing values remaining")
             
             return df
         
@@ -2,12 +2,13 @@ import pandas as pd
 import numpy as np
 from utils.logger import Logger
 from utils.timer import Timer
+from preprocessing.stage_scheduler import StageNode
 
 class OutlierHandler:
     """Flag outliers without removing them"""
     
     def __init__(self, config):
-        self.logger = Logger().get_logger()
+        self.logger = Logger().get_logger(__name__)
         self.config = config['outliers']
         self.outlier_bounds = {}  # Store bounds from training set
     
@@ -27,9 +28,7 @@ class OutlierHandler:
                 self.outlier_bounds = self._compute_bounds(df, numeric_cols)
             
             df = self._flag_outliers(df, numeric_cols)
-            
-            outlier_count = (df['is_outlier'] == 1).sum()
-            self.logger.info(f"Rows flagged as outliers: {outlier_count} ({outlier_count/len(df)*100:.2f}%)")
+            self._log_outlier_count(df['is_outlier'])
             
             return df
         
@@ -37,6 +36,23 @@ class OutlierHandler:
             self.logger.error(f"Error handling outliers: {e}")
             raise
     
+    def get_stages(self, df, fit=True):
+        """Describe outlier flagging as a scheduler node"""
+        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+        
+        def flag(frame):
+            if fit:
+                self.outlier_bounds = self._compute_bounds(frame, numeric_cols)
+            is_outlier = self._outlier_flags(frame, numeric_cols)
+            self._log_outlier_count(is_outlier)
+            return {'is_outlier': is_outlier}
+        
+        return [StageNode('outliers', flag, reads=numeric_cols, writes=['is_outlier'])]
+    
+    def _log_outlier_count(self, is_outlier):
+        outlier_count = (is_outlier == 1).sum()
+        self.logger.info(f"Rows flagged as outliers: {outlier_count} ({outlier_count/len(is_outlier)*100:.2f}%)")
+    
     def _compute_bounds(self, df, numeric_cols):
         """Compute IQR bounds for each numeric column"""
         bounds = {}
@@ -56,6 +72,11 @@ class OutlierHandler:
     
     def _flag_outliers(self, df, numeric_cols):
         """Flag rows as outliers based on training bounds"""
+        df['is_outlier'] = self._outlier_flags(df, numeric_cols)
+        return df
+    
+    def _outlier_flags(self, df, numeric_cols):
+        """0/1 outlier indicator per row"""
         is_outlier = pd.Series(0, index=df.index)
         
         for col in numeric_cols:
@@ -65,8 +86,8 @@ class OutlierHandler:
             lower = self.outlier_bounds[col]['lower']
             upper = self.outlier_bounds[col]['upper']
             
-            col_outliers = (df[col] < lower) | (df[col] > upper)
+            # Nullable (pyarrow) comparisons yield NA for missing values; treat as not an outlier
+            col_outliers = ((df[col] < lower) | (df[col] > upper)).fillna(False)
             is_outlier = is_outlier | col_outliers.astype(int)
         
-        df['is_outlier'] = is_outlier
-        return df
\ No newline at end of file
+        return is_outlier
\ No newline at end of file
@@ -1,22 +1,22 @@
 import pandas as pd
-import joblib
 from pathlib import Path
 import yaml
 import warnings
 warnings.filterwarnings('ignore')
-import sys
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-
-from utils.logger import Logger
+from utils.logger import Logger, lazy
 from utils.timer import Timer
+from utils.tracing import Tracer
+from utils.metrics import MetricsRegistry
+from utils.concurrency import ConcurrencyGovernor
 from utils.file_utils import IOHandler
+from utils.dtypes import resolve_dtype_backend, memory_usage_mb
+from utils.dataset import load_dataset, share
 class PreprocessingPipeline:
     """Orchestrate all preprocessing steps"""
     
     def __init__(self, config):
-        self.logger = Logger().get_logger()
+        self.logger = Logger().get_logger(__name__)
         self.config = config
         self.io_handler = IOHandler(config['output']['processed_dir'])
         
@@ -25,21 +25,34 @@ class PreprocessingPipeline:
         from preprocessing.missing_handler import MissingHandler
         from preprocessing.business_logic import BusinessLogicHandler
         from preprocessing.duplicate_handler import DuplicateHandler
+        from preprocessing.customer_rollup import CustomerRollup
         from preprocessing.outlier_handler import OutlierHandler
         from preprocessing.datetime_features import DatetimeFeatureExtractor
         from preprocessing.feature_engineering import FeatureEngineer
+        from preprocessing.window_features import WindowFeatureEngineer
         from preprocessing.encoding import FeatureEncoder
         from preprocessing.transformations import FeatureTransformer
+        from preprocessing.stage_scheduler import StageScheduler
         
         self.splitter = DataSplitter(config)
         self.missing_handler = MissingHandler(config)
         self.business_logic = BusinessLogicHandler(config)
         self.duplicate_handler = DuplicateHandler(config)
+        self.rollup = CustomerRollup(config)
         self.outlier_handler = OutlierHandler(config)
         self.datetime_extractor = DatetimeFeatureExtractor(config)
         self.feature_engineer = FeatureEngineer(config)
+        self.window_features = WindowFeatureEngineer(config)
         self.encoder = FeatureEncoder(config)
         self.transformer = FeatureTransformer(config)
+        
+        scheduler_config = config.get('scheduler', {})
+        self.scheduler = (
+            StageScheduler(scheduler_config.get('max_workers', 4))
+            if scheduler_config.get('enabled', False) else None
+        )
+        self.execution_plans = {}
+        self.hashed_features = {}  # Split name -> sparse hashed block, row-aligned with the split
     
     @Timer.measure
     def fit_transform(self, df):
@@ -54,50 +67,48 @@ class PreprocessingPipeline:
             
             # Stage 0: Pre-split data cleaning (before split)
             self.logger.info("\n[Stage 0] Pre-split Data Cleaning...")
-            df = self.missing_handler.handle_missing(df)
-            df = self.business_logic.handle_business_logic(df)
-            df = self.duplicate_handler.handle_duplicates(df)
+            with Timer("Pre-split Cleaning"):
+                df = self.missing_handler.handle_missing(df)
+                df = self.business_logic.handle_business_logic(df)
+                df = self.duplicate_handler.handle_duplicates(df)
+            
+            # One row per customer, so the split below never puts a customer's lines in two sets
+            if self.rollup.enabled:
+                self.logger.info("\n[Stage 0] Rolling Up Lines to Customers...")
+                with Timer("Customer Rollup"):
+                    df = self.rollup.rollup(df, fit=True)
             
             # Stage 1: Split data
             self.logger.info("\n[Stage 1] Splitting Data...")
-            train_set, dev_set, test_set = self.splitter.split_data(df)
+            with Timer("Split"):
+                train_set, dev_set, test_set = self.splitter.split_data(df)
             
             # Stage 2: Fit transformers on training set
             self.logger.info("\n[Stage 2] Fitting Transformers on Training Data...")
-            train_set = self.outlier_handler.handle_outliers(train_set, fit=True)
-            train_set = self.datetime_extractor.extract_features(train_set, fit=True)
-            train_set = self.feature_engineer.engineer_features(train_set, fit=True)
-            train_set = self.encoder.encode_features(train_set, fit=True)
-            train_set = self.transformer.transform_features(train_set, fit=True)
-            train_set = self._drop_columns(train_set)
+            with Timer("Transform Train"):
+                train_set = self._transform_split(train_set, fit=True, name='train')
             
             # Stage 3: Transform dev set
             self.logger.info("\n[Stage 3] Transforming Dev Set...")
-            dev_set = self.outlier_handler.handle_outliers(dev_set, fit=False)
-            dev_set = self.datetime_extractor.extract_features(dev_set, fit=False)
-            dev_set = self.feature_engineer.engineer_features(dev_set, fit=False)
-            dev_set = self.encoder.encode_features(dev_set, fit=False)
-            dev_set = self.transformer.transform_features(dev_set, fit=False)
-            dev_set = self._drop_columns(dev_set)
+            with Timer("Transform Dev"):
+                dev_set = self._transform_split(dev_set, fit=False, name='dev')
             
             # Stage 4: Transform test set
             self.logger.info("\n[Stage 4] Transforming Test Set...")
-            test_set = self.outlier_handler.handle_outliers(test_set, fit=False)
-            test_set = self.datetime_extractor.extract_features(test_set, fit=False)
-            test_set = self.feature_engineer.engineer_features(test_set, fit=False)
-            test_set = self.encoder.encode_features(test_set, fit=False)
-            test_set = self.transformer.transform_features(test_set, fit=False)
-            test_set = self._drop_columns(test_set)
+            with Timer("Transform Test"):
+                test_set = self._transform_split(test_set, fit=False, name='test')
             
             # Stage 5: Validation
             self.logger.info("\n[Stage 5] Validating Data...")
-            self._validate_sets(train_set, dev_set, test_set)
+            with Timer("Validation"):
+                self._validate_sets(train_set, dev_set, test_set)
             
             # Stage 6: Save outputs
             self.logger.info("\n[Stage 6] Saving Outputs...")
-            self._save_datasets(train_set, dev_set, test_set)
-            self._save_pipeline()
-            # self._generate_report(train_set, dev_set, test_set)
+            with Timer("Save Outputs"):
+                self._save_datasets(train_set, dev_set, test_set)
+                self._save_pipeline()
+                # self._generate_report(train_set, dev_set, test_set)
             
             self.logger.info("=" * 80)
             self.logger.info("PREPROCESSING PIPELINE COMPLETED SUCCESSFULLY")
@@ -109,6 +120,73 @@ class PreprocessingPipeline:
             self.logger.error(f"Pipeline failed: {e}", exc_info=True)
             raise
     
+    @classmethod
+    def from_artifact(cls, pipeline_path):
+        """Rebuild a fitted pipeline from the file written by _save_pipeline"""
+        import joblib
+        
+        pipeline_obj = joblib.load(pipeline_path)
+        pipeline = cls(pipeline_obj['config'])
+        for name in ('rollup', 'outlier_handler', 'datetime_extractor', 'feature_engineer',
+                     'window_features', 'encoder', 'transformer'):
+            if name in pipeline_obj:
+                setattr(pipeline, name, pipeline_obj[name])
+        return pipeline
+    
+    @Timer.measure
+    def transform(self, df):
+        """
+        Transform new raw rows with the fitted pipeline (batch scoring).
+        Applies the row-level cleaning rules but not de-duplication, which is
+        only meaningful over the whole extract. Returns (frame, hashed block or
+        None); the frame keeps the input row labels, or is indexed by customer
+        key when the rollup is enabled.
+        """
+        try:
+            df = self.missing_handler.handle_missing(df, fit=False)
+            df = self.business_logic.handle_business_logic(df, fit=False)
+            if self.rollup.enabled:
+                df = self.rollup.rollup(df, fit=False)
+                df.index = pd.Index(df[self.rollup.key].to_numpy())
+            
+            self.hashed_features.pop('score', None)
+            df = self._transform_split(df, fit=False, name='score')
+            return df, self.hashed_features.pop('score', None)
+        
+        except Exception as e:
+            self.logger.error(f"Error transforming rows: {e}")
+            raise
+    
+    def _transform_split(self, df, fit, name):
+        """Run the column-level stages on one split, sequentially or via the scheduler"""
+        # Hashed from the raw columns first: one-hot, frequency, label and target
+        # encoding drop their source columns, which may also be hashing columns
+        if self.encoder.hashing_columns:
+            self.hashed_features[name] = self.encoder.hash_encode(df)
+        
+        if self.scheduler is None:
+            df = self.outlier_handler.handle_outliers(df, fit=fit)
+            df = self.datetime_extractor.extract_features(df, fit=fit)
+            df = self.feature_engineer.engineer_features(df, fit=fit)
+            if self.window_features.enabled:
+                df = self.window_features.engineer_features(df, fit=fit)
+            df = self.encoder.encode_features(df, fit=fit)
+            df = self.transformer.transform_features(df, fit=fit)
+        else:
+            nodes = []
+            for component in self._column_stages():
+                nodes.extend(component.get_stages(df, fit=fit))
+            df, self.execution_plans[name] = self.scheduler.run(df, nodes, name)
+        
+        return self._drop_columns(df)
+    
+    def _column_stages(self):
+        """Fitted components whose work is declared as scheduler nodes, in pipeline order"""
+        stages = [self.outlier_handler, self.datetime_extractor, self.feature_engineer]
+        if self.window_features.enabled:
+            stages.append(self.window_features)
+        return stages + [self.encoder, self.transformer]
+    
     def _drop_columns(self, df):
         """Drop columns specified in config"""
         cols_to_drop = self.config['columns_to_drop']
@@ -140,28 +218,26 @@ class PreprocessingPipeline:
                 self.logger.info("✓ No data leakage detected")
             
             # Check for missing values
-            train_missing = train.isnull().sum().sum()
-            dev_missing = dev.isnull().sum().sum()
-            test_missing = test.isnull().sum().sum()
+            def missing(df):
+                return df.isnull().sum().sum()
             
-            self.logger.info(f"Train missing values: {train_missing}")
-            self.logger.info(f"Dev missing values: {dev_missing}")
-            self.logger.info(f"Test missing values: {test_missing}")
+            self.logger.info("Train missing values: %s", lazy(missing, train))
+            self.logger.info("Dev missing values: %s", lazy(missing, dev))
+            self.logger.info("Test missing values: %s", lazy(missing, test))
             
             # Check shapes
-            self.logger.info(f"Train shape: {train.shape}")
-            self.logger.info(f"Dev shape: {dev.shape}")
-            self.logger.info(f"Test shape: {test.shape}")
+            self.logger.info("Train shape: %s", train.shape)
+            self.logger.info("Dev shape: %s", dev.shape)
+            self.logger.info("Test shape: %s", test.shape)
             
             # Check target distribution if target exists
             if 'Churn_Flag' in train.columns:
-                train_churn = train['Churn_Flag'].value_counts()
-                dev_churn = dev['Churn_Flag'].value_counts()
-                test_churn = test['Churn_Flag'].value_counts()
+                def churn(df):
+                    return df['Churn_Flag'].value_counts()
                 
-                self.logger.info(f"Train target distribution:\n{train_churn}")
-                self.logger.info(f"Dev target distribution:\n{dev_churn}")
-                self.logger.info(f"Test target distribution:\n{test_churn}")
+                self.logger.info("Train target distribution:\n%s", lazy(churn, train))
+                self.logger.info("Dev target distribution:\n%s", lazy(churn, dev))
+                self.logger.info("Test target distribution:\n%s", lazy(churn, test))
         
         except Exception as e:
             self.logger.error(f"Validation error: {e}")
@@ -174,6 +250,8 @@ class PreprocessingPipeline:
             self.io_handler.save_csv(train, splits_config['train'])
             self.io_handler.save_csv(dev, splits_config['dev'])
             self.io_handler.save_csv(test, splits_config['test'])
+            for split, matrix in self.hashed_features.items():
+                self.io_handler.save_sparse(matrix, f"{splits_config[split]}_hashed")
             
             self.logger.info("All datasets saved successfully")
         
@@ -189,15 +267,21 @@ class PreprocessingPipeline:
             
             # Create pipeline object with all fitted preprocessors
             pipeline_obj = {
+                'rollup': self.rollup,
                 'outlier_handler': self.outlier_handler,
                 'datetime_extractor': self.datetime_extractor,
                 'feature_engineer': self.feature_engineer,
+                'window_features': self.window_features,
                 'encoder': self.encoder,
                 'transformer': self.transformer,
                 'config': self.config
             }
             
+            import joblib
             joblib.dump(pipeline_obj, pipeline_path)
+            MetricsRegistry().counter(
+                'bytes_written_total', 'Bytes written to output files', format='joblib'
+            ).inc(pipeline_path.stat().st_size)
             self.logger.info(f"Pipeline saved to {pipeline_path}")
         
         except Exception as e:
@@ -209,38 +293,46 @@ def load_config(config_path='config/preprocessing_config.yaml'):
     try:
         with open(config_path, 'r') as f:
             config = yaml.safe_load(f)
-        Logger().get_logger().info(f"Configuration loaded from {config_path}")
+        Logger().get_logger(__name__).info(f"Configuration loaded from {config_path}")
         return config
     except Exception as e:
-        Logger().get_logger().error(f"Error loading config: {e}")
+        Logger().get_logger(__name__).error(f"Error loading config: {e}")
         raise
 
 
-def main():
-    """Main execution"""
+def main(config_path='config/preprocessing_config.yaml', df=None):
+    """Main execution (on `df` when a runner has already loaded the raw data)"""
     
-    logger = Logger().get_logger()
+    logger = Logger().get_logger(__name__)
     logger.info("=" * 80)
     logger.info("PRODUCTION PREPROCESSING PIPELINE")
     logger.info("=" * 80)
     
     try:
         # Load config
-        config = load_config()
+        config = load_config(config_path)
+        Logger().configure(config.get('logging'))
+        tracer = Tracer().configure(config.get('tracing'))
+        tracer.reset()
+        metrics = MetricsRegistry().configure(config.get('metrics'))
+        metrics.reset()
+        ConcurrencyGovernor().configure(config.get('concurrency'))
         
-        # Load raw data
-        io_handler = IOHandler()
-        df = io_handler.read_csv(
-            config['data']['file_path'],
-            encoding=config['data']['encoding']
-        )
-        
-        logger.info(f"Raw data shape: {df.shape}")
-        
-        # Initialize and run pipeline
-        pipeline = PreprocessingPipeline(config)
-        train_set, dev_set, test_set = pipeline.fit_transform(df)
+        with Timer("Preprocessing"):
+            # Load raw data, unless the runner already shares a loaded frame
+            dtype_backend = resolve_dtype_backend(config)
+            df = load_dataset(config['data'], dtype_backend) if df is None else share(df)
+            
+            logger.info(f"Raw data shape: {df.shape} ({dtype_backend} dtypes, {memory_usage_mb(df)} MB)")
+            
+            # Initialize and run pipeline
+            pipeline = PreprocessingPipeline(config)
+            train_set, dev_set, test_set = pipeline.fit_transform(df)
         
+        for split, frame in zip(('train', 'dev', 'test'), (train_set, dev_set, test_set)):
+            metrics.gauge('split_rows', 'Rows per output split', split=split).set(len(frame))
+        tracer.write_reports('preprocessing')
+        metrics.write_snapshot('preprocessing')
         logger.info("Preprocessing completed successfully!")
         
         return train_set, dev_set, test_set
@@ -248,6 +340,3 @@ def main():
     except Exception as e:
         logger.error(f"Pipeline execution failed: {e}", exc_info=True)
         raise
-
-if __name__ == '__main__':
-    train, dev, test = main()
\ No newline at end of file
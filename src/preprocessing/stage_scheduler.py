@@ -0,0 +1,164 @@
+import time
+import contextvars
+from fnmatch import fnmatchcase
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import pandas as pd
+from utils.logger import Logger
+from utils.timer import Timer
+from utils.tracing import Tracer
+from utils.metrics import MetricsRegistry
+from utils.concurrency import ConcurrencyGovernor
+
+
+class StageNode:
+    """
+    Column-level unit of work with declared inputs and outputs.
+    `func` receives a frame holding only `reads` and returns a mapping
+    of output column -> Series. `writes` may contain glob patterns
+    (e.g. 'Gender_*') for outputs whose names depend on the data.
+    """
+
+    def __init__(self, name, func, reads, writes, drops=()):
+        self.name = name
+        self.func = func
+        self.reads = list(reads)
+        self.writes = list(writes)
+        self.drops = list(drops)
+        self.depends_on = []
+        self.start = None
+        self.duration = None
+        self.outputs = []
+
+    def touches(self):
+        return self.writes + self.drops
+
+
+def _overlaps(names, others):
+    """True if any column name/pattern in `names` can refer to a column in `others`"""
+    for a in names:
+        for b in others:
+            if a == b or fnmatchcase(a, b) or fnmatchcase(b, a):
+                return True
+    return False
+
+
+class ExecutionPlan:
+    """Dependency graph of stage nodes with per-node timings"""
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.by_name = {node.name: node for node in nodes}
+        self._build_edges()
+
+    def _build_edges(self):
+        """Order nodes on read-after-write, write-after-read and write-after-write hazards"""
+        for j, node in enumerate(self.nodes):
+            for earlier in self.nodes[:j]:
+                raw = _overlaps(node.reads + node.touches(), earlier.touches())
+                war = _overlaps(node.touches(), earlier.reads)
+                if raw or war:
+                    node.depends_on.append(earlier.name)
+
+    def critical_path(self):
+        """Longest chain of dependent nodes by measured duration"""
+        finish, parent = {}, {}
+        for node in self.nodes:
+            best = None
+            for dep in node.depends_on:
+                if best is None or finish[dep] > finish[best]:
+                    best = dep
+            parent[node.name] = best
+            finish[node.name] = (finish[best] if best else 0.0) + (node.duration or 0.0)
+
+        if not finish:
+            return []
+        name = max(finish, key=finish.get)
+        path = []
+        while name:
+            path.append(name)
+            name = parent[name]
+        return path[::-1]
+
+    def format(self):
+        """Render the plan as a text table"""
+        critical = set(self.critical_path())
+        width = max([len(node.name) for node in self.nodes] + [4])
+        lines = [f"{'node':<{width}}  {'start':>8}  {'seconds':>8}  cp  depends_on"]
+        for node in self.nodes:
+            start = f"{node.start:8.4f}" if node.start is not None else f"{'-':>8}"
+            duration = f"{node.duration:8.4f}" if node.duration is not None else f"{'-':>8}"
+            marker = ' *' if node.name in critical else '  '
+            deps = ', '.join(node.depends_on) or '-'
+            lines.append(f"{node.name:<{width}}  {start}  {duration}  {marker}  {deps}")
+        return '\n'.join(lines)
+
+
+class StageScheduler:
+    """Run independent stage nodes concurrently and assemble one frame"""
+
+    def __init__(self, max_workers=4):
+        self.logger = Logger().get_logger(__name__)
+        self.max_workers = max_workers
+
+    @Timer.measure
+    def run(self, df, nodes, name='split'):
+        """Execute nodes respecting dependencies; returns (frame, plan)"""
+        plan = ExecutionPlan(nodes)
+        state = {col: df[col] for col in df.columns}
+        pending = {node.name: set(node.depends_on) for node in nodes}
+        running = {}
+        origin = time.perf_counter()
+
+        def execute(node, frame):
+            with Tracer().span(node.name) as span:
+                node.start = time.perf_counter() - origin
+                outputs = node.func(frame)
+                node.duration = time.perf_counter() - origin - node.start
+                span.set_rows(len(frame), len(frame))
+            MetricsRegistry().histogram(
+                'stage_node_duration_seconds', 'Wall time per scheduled stage node', node=node.name
+            ).observe(node.duration)
+            return outputs
+
+        with ConcurrencyGovernor().lease(self.max_workers, 'stage_scheduler') as lease, \
+                ThreadPoolExecutor(max_workers=lease.workers, thread_name_prefix='stage') as pool:
+            while pending or running:
+                for node_name in [n for n, deps in pending.items() if not deps]:
+                    node = plan.by_name[node_name]
+                    frame = pd.DataFrame({col: state[col] for col in node.reads if col in state}, index=df.index)
+                    # Run in a copy of the caller's context so node spans nest under the current stage
+                    context = contextvars.copy_context()
+                    running[pool.submit(context.run, execute, node, frame)] = node
+                    del pending[node_name]
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = running.pop(future)
+                    outputs = future.result()
+                    node.outputs = list(outputs)
+                    for col in node.outputs:
+                        state[col] = outputs[col]
+                    for col in node.drops:
+                        state.pop(col, None)
+                    for deps in pending.values():
+                        deps.discard(node.name)
+
+        result = pd.DataFrame({col: state[col] for col in self._column_order(df, nodes)}, index=df.index)
+        self.logger.info(f"Execution plan ({name}):\n{plan.format()}")
+        return result, plan
+
+    @staticmethod
+    def _column_order(df, nodes):
+        """Replay node outputs in declaration order so the layout matches sequential execution"""
+        order = list(df.columns)
+        seen = set(order)
+        for node in nodes:
+            for col in node.outputs:
+                if col not in seen:
+                    order.append(col)
+                    seen.add(col)
+            for col in node.drops:
+                if col in seen:
+                    order.remove(col)
+                    seen.discard(col)
+        return order
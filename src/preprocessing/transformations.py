@@ -2,12 +2,13 @@ import pandas as pd
 import numpy as np
 from utils.logger import Logger
 from utils.timer import Timer
+from preprocessing.stage_scheduler import StageNode
 
 class FeatureTransformer:
     """Apply mathematical transformations"""
     
     def __init__(self, config):
-        self.logger = Logger().get_logger()
+        self.logger = Logger().get_logger(__name__)
         self.config = config['transformations']
     
     @Timer.measure
@@ -32,4 +33,19 @@ class FeatureTransformer:
         except Exception as e:
             self.logger.error(f"Error in feature transformation: {e}")
             raise
+    
+    def get_stages(self, df, fit=True):
+        """One scheduler node per log-transformed column"""
+        stages = []
+        for col in self.config['log_columns']:
+            if col not in df.columns:
+                self.logger.warning(f"Column {col} not found for log transformation")
+                continue
+            stages.append(StageNode(
+                f'log[{col}]',
+                lambda frame, col=col: {f'{col}_log': np.log1p(frame[col])},
+                reads=[col],
+                writes=[f'{col}_log']
+            ))
+        return stages
 
@@ -0,0 +1,197 @@
+import pandas as pd
+import numpy as np
+from utils.logger import Logger
+from utils.timer import Timer
+from preprocessing.stage_scheduler import StageNode
+from preprocessing.customer_rollup import _datetime_values, NAT
+
+WINDOW_METRICS = ('recency', 'frequency', 'monetary')
+
+DAY_NS = 86_400 * 10 ** 9
+
+class WindowFeatureEngineer:
+    """
+    Rolling recency/frequency/monetary features per customer.
+    The event history is sorted once by (customer, date) and kept with a
+    running sum of the value column; every window boundary is then one
+    searchsorted over (customer code, date rank) keys, so all windows and
+    metrics cost a few vectorized lookups instead of a rolling groupby each.
+    Only events strictly before a line's date (and before `cutoff_date`) count.
+    """
+    
+    def __init__(self, config):
+        self.logger = Logger().get_logger(__name__)
+        self.config = config.get('window_features', {})
+        self.enabled = self.config.get('enabled', False)
+        self.key = self.config.get('key', 'Customer ID')
+        self.date_column = self.config.get('date_column', 'InvoiceDate')
+        self.value_column = self.config.get('value_column', 'Revenue')
+        self.windows = sorted(self.config.get('windows', [30, 90, 365]))
+        self.metrics = [metric for metric in self.config.get('metrics', WINDOW_METRICS) if metric in WINDOW_METRICS]
+        cutoff = self.config.get('cutoff_date')
+        self.cutoff = pd.Timestamp(cutoff).as_unit('ns').value if cutoff else None
+        
+        # Training event history, sorted by (customer code, date)
+        self.keys = pd.Index([])
+        self.codes = np.array([], dtype=np.int64)
+        self.dates = np.array([], dtype=np.int64)
+        self.values = np.array([], dtype=np.float64)
+        self._refresh(np.array([], dtype=np.int64))
+    
+    @Timer.measure
+    def engineer_features(self, df, fit=True):
+        """
+        Add window features to every line
+        Fit builds the history from the training lines; dev/test only look it up
+        """
+        try:
+            self.logger.info("Computing window features...")
+            
+            missing = [col for col in (self.key, self.date_column, self.value_column) if col not in df.columns]
+            if missing:
+                self.logger.warning(f"Columns {missing} not found for window features")
+                return df
+            
+            for name, values in self._window_features(df, fit).items():
+                df[name] = values
+            
+            self.logger.info("Window features completed")
+            return df
+        
+        except Exception as e:
+            self.logger.error(f"Error computing window features: {e}")
+            raise
+    
+    def get_stages(self, df, fit=True):
+        """All windows and metrics as one scheduler node (they share the sorted history)"""
+        reads = [self.key, self.date_column, self.value_column]
+        missing = [col for col in reads if col not in df.columns]
+        if missing:
+            self.logger.warning(f"Columns {missing} not found for window features")
+            return []
+        return [StageNode(
+            f'windows[{self.key}.{self.date_column}]',
+            lambda frame: self._window_features(frame, fit),
+            reads=reads,
+            writes=self.feature_names()
+        )]
+    
+    def feature_names(self):
+        """Names written per line, in output order"""
+        names = ['recency_days'] if 'recency' in self.metrics else []
+        for window in self.windows:
+            names += [f'{metric}_{window}d' for metric in ('frequency', 'monetary') if metric in self.metrics]
+        return names
+    
+    @Timer.measure
+    def update(self, df):
+        """
+        Merge new events into the fitted history without re-sorting it, so later
+        lookups (e.g. batch scoring) see them. Returns the number of events added.
+        """
+        try:
+            keys, dates, values = self._events(df)
+            valid = keys.notna().to_numpy() & self._usable(dates)
+            keys, dates, values = keys[valid], dates[valid], values[valid]
+            
+            new_keys = pd.Index(pd.unique(keys[~keys.isin(self.keys)]))
+            self.keys = self.keys.append(new_keys)
+            codes = self.keys.get_indexer(keys)
+            
+            grid = np.union1d(self.grid, dates)
+            width = len(grid) + 1
+            history = self.codes * width + np.searchsorted(grid, self.dates)
+            incoming = codes * width + np.searchsorted(grid, dates)
+            order = np.argsort(incoming, kind='stable')
+            
+            # Each new event goes after the history events of the same customer and date
+            at = np.searchsorted(history, incoming[order], side='right')
+            self.codes = np.insert(self.codes, at, codes[order])
+            self.dates = np.insert(self.dates, at, dates[order])
+            self.values = np.insert(self.values, at, values[order])
+            self._refresh(grid)
+            
+            self.logger.info(f"Window history updated: +{len(order)} events, {len(new_keys)} new customers")
+            return len(order)
+        
+        except Exception as e:
+            self.logger.error(f"Error updating window history: {e}")
+            raise
+    
+    def _events(self, df):
+        """Key series, int64 dates (NaT as int64 min) and values (missing as 0)"""
+        keys = df[self.key].reset_index(drop=True)
+        dates = _datetime_values(df[self.date_column])
+        values = np.nan_to_num(df[self.value_column].to_numpy(dtype=np.float64, na_value=np.nan))
+        return keys, dates, values
+    
+    def _usable(self, dates):
+        """Dates that may enter the history: present and before the cutoff"""
+        usable = dates != NAT
+        if self.cutoff is not None:
+            usable &= dates < self.cutoff
+        return usable
+    
+    def _fit_history(self, df):
+        """Sort the training events once by (customer, date)"""
+        keys, dates, values = self._events(df)
+        valid = keys.notna().to_numpy() & self._usable(dates)
+        codes, uniques = pd.factorize(keys[valid])
+        order = np.lexsort((dates[valid], codes))
+        
+        self.keys = pd.Index(uniques)
+        self.codes = codes[order].astype(np.int64)
+        self.dates = dates[valid][order]
+        self.values = values[valid][order]
+        self._refresh(np.unique(self.dates))
+        self.logger.info(f"Window history: {len(self.codes)} events for {len(self.keys)} customers")
+    
+    def _refresh(self, grid):
+        """Rebuild the running sum and lookup keys after the history changed"""
+        self.grid = grid
+        self.prefix = np.concatenate([[0.0], np.cumsum(self.values)])
+        self.event_keys = self.codes * (len(grid) + 1) + np.searchsorted(grid, self.dates)
+    
+    def _positions(self, codes, bounds):
+        """History index of each customer's first event on or after `bounds`"""
+        ranks = np.searchsorted(self.grid, bounds)
+        return np.searchsorted(self.event_keys, codes * (len(self.grid) + 1) + ranks, side='left')
+    
+    def _window_features(self, df, fit=True):
+        """Compute all window features as a name -> Series mapping"""
+        if fit:
+            self._fit_history(df)
+        
+        keys, dates, _ = self._events(df)
+        codes = self.keys.get_indexer(keys).astype(np.int64)
+        dated = dates != NAT
+        known = dated & (codes >= 0)
+        
+        # Unknown customers and undated lines are looked up at code/date 0 and overwritten below
+        lookup = np.where(known, codes, 0)
+        at = np.where(dated, dates, 0)
+        upper = at if self.cutoff is None else np.minimum(at, self.cutoff)
+        end = self._positions(lookup, upper)
+        
+        features = {}
+        if 'recency' in self.metrics:
+            recency = np.full(len(at), np.nan)
+            if len(self.codes):
+                # The event just before `end` is the latest earlier one, if it is the same customer's
+                previous = np.clip(end - 1, 0, None)
+                has_previous = known & (end > 0) & (self.codes[previous] == lookup)
+                recency = np.where(has_previous, (at - self.dates[previous]) / DAY_NS, np.nan)
+            features['recency_days'] = recency
+        
+        for window in self.windows:
+            start = np.minimum(self._positions(lookup, at - window * DAY_NS), end)
+            if 'frequency' in self.metrics:
+                features[f'frequency_{window}d'] = np.where(known, end - start, 0).astype(np.float64)
+            if 'monetary' in self.metrics:
+                features[f'monetary_{window}d'] = np.where(known, self.prefix[end] - self.prefix[start], 0.0)
+        
+        self.logger.debug(f"Window features for {len(df)} lines, {int((~known & dated).sum())} without history")
+        return {
+            name: pd.Series(np.where(dated, values, np.nan), index=df.index)
+            for name, values in features.items()
+        }
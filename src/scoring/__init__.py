@@ -0,0 +1,24 @@
+from importlib import import_module
+
+# Public names are imported from their submodule on first access (PEP 562),
+# so `import scoring` does not pull in pandas or sklearn up front
+_EXPORTS = {
+    'BatchScorer': '.batch_scorer',
+    'feature_matrix': '.batch_scorer',
+    'load_config': '.batch_scorer',
+    'main': '.batch_scorer'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
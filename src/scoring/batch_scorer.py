@@ -0,0 +1,380 @@
+"""
+Batch scoring of raw rows with the saved preprocessing pipeline and a trained model.
+
+The raw file is streamed in `scoring.chunk_size` row chunks and each chunk is
+transformed and scored in a process pool. A worker loads the pipeline and the
+model once (model arrays memory-mapped) and keeps them for every chunk it is
+sent. Results come back in input order and are written as numbered parquet
+parts next to a checkpoint, so an interrupted run resumes after the last part
+written. Throughput is reported per stage in rows/sec.
+"""
+import json
+import os
+import time
+from itertools import islice
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import yaml
+
+from utils.logger import Logger
+from utils.timer import Timer
+from utils.tracing import Tracer
+from utils.metrics import MetricsRegistry
+from utils.concurrency import ConcurrencyGovernor
+from utils.file_utils import IOHandler
+from utils.dtypes import resolve_dtype_backend, convert_dtype_backend
+from utils.dataset import parse_dates
+
+STAGES = ('read', 'transform', 'predict', 'write')
+CHECKPOINT_FILE = '_checkpoint.json'
+
+# Per worker process: (pipeline path, model path) -> (fitted pipeline, model)
+_ARTIFACTS = {}
+
+
+def feature_matrix(features, hashed, names):
+    """Model input in training column order: absent columns and inf/NaN as 0, float32 like SplitLoader"""
+    dense = [name for name in names if not name.startswith('hashed_')]
+    X = features.reindex(columns=dense, fill_value=0).to_numpy(dtype=np.float32, na_value=np.nan)
+    X[~np.isfinite(X)] = 0
+    if len(dense) == len(names):
+        return X
+    if hashed is None:
+        raise ValueError("The model was trained with hashed features but the pipeline produced none")
+    from scipy import sparse
+    return sparse.hstack([sparse.csr_matrix(X), hashed.astype(X.dtype)], format='csr')
+
+
+def _load_artifacts(artifacts, threads, worker):
+    """Fitted pipeline and model for this process, loaded on its first chunk"""
+    key = (artifacts['pipeline'], artifacts['model_path'])
+    if key not in _ARTIFACTS:
+        if worker:
+            # Fresh process: keep per-chunk logging quiet and nested pools within this worker's share
+            Logger().configure({'level': artifacts['worker_log_level']})
+            ConcurrencyGovernor().configure({'max_cores': threads})
+        from preprocessing.preprocessing_pipeline import PreprocessingPipeline
+        from training.models import load_model
+
+        model = load_model(artifacts['model'], artifacts['model_path'], artifacts['format'])
+        if 'n_jobs' in model.get_params():
+            model.set_params(n_jobs=threads)
+        _ARTIFACTS.clear()
+        _ARTIFACTS[key] = (PreprocessingPipeline.from_artifact(artifacts['pipeline']), model)
+    return _ARTIFACTS[key]
+
+
+def _score_chunk(artifacts, part, frame, threads, worker):
+    """Transform and score one chunk (runs in a pool worker); returns (part, predictions, stage stats)"""
+    pipeline, model = _load_artifacts(artifacts, threads, worker)
+    id_column = artifacts['id_column']
+    ids = frame[id_column].copy() if id_column in frame.columns else None
+
+    start = time.perf_counter()
+    features, hashed = pipeline.transform(frame)
+    transform_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    X = feature_matrix(features, hashed, artifacts['features'])
+    probability = model.predict_proba(X)[:, 1] if len(features) else np.empty(0)
+    predict_seconds = time.perf_counter() - start
+
+    # Customer key under the rollup, otherwise the input row number (plus the id column when present)
+    if pipeline.rollup.enabled:
+        predictions = pd.DataFrame({pipeline.rollup.key: features.index.to_numpy()})
+    else:
+        predictions = pd.DataFrame({'row': features.index.to_numpy(dtype=np.int64)})
+        if ids is not None:
+            predictions[id_column] = ids.reindex(features.index).to_numpy()
+    predictions['churn_probability'] = probability.astype(np.float32)
+    predictions['churn_prediction'] = (probability >= artifacts['threshold']).astype(np.int8)
+
+    stats = {
+        'rows_in': len(frame),
+        'rows_scored': len(predictions),
+        'transform_seconds': transform_seconds,
+        'predict_seconds': predict_seconds
+    }
+    return part, predictions, stats
+
+
+class BatchScorer:
+    """Stream a raw extract through the fitted pipeline and a trained model into parquet parts"""
+    
+    def __init__(self, config):
+        self.logger = Logger().get_logger(__name__)
+        self.config = config
+        self.scoring = config['scoring']
+        self.chunk_size = self.scoring.get('chunk_size', 50000)
+        self.input_path = Path(config['data']['file_path'])
+        self.encoding = config['data'].get('encoding', 'utf-8')
+        self.output_dir = Path(config['output']['predictions_dir'])
+        self.io_handler = IOHandler(config['output']['results_dir'])
+        self.artifacts, pipeline_config = self._resolve_artifacts()
+        
+        # Read the raw rows exactly as preprocessing did
+        self.dtype_backend = resolve_dtype_backend(pipeline_config)
+        rollup = pipeline_config.get('rollup') or {}
+        self.rollup_key = rollup['key'] if rollup.get('enabled', False) else None
+        self._warned_ungrouped = False
+    
+    def _resolve_artifacts(self):
+        """Worker artifact spec from the training manifest, plus the fitted pipeline's config"""
+        import joblib
+        
+        cfg = self.config['artifacts']
+        models_dir = Path(cfg['models_dir'])
+        with open(models_dir / 'training_manifest.json') as f:
+            manifest = json.load(f)
+        
+        name = cfg.get('model') or next(iter(manifest['models']), None)
+        if name not in manifest['models']:
+            raise ValueError(f"Model {name} not found in {models_dir / 'training_manifest.json'}")
+        
+        artifacts = {
+            'pipeline': str(Path(cfg['pipeline']).resolve()),
+            'model': name,
+            'model_path': str((models_dir / manifest['models'][name]['path']).resolve()),
+            'format': manifest['models'][name]['format'],
+            'trained_at': manifest.get('trained_at'),
+            'features': manifest['features'],
+            'id_column': self.scoring.get('id_column'),
+            'threshold': self.scoring.get('threshold', 0.5),
+            'worker_log_level': self.scoring.get('worker_log_level', 'WARNING')
+        }
+        return artifacts, joblib.load(artifacts['pipeline'])['config']
+    
+    @Timer.measure
+    def run(self):
+        """Score the input file; returns the run summary with rows/sec per stage"""
+        try:
+            from joblib import delayed
+            
+            IOHandler.validate_file(self.input_path)
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            checkpoint = self._load_checkpoint()
+            stats = {stage: {'rows': 0, 'seconds': 0.0} for stage in STAGES}
+            
+            if checkpoint['complete']:
+                self.logger.info(f"Predictions in {self.output_dir} are up to date, nothing to score")
+            else:
+                if checkpoint['rows_consumed']:
+                    self.logger.info(
+                        f"Resuming after {checkpoint['rows_consumed']} rows ({checkpoint['next_part']} parts written)"
+                    )
+                start = time.perf_counter()
+                governor = ConcurrencyGovernor()
+                with governor.parallel(self.scoring.get('n_jobs', -1), 'loky', 'scoring', return_as='generator') as parallel:
+                    threads = governor.current_lease().inner_threads
+                    worker = parallel.n_jobs > 1
+                    self.logger.info(f"Scoring with {parallel.n_jobs} worker(s), {threads} thread(s) each")
+                    
+                    chunks = self._chunks(checkpoint['rows_consumed'], stats['read'])
+                    results = parallel(
+                        delayed(_score_chunk)(self.artifacts, part, chunk, threads, worker)
+                        for part, chunk in enumerate(chunks, start=checkpoint['next_part'])
+                    )
+                    for part, predictions, chunk_stats in results:
+                        write_start = time.perf_counter()
+                        self._write_part(part, predictions)
+                        checkpoint['rows_consumed'] += chunk_stats['rows_in']
+                        checkpoint['rows_scored'] += chunk_stats['rows_scored']
+                        checkpoint['next_part'] = part + 1
+                        self._save_checkpoint(checkpoint)
+                        stats['write']['seconds'] += time.perf_counter() - write_start
+                        
+                        stats['write']['rows'] += chunk_stats['rows_scored']
+                        stats['transform']['rows'] += chunk_stats['rows_in']
+                        stats['transform']['seconds'] += chunk_stats['transform_seconds']
+                        stats['predict']['rows'] += chunk_stats['rows_scored']
+                        stats['predict']['seconds'] += chunk_stats['predict_seconds']
+                        self.logger.info(
+                            f"Part {part}: {chunk_stats['rows_scored']} predictions "
+                            f"({checkpoint['rows_consumed']} input rows done)"
+                        )
+                
+                checkpoint['complete'] = True
+                self._save_checkpoint(checkpoint)
+                stats['end_to_end'] = {'rows': stats['read']['rows'], 'seconds': time.perf_counter() - start}
+            
+            return self._summarize(stats, checkpoint)
+        
+        except Exception as e:
+            self.logger.error(f"Error in batch scoring: {e}")
+            raise
+    
+    def _chunks(self, rows_done, read_stats):
+        """
+        Raw chunks from the first unscored row, indexed by absolute row number.
+        Under the rollup the rows of each chunk's last customer are held back
+        for the next chunk, so a customer is scored once when the input is
+        grouped by key.
+        """
+        offset = self._row_offset(rows_done)
+        if offset is None:
+            return
+        chunks = self.io_handler.iter_csv(
+            self.input_path,
+            self.chunk_size,
+            encoding=self.encoding,
+            dtype_backend=self.dtype_backend,
+            offset=offset
+        )
+        row, carry = rows_done, None
+        while True:
+            start = time.perf_counter()
+            chunk = next(chunks, None)
+            if chunk is not None:
+                chunk = convert_dtype_backend(parse_dates(chunk), self.dtype_backend)
+                chunk.index = pd.RangeIndex(row, row + len(chunk))
+                row += len(chunk)
+                read_stats['rows'] += len(chunk)
+            read_stats['seconds'] += time.perf_counter() - start
+            if chunk is None:
+                break
+            
+            if self.rollup_key is not None:
+                if carry is not None:
+                    chunk = pd.concat([carry, chunk])
+                keys = chunk[self.rollup_key]
+                runs = keys.dropna()
+                if not self._warned_ungrouped and runs.ne(runs.shift()).sum() > runs.nunique():
+                    self.logger.warning(
+                        f"Input is not grouped by {self.rollup_key}; customers split across chunks get one prediction per chunk"
+                    )
+                    self._warned_ungrouped = True
+                last = (keys == keys.iloc[-1]).to_numpy()
+                carry, chunk = chunk[last], chunk[~last]
+                if chunk.empty:
+                    continue
+            yield chunk
+        
+        if carry is not None and len(carry):
+            yield carry
+    
+    def _row_offset(self, rows):
+        """
+        Byte offset of data row `rows` (0 = first row after the header), or
+        None past the end of the file; assumes one record per line.
+        """
+        if not rows:
+            return 0
+        with open(self.input_path, 'rb') as f:
+            for _ in islice(f, rows + 1):
+                pass
+            offset = f.tell()
+        return offset if offset < self.input_path.stat().st_size else None
+    
+    def _input_fingerprint(self):
+        """Identifies the input and artifacts a checkpoint belongs to"""
+        stat = self.input_path.stat()
+        return {
+            'input': str(self.input_path.resolve()),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'model': self.artifacts['model_path'],
+            'trained_at': self.artifacts['trained_at'],
+            'pipeline_mtime_ns': Path(self.artifacts['pipeline']).stat().st_mtime_ns,
+            'chunk_size': self.chunk_size
+        }
+    
+    def _load_checkpoint(self):
+        """Checkpoint to resume from, or a fresh one after clearing parts from another run"""
+        fingerprint = self._input_fingerprint()
+        path = self.output_dir / CHECKPOINT_FILE
+        if path.exists() and self.scoring.get('resume', True):
+            with open(path) as f:
+                checkpoint = json.load(f)
+            if checkpoint.get('fingerprint') == fingerprint:
+                return checkpoint
+            self.logger.info("Input, model or pipeline changed since the last run; rescoring from the start")
+        
+        for stale in self.output_dir.glob('part-*.parquet'):
+            stale.unlink()
+        path.unlink(missing_ok=True)
+        return {'fingerprint': fingerprint, 'rows_consumed': 0, 'rows_scored': 0, 'next_part': 0, 'complete': False}
+    
+    def _save_checkpoint(self, checkpoint):
+        """Replace the checkpoint atomically, so a crash leaves the previous one intact"""
+        path = self.output_dir / CHECKPOINT_FILE
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(checkpoint, f, indent=2)
+        os.replace(tmp, path)
+    
+    def _write_part(self, part, predictions):
+        """Write one part via a temporary file, so a crash never leaves a truncated part behind"""
+        path = self.output_dir / f"part-{part:06d}.parquet"
+        tmp = path.with_suffix('.tmp')
+        predictions.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+        MetricsRegistry().counter(
+            'bytes_written_total', 'Bytes written to output files', format='parquet'
+        ).inc(path.stat().st_size)
+    
+    def _summarize(self, stats, checkpoint):
+        """Log and export rows/sec per stage; transform/predict are per worker-second"""
+        throughput = {}
+        for stage, values in stats.items():
+            rate = values['rows'] / values['seconds'] if values['seconds'] else 0.0
+            throughput[stage] = {'rows': values['rows'], 'seconds': round(values['seconds'], 4), 'rows_per_second': round(rate, 1)}
+            MetricsRegistry().gauge(
+                'scoring_rows_per_second', 'Batch scoring throughput per stage', stage=stage
+            ).set(rate)
+            self.logger.info(f"{stage:<11} {values['rows']:>10} rows {values['seconds']:>9.2f}s {rate:>12,.0f} rows/sec")
+        
+        summary = {
+            'input': str(self.input_path),
+            'model': self.artifacts['model'],
+            'predictions_dir': str(self.output_dir),
+            'parts': checkpoint['next_part'],
+            'rows_consumed': checkpoint['rows_consumed'],
+            'rows_scored': checkpoint['rows_scored'],
+            'throughput': throughput
+        }
+        self.io_handler.save_json(summary, 'scoring_summary')
+        return summary
+
+
+def load_config(config_path='config/scoring_config.yaml'):
+    """Load scoring configuration"""
+    try:
+        with open(config_path, 'r') as f:
+            config = yaml.safe_load(f)
+        Logger().get_logger(__name__).info(f"Configuration loaded from {config_path}")
+        return config
+    except Exception as e:
+        Logger().get_logger(__name__).error(f"Error loading config: {e}")
+        raise
+
+
+def main(config_path='config/scoring_config.yaml'):
+    """Main execution"""
+    
+    logger = Logger().get_logger(__name__)
+    logger.info("=" * 80)
+    logger.info("BATCH SCORING")
+    logger.info("=" * 80)
+    
+    try:
+        config = load_config(config_path)
+        Logger().configure(config.get('logging'))
+        tracer = Tracer().configure(config.get('tracing'))
+        tracer.reset()
+        metrics = MetricsRegistry().configure(config.get('metrics'))
+        metrics.reset()
+        ConcurrencyGovernor().configure(config.get('concurrency'))
+        
+        with Timer("Scoring"):
+            summary = BatchScorer(config).run()
+        
+        tracer.write_reports('scoring')
+        metrics.write_snapshot('scoring')
+        logger.info(f"Scored {summary['rows_scored']} rows into {summary['parts']} parts in {summary['predictions_dir']}")
+        
+        return summary
+    
+    except Exception as e:
+        logger.error(f"Pipeline execution failed: {e}", exc_info=True)
+        raise
@@ -0,0 +1,29 @@
+from importlib import import_module
+
+# Public names are imported from their submodule on first access (PEP 562),
+# so `import training` does not pull in pandas or sklearn up front
+_EXPORTS = {
+    'SplitLoader': '.split_loader',
+    'ModelTrainer': '.trainer',
+    'build_model': '.models',
+    'save_model': '.models',
+    'load_model': '.models',
+    'HyperparameterTuner': '.tuning',
+    'TrainingPipeline': '.training_pipeline',
+    'load_config': '.training_pipeline',
+    'main': '.training_pipeline'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,60 @@
+"""
+Model registry for the training runner.
+
+LightGBM and XGBoost are imported only when a model needs them; a missing
+library disables that model instead of failing the run. Models are saved in
+their fastest-loading form: XGBoost's binary UBJSON format, everything else
+as an uncompressed joblib file whose arrays can be memory-mapped on load.
+"""
+from pathlib import Path
+from utils.logger import Logger
+
+MODEL_NAMES = ('random_forest', 'lightgbm', 'xgboost')
+
+
+def model_class(name):
+    """Estimator class for a registered model name, or None when its library is missing"""
+    try:
+        if name == 'random_forest':
+            from sklearn.ensemble import RandomForestClassifier
+            return RandomForestClassifier
+        if name == 'lightgbm':
+            from lightgbm import LGBMClassifier
+            return LGBMClassifier
+        if name == 'xgboost':
+            from xgboost import XGBClassifier
+            return XGBClassifier
+    except ImportError as e:
+        Logger().get_logger(__name__).warning(f"Model {name} unavailable: {e}")
+        return None
+    raise ValueError(f"Unknown model '{name}', expected one of {MODEL_NAMES}")
+
+
+def build_model(name, params, n_jobs):
+    """A fresh estimator with `params` and an explicit thread count"""
+    return model_class(name)(**{**(params or {}), 'n_jobs': n_jobs})
+
+
+def save_model(name, model, models_dir):
+    """Write a fitted model; returns (path, format)"""
+    models_dir = Path(models_dir)
+    if name == 'xgboost':
+        path = models_dir / f"{name}.ubj"
+        model.save_model(path)
+        return path, 'ubj'
+
+    import joblib
+    path = models_dir / f"{name}.joblib"
+    joblib.dump(model, path)
+    return path, 'joblib'
+
+
+def load_model(name, path, model_format, mmap=True):
+    """Load a model written by save_model (joblib arrays memory-mapped read-only by default)"""
+    if model_format == 'ubj':
+        model = model_class(name)()
+        model.load_model(path)
+        return model
+
+    import joblib
+    return joblib.load(path, mmap_mode='r' if mmap else None)
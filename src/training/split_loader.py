@@ -0,0 +1,77 @@
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from importlib.util import find_spec
+from utils.logger import Logger
+from utils.timer import Timer
+from utils.file_utils import IOHandler
+
+HAS_PYARROW = find_spec('pyarrow') is not None
+
+class SplitLoader:
+    """Load processed splits as model-ready (X, y) from their fastest available form"""
+    
+    def __init__(self, config):
+        self.logger = Logger().get_logger(__name__)
+        self.config = config['data']
+        self.processed_dir = Path(self.config['processed_dir'])
+        self.target_col = self.config['target_column']
+        self.io_handler = IOHandler(self.processed_dir)
+    
+    @Timer.measure
+    def load_frame(self, split):
+        """
+        Read one split: a parquet copy when it is at least as new as the CSV,
+        else the CSV (multi-threaded pyarrow parser), caching a parquet copy
+        """
+        name = self.config['splits'][split]
+        csv_path = self.processed_dir / f"{name}.csv"
+        parquet_path = self.processed_dir / f"{name}.parquet"
+        
+        if HAS_PYARROW and parquet_path.exists() and (
+            not csv_path.exists() or parquet_path.stat().st_mtime >= csv_path.stat().st_mtime
+        ):
+            df = pd.read_parquet(parquet_path)
+            self.logger.info(f"Loaded {split} split from {parquet_path}: {df.shape}")
+            return df
+        
+        df = self.io_handler.read_csv(csv_path, **({'engine': 'pyarrow'} if HAS_PYARROW else {}))
+        if HAS_PYARROW and self.config.get('parquet_cache', True):
+            self.io_handler.save_parquet(df, name)
+        return df
+    
+    def load(self, split):
+        """(X, y, feature names) with inf/NaN set to 0; X is float32 unless configured otherwise"""
+        df = self.load_frame(split)
+        if self.target_col not in df.columns:
+            raise ValueError(f"Target column {self.target_col} not found in {split} split")
+        
+        features = df.drop(columns=[self.target_col])
+        categorical = [col for col in features.columns if not pd.api.types.is_numeric_dtype(features[col])]
+        if categorical:
+            raise ValueError(f"Non-numeric features in {split} split: {categorical}")
+        
+        dtype = np.float32 if self.config.get('float32', True) else np.float64
+        X = features.to_numpy(dtype=dtype, na_value=np.nan)
+        X[~np.isfinite(X)] = 0
+        y = df[self.target_col].to_numpy()
+        names = features.columns.tolist()
+        
+        if self.config.get('use_hashed', False):
+            X, names = self._append_hashed(split, X, names)
+        
+        self.logger.info(f"{split}: {X.shape[0]} rows, {X.shape[1]} features")
+        return X, y, names
+    
+    def _append_hashed(self, split, X, names):
+        """Stack the split's hashed block from the preprocessing encoder next to the dense features"""
+        from scipy import sparse
+        
+        path = self.processed_dir / f"{self.config['splits'][split]}_hashed.npz"
+        if not path.exists():
+            self.logger.warning(f"No hashed block at {path}; using dense features only")
+            return X, names
+        
+        hashed = sparse.load_npz(path)
+        X = sparse.hstack([sparse.csr_matrix(X), hashed.astype(X.dtype)], format='csr')
+        return X, names + [f"hashed_{i}" for i in range(hashed.shape[1])]
@@ -0,0 +1,161 @@
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from utils.logger import Logger
+from utils.timer import Timer
+from utils.metrics import MetricsRegistry
+from utils.concurrency import ConcurrencyGovernor
+from training.models import build_model
+
+EXECUTION_MODES = ('auto', 'sequential', 'concurrent')
+
+
+def amdahl_time(serial_seconds, parallel_fraction, cores):
+    """Predicted fit time on `cores` threads"""
+    return serial_seconds * ((1 - parallel_fraction) + parallel_fraction / cores)
+
+
+def partition_cores(serial, fractions, budget):
+    """
+    Split `budget` cores across models running at once: every model gets one,
+    then each further core goes to whichever model is currently predicted to
+    finish last. Returns {name: cores}.
+    """
+    cores = {name: 1 for name in serial}
+    for _ in range(budget - len(cores)):
+        slowest = max(cores, key=lambda name: amdahl_time(serial[name], fractions[name], cores[name]))
+        cores[slowest] += 1
+    return cores
+
+
+class ModelTrainer:
+    """Fit and evaluate models one after another or concurrently within one CPU budget"""
+    
+    def __init__(self, config):
+        self.logger = Logger().get_logger(__name__)
+        self.config = config
+        self.execution = config.get('execution', {})
+        self.mode = self.execution.get('mode', 'auto')
+        if self.mode not in EXECUTION_MODES:
+            raise ValueError(f"Unsupported execution mode '{self.mode}', expected one of {EXECUTION_MODES}")
+        self.governor = ConcurrencyGovernor()
+        self.budget = self.governor.resolve(self.execution.get('n_jobs', -1))
+        self.threshold = config.get('evaluation', {}).get('threshold', 0.5)
+    
+    @Timer.measure
+    def plan(self, models, X, y):
+        """
+        Choose the execution mode and per-model thread counts.
+        `auto` fits each model on a small sample with 1 and with all cores,
+        derives its parallel fraction (Amdahl) and picks the mode with the
+        shorter predicted wall time.
+        """
+        names = list(models)
+        sequential = {'mode': 'sequential', 'n_jobs': {name: self.budget for name in names}}
+        concurrent_possible = 1 < len(names) <= self.budget
+        
+        if self.mode == 'sequential' or not concurrent_possible:
+            if self.mode == 'concurrent':
+                self.logger.warning(f"Cannot run {len(names)} models concurrently on {self.budget} cores")
+            return sequential
+        if self.mode == 'concurrent':
+            return {'mode': 'concurrent', 'n_jobs': {name: max(1, self.budget // len(names)) for name in names}}
+        
+        serial, fractions = self._probe(models, X, y)
+        cores = partition_cores(serial, fractions, self.budget)
+        predicted_sequential = sum(amdahl_time(serial[n], fractions[n], self.budget) for n in names)
+        predicted_concurrent = max(amdahl_time(serial[n], fractions[n], cores[n]) for n in names)
+        self.logger.info(
+            f"Probe: sequential ~{predicted_sequential:.3f}s vs concurrent ~{predicted_concurrent:.3f}s "
+            f"(sample scale), parallel fractions {({n: round(f, 2) for n, f in fractions.items()})}"
+        )
+        
+        if predicted_concurrent < predicted_sequential:
+            return {'mode': 'concurrent', 'n_jobs': cores, 'probe': fractions}
+        return {**sequential, 'probe': fractions}
+    
+    def _probe(self, models, X, y):
+        """Serial fit seconds and parallel fraction per model on a small sample"""
+        rows = min(self.execution.get('probe_rows', 2000), X.shape[0])
+        sample = np.random.default_rng(0).choice(X.shape[0], size=rows, replace=False)
+        X_probe, y_probe = X[sample], y[sample]
+        
+        serial, fractions = {}, {}
+        for name, params in models.items():
+            # Untimed warm-up so one-off import and allocator costs do not count as serial time
+            build_model(name, params, 1).fit(X_probe[:200], y_probe[:200])
+            timings = {}
+            for cores in (1, self.budget):
+                with self.governor.lease(cores, f'probe[{name}]', workers=1) as lease:
+                    start = time.perf_counter()
+                    build_model(name, params, lease.cores).fit(X_probe, y_probe)
+                    timings[cores] = time.perf_counter() - start
+            
+            speedup = min(max(timings[1] / timings[self.budget], 1.0), self.budget)
+            serial[name] = timings[1]
+            fractions[name] = (1 - 1 / speedup) / (1 - 1 / self.budget)
+        return serial, fractions
+    
+    @Timer.measure
+    def train(self, models, plan, data):
+        """Fit every model per the plan; returns ({name: model}, {name: results})"""
+        self.logger.info(f"Training {list(models)} ({plan['mode']}, threads {plan['n_jobs']})")
+        jobs = {name: (lambda name=name: self._fit_evaluate(name, models[name], plan['n_jobs'][name], data))
+                for name in models}
+        
+        if plan['mode'] == 'sequential':
+            outcomes = {name: job() for name, job in jobs.items()}
+        else:
+            # One section holding the whole budget; each model's lease is carved out of it
+            with self.governor.lease(self.budget, 'training', workers=1), \
+                    ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix='train') as pool:
+                # Copies of the caller's context so model spans and leases nest under the training section
+                futures = {name: pool.submit(contextvars.copy_context().run, job) for name, job in jobs.items()}
+                outcomes = {name: future.result() for name, future in futures.items()}
+        
+        fitted = {name: model for name, (model, _) in outcomes.items()}
+        results = {name: result for name, (_, result) in outcomes.items()}
+        return fitted, results
+    
+    def _fit_evaluate(self, name, params, n_jobs, data):
+        """Fit one model on train, then time predictions and score every evaluation split"""
+        from sklearn.metrics import f1_score, log_loss
+        
+        with self.governor.lease(n_jobs, f'fit[{name}]', workers=1) as lease:
+            n_jobs = lease.cores
+            X_train, y_train = data['train']
+            model = build_model(name, params, n_jobs)
+            with Timer(f"Fit {name}"):
+                start = time.perf_counter()
+                model.fit(X_train, y_train)
+                fit_seconds = time.perf_counter() - start
+            
+            result = {
+                'n_jobs': n_jobs,
+                'fit_seconds': round(fit_seconds, 4),
+                'fit_rows_per_sec': round(X_train.shape[0] / fit_seconds, 1)
+            }
+            for split, (X, y) in data.items():
+                start = time.perf_counter()
+                probs = model.predict_proba(X)[:, 1]
+                predict_seconds = time.perf_counter() - start
+                
+                result[f'{split}_predict_seconds'] = round(predict_seconds, 4)
+                result[f'{split}_predict_rows_per_sec'] = round(X.shape[0] / predict_seconds, 1)
+                result[f'{split}_f1'] = round(float(f1_score(y, (probs >= self.threshold).astype(int))), 4)
+                result[f'{split}_log_loss'] = round(float(log_loss(y, probs, labels=[0, 1])), 4)
+            
+            if 'train' in data and 'test' in data:
+                result['variance'] = round(result['test_log_loss'] - result['train_log_loss'], 4)
+            
+            registry = MetricsRegistry()
+            registry.gauge('model_fit_seconds', 'Wall time to fit each model', model=name).set(fit_seconds)
+            registry.gauge('model_fit_rows_per_second', 'Training rows per second of fit time', model=name).set(
+                result['fit_rows_per_sec']
+            )
+            self.logger.info(
+                f"{name}: fit {fit_seconds:.3f}s ({result['fit_rows_per_sec']:.0f} rows/s, {n_jobs} threads), "
+                + ', '.join(f"{split} f1 {result[f'{split}_f1']} log_loss {result[f'{split}_log_loss']}" for split in data)
+            )
+            return model, result
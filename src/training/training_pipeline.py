@@ -0,0 +1,133 @@
+import json
+from datetime import datetime
+from pathlib import Path
+import pandas as pd
+import yaml
+
+from utils.logger import Logger
+from utils.timer import Timer
+from utils.tracing import Tracer
+from utils.metrics import MetricsRegistry
+from utils.concurrency import ConcurrencyGovernor
+from utils.file_utils import IOHandler
+from training.split_loader import SplitLoader
+from training.trainer import ModelTrainer
+from training.models import MODEL_NAMES, model_class, save_model
+
+class TrainingPipeline:
+    """Load the processed splits, train the configured models and save them"""
+    
+    def __init__(self, config):
+        self.logger = Logger().get_logger(__name__)
+        self.config = config
+        self.loader = SplitLoader(config)
+        self.trainer = ModelTrainer(config)
+        self.models_dir = Path(config['output']['models_dir'])
+        self.io_handler = IOHandler(config['output']['results_dir'])
+    
+    def enabled_models(self):
+        """{name: params} for enabled models whose library is installed"""
+        models = {}
+        for name, settings in self.config['models'].items():
+            if name not in MODEL_NAMES:
+                self.logger.warning(f"Unknown model {name} in config, skipping")
+                continue
+            if settings.get('enabled', True) and model_class(name) is not None:
+                models[name] = settings.get('params') or {}
+        if not models:
+            raise ValueError("No configured model can be trained")
+        return models
+    
+    @Timer.measure
+    def run(self):
+        """Train and evaluate every enabled model; returns the results table"""
+        try:
+            models = self.enabled_models()
+            
+            with Timer("Load splits"):
+                splits = self.config['evaluation'].get('splits', ['train', 'dev', 'test'])
+                data, features = {}, None
+                for split in dict.fromkeys(['train', *splits]):
+                    X, y, names = self.loader.load(split)
+                    if features is not None and names != features:
+                        raise ValueError(f"{split} split features do not match the train split")
+                    data[split], features = (X, y), names
+            
+            X_train, y_train = data['train']
+            plan = self.trainer.plan(models, X_train, y_train)
+            fitted, results = self.trainer.train(models, plan, {split: data[split] for split in splits})
+            
+            self._save_models(fitted, features)
+            
+            table = pd.DataFrame.from_dict(results, orient='index').rename_axis('model').reset_index()
+            table.insert(1, 'mode', plan['mode'])
+            self.io_handler.save_csv(table, 'training_results')
+            self.io_handler.save_json(table.to_dict(orient='records'), 'training_results')
+            return table
+        
+        except Exception as e:
+            self.logger.error(f"Error in training pipeline: {e}")
+            raise
+    
+    def _save_models(self, fitted, features):
+        """Save each model in its fast-loading format plus a manifest for loaders"""
+        self.models_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            'trained_at': datetime.now().isoformat(timespec='seconds'),
+            'target': self.config['data']['target_column'],
+            'features': features,
+            'models': {}
+        }
+        for name, model in fitted.items():
+            path, model_format = save_model(name, model, self.models_dir)
+            MetricsRegistry().counter(
+                'bytes_written_total', 'Bytes written to output files', format=model_format
+            ).inc(path.stat().st_size)
+            manifest['models'][name] = {'path': path.name, 'format': model_format}
+            self.logger.info(f"Model {name} saved to {path}")
+        
+        with open(self.models_dir / 'training_manifest.json', 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+def load_config(config_path='config/training_config.yaml'):
+    """Load training configuration"""
+    try:
+        with open(config_path, 'r') as f:
+            config = yaml.safe_load(f)
+        Logger().get_logger(__name__).info(f"Configuration loaded from {config_path}")
+        return config
+    except Exception as e:
+        Logger().get_logger(__name__).error(f"Error loading config: {e}")
+        raise
+
+
+def main(config_path='config/training_config.yaml'):
+    """Main execution"""
+    
+    logger = Logger().get_logger(__name__)
+    logger.info("=" * 80)
+    logger.info("MODEL TRAINING PIPELINE")
+    logger.info("=" * 80)
+    
+    try:
+        config = load_config(config_path)
+        Logger().configure(config.get('logging'))
+        tracer = Tracer().configure(config.get('tracing'))
+        tracer.reset()
+        metrics = MetricsRegistry().configure(config.get('metrics'))
+        metrics.reset()
+        ConcurrencyGovernor().configure(config.get('concurrency'))
+        
+        with Timer("Training"):
+            results = TrainingPipeline(config).run()
+        
+        logger.info(f"Training results:\n{results.to_string(index=False)}")
+        tracer.write_reports('training')
+        metrics.write_snapshot('training')
+        logger.info("Training completed successfully!")
+        
+        return results
+    
+    except Exception as e:
+        logger.error(f"Pipeline execution failed: {e}", exc_info=True)
+        raise
@@ -0,0 +1,350 @@
+"""
+Successive-halving / Hyperband hyperparameter search for LightGBM and XGBoost.
+
+The processed train split is read once and cached as memory-mappable arrays
+with fixed stratified CV folds, plus LightGBM's binned Dataset as a binary
+file. Trials run in a process pool; each worker maps the cache and builds its
+per-fold LightGBM subsets / XGBoost QuantileDMatrix once, then reuses them
+for every trial it runs. Boosting rounds are the halving resource: every rung
+keeps the best 1/eta candidates and gives them eta times the rounds, so the
+total cost follows the survivors rather than the full candidate grid.
+"""
+import hashlib
+import json
+import math
+import os
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from utils.logger import Logger
+from utils.timer import Timer
+from utils.tracing import Tracer
+from utils.metrics import MetricsRegistry
+from utils.concurrency import ConcurrencyGovernor
+from utils.file_utils import IOHandler
+from training.split_loader import SplitLoader
+from training.models import model_class
+from training.training_pipeline import load_config
+
+TUNING_MODELS = ('lightgbm', 'xgboost')
+SEARCH_METHODS = ('successive_halving', 'hyperband')
+
+# Per worker process: (cache dir, model) -> [(train set, valid features, valid labels)] per fold
+_FOLD_DATA = {}
+
+
+def sample_candidates(search_space, n, rng):
+    """
+    Draw `n` parameter sets. A list is a choice; a mapping is a range
+    {low, high, log: bool, type: int|float}.
+    """
+    candidates = [{} for _ in range(n)]
+    for name, spec in search_space.items():
+        if isinstance(spec, list):
+            values = [spec[i] for i in rng.integers(len(spec), size=n)]
+        else:
+            low, high = float(spec['low']), float(spec['high'])
+            if spec.get('log', False):
+                values = np.exp(rng.uniform(np.log(low), np.log(high), size=n))
+            else:
+                values = rng.uniform(low, high, size=n)
+            values = np.round(values).astype(int).tolist() if spec.get('type') == 'int' else values.round(6).tolist()
+        for candidate, value in zip(candidates, values):
+            candidate[name] = value
+    return candidates
+
+
+def halving_rungs(n_candidates, min_rounds, max_rounds, eta):
+    """(candidates, rounds) per rung of one successive-halving bracket"""
+    rungs = []
+    n, rounds = n_candidates, min_rounds
+    while n >= 1 and rounds <= max_rounds:
+        rungs.append((n, rounds))
+        if n == 1:
+            break
+        n, rounds = max(n // eta, 1), rounds * eta
+    return rungs
+
+
+def hyperband_brackets(min_rounds, max_rounds, eta):
+    """(candidates, starting rounds) per Hyperband bracket, most exploratory first"""
+    s_max = int(math.floor(math.log(max_rounds / min_rounds, eta) + 1e-9))
+    return [
+        (int(math.ceil((s_max + 1) / (s + 1) * eta ** s)), max(int(round(max_rounds * eta ** -s)), min_rounds))
+        for s in range(s_max, -1, -1)
+    ]
+
+
+def _cached_arrays(cache):
+    """Memory-mapped features, labels and the fixed (train, valid) index pairs"""
+    X = np.load(cache['X'], mmap_mode='r')
+    y = np.load(cache['y'])
+    with np.load(cache['folds']) as folds:
+        pairs = [(folds[f'train_{i}'], folds[f'valid_{i}']) for i in range(cache['n_folds'])]
+    return X, y, pairs
+
+
+def _lightgbm_folds(cache):
+    """Fold subsets of the cached binned Dataset (bins are shared, never recomputed)"""
+    import lightgbm as lgb
+
+    full = lgb.Dataset(cache['lightgbm'], params=cache['dataset_params']).construct()
+    X, y, folds = _cached_arrays(cache)
+    return [
+        (full.subset(np.sort(train_idx)).construct(), np.asarray(X[valid_idx]), y[valid_idx])
+        for train_idx, valid_idx in folds
+    ]
+
+
+def _lightgbm_fit(train_set, params, rounds, threads):
+    import lightgbm as lgb
+    return lgb.train({**params, 'num_threads': threads}, train_set, num_boost_round=rounds)
+
+
+def _xgboost_folds(cache):
+    """One QuantileDMatrix per training fold; validation folds only need plain DMatrix prediction input"""
+    import xgboost as xgb
+
+    X, y, folds = _cached_arrays(cache)
+    return [
+        (xgb.QuantileDMatrix(X[train_idx], label=y[train_idx], max_bin=cache['max_bin']),
+         xgb.DMatrix(X[valid_idx]), y[valid_idx])
+        for train_idx, valid_idx in folds
+    ]
+
+
+def _xgboost_fit(train_set, params, rounds, threads):
+    import xgboost as xgb
+    return xgb.train({**params, 'nthread': threads}, train_set, num_boost_round=rounds)
+
+
+FOLD_BUILDERS = {'lightgbm': _lightgbm_folds, 'xgboost': _xgboost_folds}
+FITTERS = {'lightgbm': _lightgbm_fit, 'xgboost': _xgboost_fit}
+
+
+def _run_trial(model, cache, params, rounds, threads):
+    """Mean CV log loss of one candidate at `rounds` boosting rounds (runs in a pool worker)"""
+    from sklearn.metrics import log_loss
+
+    key = (cache['dir'], model)
+    if key not in _FOLD_DATA:
+        _FOLD_DATA.clear()
+        _FOLD_DATA[key] = FOLD_BUILDERS[model](cache)
+
+    start = time.perf_counter()
+    losses = []
+    for train_set, valid_X, valid_y in _FOLD_DATA[key]:
+        booster = FITTERS[model](train_set, params, rounds, threads)
+        losses.append(log_loss(valid_y, booster.predict(valid_X), labels=[0, 1]))
+    return {'cv_log_loss': float(np.mean(losses)), 'seconds': time.perf_counter() - start, 'pid': os.getpid()}
+
+
+class HyperparameterTuner:
+    """Search LightGBM/XGBoost parameters by successive halving over cached binned datasets"""
+    
+    def __init__(self, config):
+        self.logger = Logger().get_logger(__name__)
+        self.config = config
+        self.tuning = config['tuning']
+        self.method = self.tuning.get('method', 'hyperband')
+        if self.method not in SEARCH_METHODS:
+            raise ValueError(f"Unsupported search method '{self.method}', expected one of {SEARCH_METHODS}")
+        self.eta = self.tuning.get('eta', 3)
+        self.min_rounds = self.tuning.get('min_rounds', 30)
+        self.max_rounds = self.tuning.get('max_rounds', 810)
+        self.n_folds = self.tuning.get('cv_folds', 3)
+        self.max_bin = self.tuning.get('max_bin', 255)
+        self.random_state = self.tuning.get('random_state', 42)
+        self.loader = SplitLoader(config)
+        self.io_handler = IOHandler(config['output']['results_dir'])
+        self.trials = []
+    
+    @Timer.measure
+    def run(self):
+        """Tune every configured model; returns (trials table, best parameters per model)"""
+        try:
+            models = [
+                name for name in self.tuning.get('models', TUNING_MODELS)
+                if name in TUNING_MODELS and model_class(name) is not None
+            ]
+            if not models:
+                raise ValueError("No tunable model (lightgbm, xgboost) is installed")
+            
+            cache = self.build_cache(models)
+            best = {model: self.search(model, cache) for model in models}
+            
+            trials = pd.DataFrame(self.trials)
+            self.io_handler.save_csv(trials, 'tuning_trials')
+            self.io_handler.save_json(best, 'tuning_best')
+            return trials, best
+        
+        except Exception as e:
+            self.logger.error(f"Error in hyperparameter tuning: {e}")
+            raise
+    
+    def _fingerprint(self, models):
+        """
+        Changes whenever the train split or anything baked into the cache
+        changes. Only the preprocessing outputs count: the parquet copy is
+        rewritten by SplitLoader whenever it is older than the CSV.
+        """
+        name = self.config['data']['splits']['train']
+        processed_dir = Path(self.config['data']['processed_dir'])
+        sources = [
+            (path.name, path.stat().st_size, path.stat().st_mtime_ns)
+            for path in (processed_dir / f"{name}{suffix}" for suffix in ('.csv', '_hashed.npz'))
+            if path.exists()
+        ]
+        settings = [self.n_folds, self.max_bin, self.random_state, sorted(models),
+                    {key: self.config['data'].get(key) for key in ('float32', 'use_hashed', 'target_column')}]
+        return hashlib.sha1(json.dumps([sources, settings], default=str).encode()).hexdigest()[:16]
+    
+    @Timer.measure
+    def build_cache(self, models):
+        """
+        Arrays, fixed folds and LightGBM's binary Dataset for the train split,
+        written once per fingerprint and reused by later runs
+        """
+        from sklearn.model_selection import StratifiedKFold
+        
+        cache_dir = Path(self.tuning.get('cache_dir', 'data/processed/tuning_cache')) / self._fingerprint(models)
+        cache = {
+            'dir': str(cache_dir),
+            'X': str(cache_dir / 'X.npy'),
+            'y': str(cache_dir / 'y.npy'),
+            'folds': str(cache_dir / 'folds.npz'),
+            'lightgbm': str(cache_dir / 'lightgbm.bin'),
+            'n_folds': self.n_folds,
+            'max_bin': self.max_bin,
+            # Binning is fixed once the Dataset is built, so min_data_in_leaf may vary per trial
+            'dataset_params': {'max_bin': self.max_bin, 'feature_pre_filter': False, 'verbose': -1}
+        }
+        if (cache_dir / 'meta.json').exists():
+            self.logger.info(f"Reusing tuning cache {cache_dir}")
+            return cache
+        
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        X, y, names = self.loader.load('train')
+        X = X.toarray() if hasattr(X, 'toarray') else X
+        np.save(cache['X'], X)
+        np.save(cache['y'], y)
+        
+        folds = StratifiedKFold(n_splits=self.n_folds, shuffle=True, random_state=self.random_state)
+        np.savez(cache['folds'], **{
+            f'{part}_{i}': indices
+            for i, pair in enumerate(folds.split(X, y))
+            for part, indices in zip(('train', 'valid'), pair)
+        })
+        
+        if 'lightgbm' in models:
+            import lightgbm as lgb
+            lgb.Dataset(X, label=y, params=cache['dataset_params']).construct().save_binary(
+                cache['lightgbm']
+            )
+        
+        with open(cache_dir / 'meta.json', 'w') as f:
+            json.dump({'rows': int(X.shape[0]), 'features': names, 'models': models}, f, indent=2)
+        self.logger.info(f"Tuning cache built at {cache_dir}: {X.shape[0]} rows, {X.shape[1]} features")
+        return cache
+    
+    @Timer.measure
+    def search(self, model, cache):
+        """Run the configured search for one model; returns its best parameters"""
+        settings = self.tuning.get(model, {})
+        base = {**settings.get('base_params', {}), 'max_bin': self.max_bin}
+        rng = np.random.default_rng(self.random_state)
+        
+        if self.method == 'hyperband':
+            brackets = hyperband_brackets(self.min_rounds, self.max_rounds, self.eta)
+        else:
+            brackets = [(self.tuning.get('n_candidates', 27), self.min_rounds)]
+        
+        for bracket, (n_candidates, min_rounds) in enumerate(brackets):
+            candidates = sample_candidates(settings.get('search_space', {}), n_candidates, rng)
+            survivors = list(enumerate(candidates))
+            rungs = halving_rungs(n_candidates, min_rounds, self.max_rounds, self.eta)
+            for rung, (n_keep, rounds) in enumerate(rungs):
+                survivors = survivors[:n_keep]
+                with Timer(f"Tune {model} bracket {bracket} rung {rung}"):
+                    scored = self._evaluate(
+                        model, cache, base, survivors, rounds,
+                        {'bracket': bracket, 'rung': rung, 'final': rung == len(rungs) - 1}
+                    )
+                survivors = [candidate for candidate, _ in sorted(zip(survivors, scored), key=lambda s: s[1])]
+        
+        best = min(
+            (trial for trial in self.trials if trial['model'] == model and trial['final']),
+            key=lambda trial: trial['cv_log_loss']
+        )
+        full_grid = sum(n for n, _ in brackets) * self.max_rounds
+        trained = sum(trial['rounds'] for trial in self.trials if trial['model'] == model)
+        self.logger.info(
+            f"{model}: best CV log loss {best['cv_log_loss']:.5f} at {best['rounds']} rounds; "
+            f"trained {trained} rounds per fold ({trained / full_grid:.1%} of the full grid)"
+        )
+        return {'params': {**base, **json.loads(best['params'])}, 'rounds': best['rounds'],
+                'cv_log_loss': best['cv_log_loss']}
+    
+    def _evaluate(self, model, cache, base, candidates, rounds, labels):
+        """Score (id, params) candidates in the process pool; returns their losses in order"""
+        from joblib import delayed
+        
+        # Few survivors leave each worker more threads
+        with ConcurrencyGovernor().parallel(
+            self.tuning.get('n_jobs', -1), 'loky', f'tuning[{model}]', workers=len(candidates)
+        ) as parallel:
+            threads = ConcurrencyGovernor.current_lease().inner_threads
+            results = parallel(
+                delayed(_run_trial)(model, cache, {**base, **params}, rounds, threads) for _, params in candidates
+            )
+        
+        histogram = MetricsRegistry().histogram('tuning_trial_seconds', 'Wall time per tuning trial', model=model)
+        for (candidate, params), result in zip(candidates, results):
+            histogram.observe(result['seconds'])
+            self.trials.append({
+                'model': model, **labels, 'candidate': candidate, 'rounds': rounds,
+                'cv_log_loss': round(result['cv_log_loss'], 6), 'seconds': round(result['seconds'], 3),
+                'worker': result['pid'], 'params': json.dumps(params)
+            })
+        
+        seconds = [result['seconds'] for result in results]
+        self.logger.info(
+            f"{model} bracket {labels['bracket']} rung {labels['rung']}: {len(candidates)} trials x {rounds} rounds, "
+            f"best {min(result['cv_log_loss'] for result in results):.5f}, "
+            f"{np.mean(seconds):.2f}s per trial ({parallel.n_jobs} workers x {threads} threads)"
+        )
+        return [result['cv_log_loss'] for result in results]
+
+
+def main(config_path='config/training_config.yaml'):
+    """Main execution"""
+
+    logger = Logger().get_logger(__name__)
+    logger.info("=" * 80)
+    logger.info("HYPERPARAMETER TUNING")
+    logger.info("=" * 80)
+
+    try:
+        config = load_config(config_path)
+        Logger().configure(config.get('logging'))
+        tracer = Tracer().configure(config.get('tracing'))
+        tracer.reset()
+        metrics = MetricsRegistry().configure(config.get('metrics'))
+        metrics.reset()
+        ConcurrencyGovernor().configure(config.get('concurrency'))
+
+        with Timer("Tuning"):
+            trials, best = HyperparameterTuner(config).run()
+
+        logger.info(f"Best parameters:\n{json.dumps(best, indent=2)}")
+        tracer.write_reports('tuning')
+        metrics.write_snapshot('tuning')
+        logger.info("Tuning completed successfully!")
+
+        return trials, best
+
+    except Exception as e:
+        logger.error(f"Pipeline execution failed: {e}", exc_info=True)
+        raise
@@ -1,9 +1,25 @@
-from .file_utils import IOHandler
-from .logger import Logger
-from .timer import Timer
-
-__all__ = [
-    'IOHandler',
-    'Logger',
-    'Timer'
-]
\ No newline at end of file
+from importlib import import_module
+
+# Public names are imported from their submodule on first access (PEP 562),
+# so `import utils` stays cheap until something is actually used
+_EXPORTS = {
+    'ConcurrencyGovernor': '.concurrency',
+    'IOHandler': '.file_utils',
+    'Logger': '.logger',
+    'lazy': '.logger',
+    'Timer': '.timer'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,192 @@
+"""
+Process-wide core budget shared by every parallel section.
+
+Worker pools and multi-threaded model fits lease their worker/thread counts
+from one ConcurrencyGovernor instead of each asking for every core
+(n_jobs=-1). A lease taken inside another one in the same context (a model
+fit inside the concurrent training section, a pool inside a scheduler node)
+draws from its parent's cores, so nested parallelism stays within the budget.
+While leases are active, BLAS/OpenMP pools in this process are capped at the
+cores per worker via threadpoolctl when it is installed; loky process pools
+get the same cap through joblib's inner_max_num_threads (the multiprocessing
+backend does not accept it, so its workers keep their BLAS defaults).
+"""
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from importlib.util import find_spec
+from utils.logger import Logger
+from utils.metrics import MetricsRegistry
+
+HAS_THREADPOOLCTL = find_spec('threadpoolctl') is not None
+
+PROCESS_BACKENDS = ('loky', 'multiprocessing')
+
+_current_lease = ContextVar('current_lease', default=None)
+
+
+def available_cores():
+    """Cores this process may use (CPU affinity and, through joblib, cgroup quotas)"""
+    try:
+        from joblib import cpu_count
+        return cpu_count()
+    except ImportError:
+        return len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+
+
+class Lease:
+    """Cores granted to one parallel section, returned by release() or at the end of a with block"""
+
+    def __init__(self, governor, name, parent, cores, workers):
+        self.governor = governor
+        self.name = name
+        self.parent = parent
+        self.cores = cores
+        self.workers = workers
+        self.inner_threads = max(1, cores // workers)  # BLAS/OpenMP threads per worker
+        self.available = cores  # Left for leases nested inside this one
+        self.children = 0
+        self.released = False
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current_lease.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _current_lease.reset(self._token)
+        self.release()
+        return False
+
+    def release(self):
+        self.governor._release(self)
+
+
+class ConcurrencyGovernor:
+    """Process-wide owner of the core budget"""
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ConcurrencyGovernor, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self.logger = Logger().get_logger(__name__)
+        self.max_cores = None
+        self._root = None
+        self._active = []
+        self._limiter = None
+        self._applied_limit = None
+        self._lock = threading.Lock()
+        self._initialized = True
+
+    def configure(self, config=None):
+        """Apply a `concurrency` config section (max_cores: null for every available core)"""
+        config = config or {}
+        with self._lock:
+            self.max_cores = config.get('max_cores')
+            self._root = None
+        self.logger.debug(f"Core budget: {self.budget}")
+        return self
+
+    @property
+    def budget(self):
+        """Total cores shared by all parallel sections"""
+        return self._root_lease().cores
+
+    def _root_lease(self):
+        if self._root is None:
+            cores = available_cores()
+            if self.max_cores:
+                cores = max(1, min(self.max_cores, cores))
+            self._root = Lease(self, 'process', None, cores, 1)
+        return self._root
+
+    def resolve(self, n_jobs, cores=None):
+        """joblib-style n_jobs (None = 1, -1 = all, -2 = all but one) as a count within `cores` (default the budget)"""
+        cores = self.budget if cores is None else cores
+        if n_jobs is None:
+            return 1
+        if n_jobs < 0:
+            return max(1, cores + 1 + n_jobs)
+        return max(1, min(n_jobs, cores))
+
+    @staticmethod
+    def current_lease():
+        """The innermost lease entered in this context, or None"""
+        return _current_lease.get()
+
+    def lease(self, n_jobs, name, workers=None):
+        """
+        Grant up to `n_jobs` cores from the enclosing lease or the process budget.
+        `workers` is how many workers share them (default one per core); a lease
+        nested inside gets at most one worker's share. Never blocks: when the
+        budget is exhausted the section still gets one core.
+        """
+        with self._lock:
+            parent = _current_lease.get() or self._root_lease()
+            if parent.released:
+                parent = self._root_lease()
+            requested = self.resolve(n_jobs, parent.inner_threads)
+            cores = max(1, min(requested, parent.available))
+            parent.available -= cores
+            parent.children += 1
+            lease = Lease(self, name, parent, cores, max(1, min(workers or cores, cores)))
+            self._active.append(lease)
+            self._apply_limits()
+
+        if cores < requested:
+            self.logger.debug(f"{name}: {cores} of {requested} requested cores ({parent.name} budget in use)")
+        MetricsRegistry().gauge('concurrency_leased_cores', 'Cores granted per parallel section', section=name).set(cores)
+        return lease
+
+    @contextmanager
+    def parallel(self, n_jobs, backend, name, workers=None, **kwargs):
+        """
+        A joblib Parallel sized by a lease; loky workers get the per-worker
+        BLAS/OpenMP cap. Fewer `workers` than cores leaves each one more threads.
+        Extra keyword arguments (return_as, pre_dispatch, ...) go to Parallel.
+        """
+        from joblib import Parallel, parallel_config
+
+        with self.lease(n_jobs, name, workers) as lease:
+            if backend == 'loky':
+                with parallel_config(backend=backend, inner_max_num_threads=lease.inner_threads):
+                    yield Parallel(n_jobs=lease.workers, **kwargs)
+            else:
+                yield Parallel(n_jobs=lease.workers, backend=backend, **kwargs)
+
+    def _release(self, lease):
+        with self._lock:
+            if lease.released:
+                return
+            lease.released = True
+            lease.parent.available += lease.cores
+            lease.parent.children -= 1
+            self._active.remove(lease)
+            self._apply_limits()
+
+    def _apply_limits(self):
+        """Cap BLAS/OpenMP threads at the smallest per-worker share among the innermost active leases"""
+        if not HAS_THREADPOOLCTL:
+            return
+        shares = [lease.inner_threads for lease in self._active if not lease.children]
+        limit = min(shares) if shares else None
+        if limit is not None and limit >= self.budget:
+            limit = None
+        if limit == self._applied_limit:
+            return
+
+        from threadpoolctl import threadpool_limits
+        if self._limiter is not None:
+            self._limiter.restore_original_limits()
+            self._limiter = None
+        if limit is not None:
+            self._limiter = threadpool_limits(limits=limit)
+        self._applied_limit = limit
@@ -0,0 +1,49 @@
+"""
+Load and type a raw extract once so several pipeline phases can share it.
+
+Phases receive shallow copies (share()): with pandas copy-on-write a phase
+that rewrites a column gets its own copy of that column only, so the shared
+frame is never re-parsed, duplicated up front or modified by another phase.
+"""
+import pandas as pd
+from utils.file_utils import IOHandler
+from utils.logger import Logger
+from utils.timer import Timer
+from utils.dtypes import convert_dtype_backend, memory_usage_mb
+
+
+def enable_copy_on_write():
+    """Copy-on-write is the default from pandas 3; opt in on pandas 2"""
+    if int(pd.__version__.split('.')[0]) < 3:
+        pd.set_option('mode.copy_on_write', True)
+
+
+def parse_dates(df):
+    """Parse every '*date*' column in place (the pyarrow parser already yields timestamps)"""
+    for col in [col for col in df.columns if 'date' in col.lower()]:
+        if not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    return df
+
+
+@Timer.measure
+def load_dataset(data_config, dtype_backend, io_handler=None):
+    """Read `data.file_path` once with the configured dtype backend, dates parsed"""
+    logger = Logger().get_logger(__name__)
+    file_path = data_config['file_path']
+    IOHandler.validate_file(file_path)
+
+    df = (io_handler or IOHandler()).read_csv(
+        file_path,
+        encoding=data_config.get('encoding', 'utf-8'),
+        dtype_backend=dtype_backend,
+        nrows=data_config.get('max_rows')
+    )
+    df = convert_dtype_backend(parse_dates(df), dtype_backend)
+    logger.info(f"Dataset loaded once: {df.shape} ({dtype_backend} dtypes, {memory_usage_mb(df)} MB)")
+    return df
+
+
+def share(df):
+    """A view of the shared frame that a phase may modify freely"""
+    return df.copy(deep=False)
@@ -0,0 +1,46 @@
+from utils.logger import Logger
+
+DTYPE_BACKENDS = ('numpy', 'numpy_nullable', 'pyarrow')
+
+
+def resolve_dtype_backend(config):
+    """Read and validate `data.dtype_backend` from a pipeline config"""
+    backend = (config.get('data') or {}).get('dtype_backend') or 'numpy'
+    if backend not in DTYPE_BACKENDS:
+        raise ValueError(f"Unsupported dtype_backend '{backend}', expected one of {DTYPE_BACKENDS}")
+    return backend
+
+
+def read_csv_options(dtype_backend, nrows=None, chunked=False):
+    """Build pd.read_csv keyword arguments for a dtype backend"""
+    if dtype_backend in (None, 'numpy'):
+        return {'nrows': nrows} if nrows else {}
+
+    options = {'dtype_backend': dtype_backend}
+    # The pyarrow parser is multi-threaded but cannot stop after `nrows` or read in chunks
+    if dtype_backend == 'pyarrow' and not nrows and not chunked:
+        options['engine'] = 'pyarrow'
+    elif nrows:
+        options['nrows'] = nrows
+    return options
+
+
+def convert_dtype_backend(df, dtype_backend):
+    """Convert columns that fell back to NumPy object arrays onto the configured backend"""
+    if dtype_backend in (None, 'numpy'):
+        return df
+
+    object_cols = df.select_dtypes(include=['object']).columns
+    if len(object_cols) == 0:
+        return df
+
+    converted = df[object_cols].convert_dtypes(dtype_backend=dtype_backend)
+    for col in object_cols:
+        df[col] = converted[col]
+    Logger().get_logger(__name__).debug(f"Converted {len(object_cols)} object columns to {dtype_backend} dtypes")
+    return df
+
+
+def memory_usage_mb(df):
+    """Deep memory footprint of a DataFrame in megabytes"""
+    return round(df.memory_usage(deep=True).sum() / 1024 ** 2, 2)
@@ -1,21 +1,122 @@
+import numpy as np
 import pandas as pd
 import json
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from utils.logger import Logger
 from utils.timer import Timer
+from utils.dtypes import read_csv_options
+from utils.metrics import MetricsRegistry
+
+
+def _record_bytes_written(filepath, fmt):
+    MetricsRegistry().counter(
+        'bytes_written_total', 'Bytes written to output files', format=fmt
+    ).inc(Path(filepath).stat().st_size)
+
+
+def _sqlite_size(db_path):
+    """Bytes on disk for a database and its WAL file"""
+    return sum(path.stat().st_size for path in (Path(db_path), Path(f"{db_path}-wal")) if path.exists())
+
+
+def _sqlite_type(dtype):
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+    return 'TEXT'
+
+
+def _sqlite_rows(df):
+    """Row tuples of Python scalars that sqlite3 can bind; non-numeric values as text"""
+    columns = []
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+            values = series.astype(object).where(series.notna(), None).tolist()
+        else:
+            values = [None if value is None or (isinstance(value, float) and np.isnan(value)) else str(value)
+                      for value in series.tolist()]
+        columns.append(values)
+    return zip(*columns)
+
+
+class SQLitePool:
+    """One shared connection per database file (WAL mode), serialised by a per-database lock"""
+    
+    _instance = None
+    
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+    
+    def __init__(self):
+        if self._initialized:
+            return
+        self._connections = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+        self._initialized = True
+    
+    def _connect(self, db_path):
+        key = str(Path(db_path).resolve())
+        with self._guard:
+            if key not in self._connections:
+                conn = sqlite3.connect(key, check_same_thread=False, isolation_level=None)
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('PRAGMA synchronous=NORMAL')
+                self._connections[key] = conn
+                self._locks[key] = threading.Lock()
+            return self._connections[key], self._locks[key]
+    
+    @contextmanager
+    def transaction(self, db_path):
+        """
+        Yield the pooled connection inside one BEGIN IMMEDIATE ... COMMIT transaction.
+        Counts the growth of the database plus its WAL as bytes written, so
+        appends to a long-lived database are not counted at its full size
+        (WAL space reused after a checkpoint counts as 0).
+        """
+        conn, lock = self._connect(db_path)
+        with lock:
+            conn.execute('BEGIN IMMEDIATE')
+            size = _sqlite_size(db_path)
+            try:
+                yield conn
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+            MetricsRegistry().counter(
+                'bytes_written_total', 'Bytes written to output files', format='sqlite'
+            ).inc(max(_sqlite_size(db_path) - size, 0))
+    
+    def close_all(self):
+        with self._guard:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+            self._locks.clear()
+
 
 class IOHandler:
     def __init__(self, results_dir='./results'):
         self.results_dir = Path(results_dir)
         self.results_dir.mkdir(exist_ok=True)
-        self.logger = Logger().get_logger()
+        self.logger = Logger().get_logger(__name__)
     
     @Timer.measure
-    def read_csv(self, filepath, encoding='utf-8', **kwargs):
+    def read_csv(self, filepath, encoding='utf-8', dtype_backend=None, **kwargs):
         """Read CSV with error handling"""
         try:
             self.logger.info(f"Reading CSV: {filepath}")
+            if dtype_backend is not None:
+                kwargs.update(read_csv_options(dtype_backend, kwargs.pop('nrows', None)))
             df = pd.read_csv(filepath, encoding=encoding, **kwargs)
             
             if df.empty:
@@ -34,18 +135,57 @@ class IOHandler:
             self.logger.error(f"Error reading CSV: {e}")
             raise
     
+    def iter_csv(self, filepath, chunksize, encoding='utf-8', dtype_backend=None, offset=0, **kwargs):
+        """Yield a CSV as DataFrame chunks of `chunksize` rows, optionally from a byte offset past the header"""
+        try:
+            self.logger.info(f"Streaming CSV: {filepath} ({chunksize} rows per chunk, offset {offset})")
+            if dtype_backend is not None:
+                kwargs.update(read_csv_options(dtype_backend, kwargs.pop('nrows', None), chunked=True))
+            if not offset:
+                with pd.read_csv(filepath, encoding=encoding, chunksize=chunksize, **kwargs) as reader:
+                    yield from reader
+                return
+            
+            # Appended rows: keep the header's column names and parse from the offset on
+            names = pd.read_csv(filepath, encoding=encoding, nrows=0).columns.tolist()
+            with open(filepath, 'rb') as handle:
+                handle.seek(offset)
+                with pd.read_csv(handle, encoding=encoding, chunksize=chunksize, header=None, names=names, **kwargs) as reader:
+                    yield from reader
+        
+        except FileNotFoundError:
+            self.logger.error(f"File not found: {filepath}")
+            raise
+        except Exception as e:
+            self.logger.error(f"Error streaming CSV: {e}")
+            raise
+    
     @Timer.measure
     def save_csv(self, df, filename, index=False):
         """Save DataFrame to CSV"""
         try:
             filepath = self.results_dir / f"{filename}.csv"
             df.to_csv(filepath, index=index)
+            _record_bytes_written(filepath, 'csv')
             self.logger.info(f"Saved CSV: {filepath}")
             return filepath
         except Exception as e:
             self.logger.error(f"Error saving CSV: {e}")
             raise
     
+    @Timer.measure
+    def save_parquet(self, df, filename):
+        """Save DataFrame as parquet (needs pyarrow)"""
+        try:
+            filepath = self.results_dir / f"{filename}.parquet"
+            df.to_parquet(filepath, index=False)
+            _record_bytes_written(filepath, 'parquet')
+            self.logger.info(f"Saved parquet: {filepath}")
+            return filepath
+        except Exception as e:
+            self.logger.error(f"Error saving parquet: {e}")
+            raise
+    
     @Timer.measure
     def save_json(self, data, filename):
         """Save data to JSON"""
@@ -53,6 +193,7 @@ class IOHandler:
             filepath = self.results_dir / f"{filename}.json"
             with open(filepath, 'w') as f:
                 json.dump(data, f, indent=2, default=str)
+            _record_bytes_written(filepath, 'json')
             self.logger.info(f"Saved JSON: {filepath}")
             return filepath
         except Exception as e:
@@ -60,25 +201,97 @@ class IOHandler:
             raise
     
     @Timer.measure
-    def save_to_sqlite(self, data, table_name, db_name='eda_results.db'):
-        """Save results to SQLite database"""
+    def save_npz(self, filename, **arrays):
+        """Save named arrays to a compressed NumPy archive"""
         try:
-            db_path = self.results_dir / db_name
-            conn = sqlite3.connect(db_path)
-            
-            if isinstance(data, pd.DataFrame):
-                data.to_sql(table_name, conn, if_exists='replace', index=False)
-            else:
-                df = pd.DataFrame([data])
-                df.to_sql(table_name, conn, if_exists='replace', index=False)
+            filepath = self.results_dir / f"{filename}.npz"
+            np.savez_compressed(filepath, **arrays)
+            _record_bytes_written(filepath, 'npz')
+            self.logger.info(f"Saved NPZ: {filepath}")
+            return filepath
+        except Exception as e:
+            self.logger.error(f"Error saving NPZ: {e}")
+            raise
+    
+    @Timer.measure
+    def save_sparse(self, matrix, filename):
+        """Save a scipy sparse matrix as .npz"""
+        try:
+            from scipy import sparse
             
-            conn.close()
-            self.logger.info(f"Saved to SQLite table '{table_name}' in {db_path}")
+            filepath = self.results_dir / f"{filename}.npz"
+            sparse.save_npz(filepath, matrix)
+            _record_bytes_written(filepath, 'npz')
+            self.logger.info(f"Saved sparse NPZ: {filepath} {matrix.shape}, {matrix.nnz} non-zeros")
+            return filepath
+        except Exception as e:
+            self.logger.error(f"Error saving sparse NPZ: {e}")
+            raise
+    
+    @Timer.measure
+    def save_html(self, html, filename):
+        """Save an HTML document"""
+        try:
+            filepath = self.results_dir / f"{filename}.html"
+            filepath.write_text(html, encoding='utf-8')
+            _record_bytes_written(filepath, 'html')
+            self.logger.info(f"Saved HTML: {filepath}")
+            return filepath
+        except Exception as e:
+            self.logger.error(f"Error saving HTML: {e}")
+            raise
+    
+    @Timer.measure
+    def save_to_sqlite(self, data, table_name, db_name='eda_results.db', run_id=None):
+        """Save results to SQLite database (replaces the table unless a run_id is given)"""
+        if not isinstance(data, pd.DataFrame):
+            data = pd.DataFrame([data])
+        return self.save_tables_to_sqlite({table_name: data}, db_name, run_id=run_id)
+    
+    @Timer.measure
+    def save_tables_to_sqlite(self, tables, db_name='eda_results.db', run_id=None):
+        """
+        Write {table: DataFrame} in one transaction on the pooled connection.
+        With a run_id every row is tagged with it and appended, so runs sit side
+        by side (rewriting a run_id replaces its rows); without one, tables are replaced.
+        """
+        try:
+            db_path = self.results_dir / db_name
+            with SQLitePool().transaction(db_path) as conn:
+                for table_name, df in tables.items():
+                    self._write_sqlite_table(conn, table_name, df, run_id)
+            self.logger.info(f"Saved {len(tables)} tables to SQLite in {db_path}")
             return db_path
         except Exception as e:
             self.logger.error(f"Error saving to SQLite: {e}")
             raise
     
+    @staticmethod
+    def _write_sqlite_table(conn, table_name, df, run_id):
+        if run_id is not None:
+            df = df.drop(columns='run_id', errors='ignore')
+            df.insert(0, 'run_id', run_id)
+        df = df.rename(columns=str)
+        quoted = {col: '"' + col.replace('"', '""') + '"' for col in df.columns}
+        table = '"' + table_name.replace('"', '""') + '"'
+        
+        if run_id is None:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(f'{quoted[col]} {_sqlite_type(df[col].dtype)}' for col in df.columns)})")
+        
+        # Later runs may carry extra statistics (e.g. error bounds): widen the table instead of failing
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for col in df.columns:
+            if col not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {quoted[col]} {_sqlite_type(df[col].dtype)}")
+        
+        if run_id is not None:
+            conn.execute(f"DELETE FROM {table} WHERE run_id = ?", (run_id,))
+        conn.executemany(
+            f"INSERT INTO {table} ({', '.join(quoted.values())}) VALUES ({', '.join('?' * len(quoted))})",
+            _sqlite_rows(df)
+        )
+    
     @staticmethod
     def validate_file(filepath):
         """Validate file exists and is readable"""
@@ -92,6 +305,6 @@ class IOHandler:
                 raise ValueError(f"File is empty: {filepath}")
             return True
         except Exception as e:
-            logger = Logger().get_logger()
+            logger = Logger().get_logger(__name__)
             logger.error(f"File validation failed: {e}")
             raise
\ No newline at end of file
@@ -1,51 +1,110 @@
+import atexit
 import logging
+import os
+import queue
 import sys
 from pathlib import Path
 from datetime import datetime
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import TimedRotatingFileHandler, QueueHandler, QueueListener
+
+ROOT_LOGGER = 'CUSTOMER CHURN PREDICTION'
+
+
+class lazy:
+    """
+    Defer building a log argument until a handler actually formats it:
+        logger.info("Distribution: %s", lazy(series.value_counts))
+    Nothing is computed when the level is filtered out.
+    """
+    __slots__ = ('func', 'args', 'kwargs')
+
+    def __init__(self, func, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self):
+        return str(self.func(*self.args, **self.kwargs))
+
 
 class Logger:
     _instance = None
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(Logger, cls).__new__(cls)
             cls._instance._initialized = False
         return cls._instance
-    
+
     def __init__(self):
         if self._initialized:
             return
-        
+
         self.log_dir = Path('./logs')
         self.log_dir.mkdir(exist_ok=True)
-        
+
         LOG_FILE = self.log_dir/f'customer_churn_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log'
 
-        self.logger = logging.getLogger('CUSTOMER CHURN PREDICTION')
+        self.logger = logging.getLogger(ROOT_LOGGER)
         self.logger.setLevel(logging.INFO)
-        
+
         file_handler = TimedRotatingFileHandler(
             filename=LOG_FILE,
             when='midnight',
             backupCount=7,
         )
-        file_handler.setLevel(logging.INFO)
-        
+
         console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.INFO)
-        
+
         formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(funcName)s:%(lineno)d - %(levelname)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
-        
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
-        
+
+        # Callers only enqueue records; a background listener does the file/stdout I/O.
+        # Level filtering happens on the loggers, before any record or message is built.
+        self._handlers = (file_handler, console_handler)
+        self._queue_handler = QueueHandler(queue.SimpleQueue())
+        self.logger.addHandler(self._queue_handler)
+        self._start_listener()
+
+        atexit.register(self.shutdown)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
         self._initialized = True
-    
-    def get_logger(self):
-        return self.logger
\ No newline at end of file
+
+    def _start_listener(self):
+        self._listener = QueueListener(self._queue_handler.queue, *self._handlers, respect_handler_level=True)
+        self._listener.start()
+
+    def _after_fork(self):
+        """The listener thread does not survive fork(); give the child its own queue and listener"""
+        self._queue_handler.queue = queue.SimpleQueue()
+        self._start_listener()
+
+    def shutdown(self):
+        """Flush queued records and stop the background writer"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    def configure(self, config=None):
+        """
+        Apply a `logging` config section:
+            level: default level for the project logger
+            modules: per-module overrides, e.g. {'preprocessing.data_splitter': 'WARNING'}
+        """
+        config = config or {}
+        self.logger.setLevel(config.get('level', 'INFO'))
+        for module, level in (config.get('modules') or {}).items():
+            logging.getLogger(f'{ROOT_LOGGER}.{module}').setLevel(level)
+        return self
+
+    def get_logger(self, name=None):
+        """Project logger, or the child logger for a module so its verbosity can be tuned"""
+        if name is None or name == '__main__':
+            return self.logger
+        return self.logger.getChild(name)
@@ -0,0 +1,209 @@
+import json
+import math
+import threading
+from datetime import datetime
+from pathlib import Path
+from utils.logger import Logger
+
+# Seconds; spans sub-millisecond lookups up to multi-minute stages
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+class Counter:
+    """Monotonically increasing value"""
+    kind = 'counter'
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self):
+        return {'value': self.value}
+
+
+class Gauge:
+    """Value that can go up and down"""
+    kind = 'gauge'
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        with self._lock:
+            self.value = value
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self):
+        return {'value': self.value}
+
+
+class Histogram:
+    """Cumulative-bucket distribution of observations"""
+    kind = 'histogram'
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+    def snapshot(self):
+        cumulative, running = {}, 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            cumulative[str(bound)] = running
+        cumulative['+Inf'] = self.count
+        return {'buckets': cumulative, 'sum': self.sum, 'count': self.count}
+
+
+class MetricsRegistry:
+    """Process-wide registry of labelled counters, gauges and histograms"""
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(MetricsRegistry, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self.logger = Logger().get_logger(__name__)
+        self.enabled = False
+        self.prefix = 'churn'
+        self.output_dir = Path('./results/metrics')
+        self.formats = ['prometheus', 'json']
+        self._metrics = {}  # name -> {'kind', 'help', 'series': {labels_tuple: metric}}
+        self._lock = threading.Lock()
+        self._initialized = True
+
+    def configure(self, config=None):
+        """Apply a `metrics` config section (enabled, output_dir, formats, prefix)"""
+        config = config or {}
+        self.enabled = config.get('enabled', False)
+        self.output_dir = Path(config.get('output_dir', self.output_dir))
+        self.formats = config.get('formats', self.formats)
+        self.prefix = config.get('prefix', self.prefix)
+        return self
+
+    def reset(self):
+        """Drop every series; snapshots then count from the start of the current run"""
+        with self._lock:
+            self._metrics = {}
+
+    def counter(self, name, help='', **labels):
+        return self._get(name, Counter, help, labels)
+
+    def gauge(self, name, help='', **labels):
+        return self._get(name, Gauge, help, labels)
+
+    def histogram(self, name, help='', buckets=DEFAULT_BUCKETS, **labels):
+        return self._get(name, lambda: Histogram(buckets), help, labels, kind='histogram')
+
+    def _get(self, name, factory, help, labels, kind=None):
+        kind = kind or factory.kind
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            family = self._metrics.setdefault(name, {'kind': kind, 'help': help, 'series': {}})
+            if family['kind'] != kind:
+                raise ValueError(f"Metric {name} already registered as a {family['kind']}")
+            if key not in family['series']:
+                family['series'][key] = factory()
+            return family['series'][key]
+
+    def to_dict(self):
+        """JSON-serialisable snapshot of every series"""
+        with self._lock:
+            families = list(self._metrics.items())
+        snapshot = {}
+        for name, family in families:
+            snapshot[f"{self.prefix}_{name}"] = {
+                'type': family['kind'],
+                'help': family['help'],
+                'series': [
+                    {'labels': dict(labels), **metric.snapshot()}
+                    for labels, metric in family['series'].items()
+                ]
+            }
+        return snapshot
+
+    def to_prometheus(self):
+        """Prometheus text exposition format"""
+        lines = []
+        for name, family in self.to_dict().items():
+            if family['help']:
+                lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            for series in family['series']:
+                labels = series['labels']
+                if family['type'] == 'histogram':
+                    for bound, count in series['buckets'].items():
+                        lines.append(f"{name}_bucket{_format_labels({**labels, 'le': bound})} {count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(series['sum'])}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {series['count']}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(series['value'])}")
+        return '\n'.join(lines) + '\n'
+
+    def write_snapshot(self, run_name):
+        """Write <run>_<timestamp>.prom / .json snapshots; returns the written paths"""
+        if not self.enabled:
+            return []
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now()
+        stem = f"{run_name}_{timestamp.strftime('%Y%m%d_%H%M%S')}"
+        paths = []
+
+        if 'prometheus' in self.formats:
+            path = self.output_dir / f"{stem}.prom"
+            path.write_text(self.to_prometheus())
+            paths.append(path)
+
+        if 'json' in self.formats:
+            path = self.output_dir / f"{stem}.json"
+            with open(path, 'w') as f:
+                json.dump({'run': run_name, 'timestamp': timestamp.isoformat(), 'metrics': self.to_dict()},
+                          f, indent=2, default=str)
+            paths.append(path)
+
+        self.logger.info(f"Metrics snapshot written: {[str(p) for p in paths]}")
+        return paths
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = {
+        k: str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        for k, v in labels.items()
+    }
+    return '{' + ','.join(f'{k}="{v}"' for k, v in escaped.items()) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float) and math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -0,0 +1,88 @@
+"""
+Zero-copy numpy arrays for process-pool workers.
+
+SharedArrays publishes arrays once as raw memory-mapped files (in /dev/shm,
+i.e. RAM, where available). Tasks are sent only the small picklable specs,
+and attach_arrays() maps the files read-only inside the worker, so every
+process reads the same pages instead of unpickling its own copy. Plain files
+avoid multiprocessing.shared_memory's resource tracker, which unlinks
+segments attached by workers when those workers exit.
+"""
+import os
+import tempfile
+from pathlib import Path
+import numpy as np
+from utils.concurrency import ConcurrencyGovernor, PROCESS_BACKENDS
+
+SHM_DIR = '/dev/shm'
+
+# Read-only maps opened in this process, keyed by file path
+_ATTACHED = {}
+
+
+def uses_processes(performance):
+    """True when `performance` asks for a process backend with more than one worker within the core budget"""
+    if performance.get('backend') not in PROCESS_BACKENDS:
+        return False
+    return ConcurrencyGovernor().resolve(performance.get('n_jobs', 1)) > 1
+
+
+class SharedArrays:
+    """Context manager: publish arrays as memory-mapped files, yield their specs, delete on exit"""
+
+    def __init__(self, **arrays):
+        self.arrays = arrays
+        self.paths = []
+
+    def __enter__(self):
+        directory = SHM_DIR if os.path.isdir(SHM_DIR) and os.access(SHM_DIR, os.W_OK) else None
+        specs = {}
+        for key, array in self.arrays.items():
+            array = np.ascontiguousarray(array)
+            path = None
+            if array.nbytes:
+                handle, path = tempfile.mkstemp(prefix='eda_', suffix='.bin', dir=directory)
+                with os.fdopen(handle, 'wb') as f:
+                    array.tofile(f)
+                self.paths.append(path)
+            specs[key] = (path, array.shape, array.dtype.str)
+        return specs
+
+    def __exit__(self, *exc):
+        for path in self.paths:
+            _ATTACHED.pop(path, None)
+            Path(path).unlink(missing_ok=True)
+        return False
+
+
+def attach_arrays(specs):
+    """Read-only ndarray views onto the files described by `specs`, mapped once per process"""
+    paths = {spec[0] for spec in specs.values()}
+    for path in [path for path in _ATTACHED if path not in paths]:
+        del _ATTACHED[path]
+
+    arrays = {}
+    for key, (path, shape, dtype) in specs.items():
+        if path is None:
+            arrays[key] = np.empty(shape, dtype=np.dtype(dtype))
+            continue
+        if path not in _ATTACHED:
+            _ATTACHED[path] = np.memmap(path, dtype=np.dtype(dtype), mode='r', shape=shape)
+        arrays[key] = _ATTACHED[path]
+    return arrays
+
+
+def map_column_slabs(func, arrays, n_cols, n_jobs, backend, *args):
+    """
+    Publish `arrays` once and run func(specs, columns, *args) over contiguous
+    column slabs in a joblib pool sized by the core budget; results come
+    back in column order.
+    """
+    if n_cols == 0:
+        return []
+    from joblib import delayed
+    
+    with ConcurrencyGovernor().parallel(n_jobs, backend, func.__name__) as parallel:
+        slabs = np.array_split(np.arange(n_cols), min(n_cols, parallel.n_jobs * 2))
+        with SharedArrays(**arrays) as specs:
+            return parallel(delayed(func)(specs, slab, *args) for slab in slabs)
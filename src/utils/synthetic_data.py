@@ -0,0 +1,244 @@
+"""
+Seeded synthetic generator for the raw customer churn extract.
+
+Reproduces the schema of data/raw/customer_churn.csv (invoice lines with
+customer attributes and a customer-level Churn_Flag) with realistic
+cardinalities, cancellations, zero prices, duplicate lines and the
+systematic Customer ID nulls seen in the real data.
+
+Usage (from src/):
+    python -m utils.synthetic_data --rows 1m --output ../data/synthetic/churn_1m.csv
+"""
+import argparse
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from utils.logger import Logger
+from utils.timer import Timer
+
+COLUMNS = [
+    'Invoice', 'StockCode', 'Description', 'Quantity', 'InvoiceDate', 'Price', 'Customer ID',
+    'Country', 'Customer_Age', 'Gender', 'Signup_Date', 'Last_Login_Date', 'Customer_Segment',
+    'Marketing_Channel', 'Category', 'Subcategory', 'Cost', 'Discount_Applied', 'Payment_Method',
+    'Promo_Applied', 'Delivery_Time_Days', 'Revenue', 'Profit', 'Churn_Flag'
+]
+
+COUNTRIES = [
+    'United Kingdom', 'EIRE', 'Germany', 'France', 'Netherlands', 'Spain', 'Switzerland', 'Belgium',
+    'Portugal', 'Australia', 'Channel Islands', 'Italy', 'Norway', 'Sweden', 'Cyprus', 'Finland',
+    'Austria', 'Denmark', 'Greece', 'Japan', 'Poland', 'USA', 'Israel', 'Unspecified', 'Singapore',
+    'Iceland', 'Canada', 'Malta', 'Lithuania', 'United Arab Emirates', 'Bahrain', 'RSA', 'Korea',
+    'Brazil', 'Thailand', 'Hong Kong', 'Lebanon', 'Czech Republic', 'European Community', 'Nigeria',
+    'West Indies', 'Bermuda', 'Saudi Arabia'
+]
+CATEGORIES = {
+    'Home Decor': ['Decor', 'Lighting', 'Furniture'],
+    'Kitchen': ['Appliances', 'Cookware', 'Tableware'],
+    'Toys': ['Kids', 'Games', 'Puzzles'],
+    'Clothing': ['Men', 'Women'],
+    'Stationery': ['Paper', 'Pens', 'Cards'],
+    'Garden': ['Plants', 'Tools', 'Outdoor'],
+}
+WORDS = [
+    'CHRISTMAS', 'GLASS', 'BALL', 'LIGHTS', 'PINK', 'WHITE', 'CHERRY', 'RECORD', 'FRAME', 'HEART',
+    'CERAMIC', 'TRINKET', 'BOX', 'DOUGHNUT', 'POT', 'PLANET', 'MUG', 'DOORMAT', 'BOWL', 'SPOONS',
+    'LUNCHBOX', 'CUTLERY', 'FAIRY', 'CAKES', 'BLOCK', 'WORD', 'BIRD', 'ORNAMENT', 'WOODEN', 'LETTERS',
+    'IVORY', 'TRELLIS', 'FILIGREE', 'DOVE', 'VINTAGE', 'RETROSPOT', 'BAG', 'JUMBO', 'RED', 'BLUE',
+    'HANGING', 'HOLDER', 'CANDLE', 'TEA', 'SET', 'PAPER', 'CHAIN', 'KIT', 'STAR', 'GREEN'
+]
+SIZES = {'100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
+
+
+def parse_size(value):
+    """Accept row counts such as 250000, 100k, 1m or 10m"""
+    value = str(value).lower()
+    if value in SIZES:
+        return SIZES[value]
+    for suffix, factor in (('k', 1_000), ('m', 1_000_000)):
+        if value.endswith(suffix):
+            return int(float(value[:-1]) * factor)
+    return int(value)
+
+
+class SyntheticChurnGenerator:
+    """Generate raw churn extracts in reproducible chunks"""
+
+    def __init__(self, seed=42, n_customers=5942, n_products=4873, start_date='2009-12-01',
+                 days=740, null_customer_rate=0.23, duplicate_rate=0.005, churn_rate=0.64):
+        self.logger = Logger().get_logger(__name__)
+        self.seed = seed
+        self.start = np.datetime64(start_date, 's')
+        self.days = days
+        self.null_customer_rate = null_customer_rate
+        self.duplicate_rate = duplicate_rate
+
+        rng = np.random.default_rng(seed)
+        self._build_products(rng, n_products)
+        self._build_customers(rng, n_customers, churn_rate)
+
+    def _build_products(self, rng, n_products):
+        """Stock codes, descriptions, categories and Zipf-like popularity"""
+        numbers = rng.choice(np.arange(10000, 90000), n_products, replace=False).astype(str)
+        suffixes = np.where(rng.random(n_products) < 0.15, rng.choice(list('ABCDEFGLNPSW'), n_products), '')
+        self.stock_codes = np.char.add(numbers, suffixes)
+
+        words = rng.choice(WORDS, (n_products, 4))
+        lengths = rng.integers(2, 5, n_products)
+        descriptions = [' '.join(row[:n]) for row, n in zip(words, lengths)]
+        # Disambiguate so cardinality tracks the stock codes, as in the real extract
+        self.descriptions = np.array([f'{d} {i % 97}' if i % 5 == 0 else d for i, d in enumerate(descriptions)])
+
+        categories = list(CATEGORIES)
+        self.product_category = rng.integers(0, len(categories), n_products)
+        self.categories = np.array(categories)
+        self.product_subcategory = np.array([
+            rng.choice(CATEGORIES[categories[c]]) for c in self.product_category
+        ])
+        self.product_price = np.round(rng.lognormal(0.75, 0.8, n_products), 2)
+
+        popularity = 1.0 / np.arange(1, n_products + 1) ** 0.9
+        self.product_p = popularity / popularity.sum()
+
+    def _build_customers(self, rng, n_customers, churn_rate):
+        """Customer-level attributes; churn is a customer label"""
+        self.customer_ids = np.arange(12346, 12346 + n_customers).astype(float)
+        country_p = np.r_[0.9, np.full(len(COUNTRIES) - 1, 0.1 / (len(COUNTRIES) - 1))]
+        self.country_p = country_p
+        self.customer_country = rng.choice(len(COUNTRIES), n_customers, p=country_p)
+        self.customer_age = rng.integers(18, 80, n_customers).astype(float)
+        self.customer_gender = rng.choice(['Female', 'Male'], n_customers)
+        self.customer_segment = rng.choice(['Regular', 'VIP', 'New'], n_customers, p=[0.6, 0.15, 0.25])
+        self.customer_channel = rng.choice(['Organic', 'Referral', 'Ads', 'Email'], n_customers)
+        self.customer_signup_days = rng.integers(30, 900, n_customers)
+
+        # Churn loosely tied to segment and activity so the tests have signal
+        base = np.where(self.customer_segment == 'VIP', churn_rate - 0.1, churn_rate + 0.1)
+        self.customer_churn = (rng.random(n_customers) < np.clip(base, 0, 1)).astype(int)
+        activity = rng.gamma(1.2, 1.0, n_customers) * np.where(self.customer_churn == 1, 0.85, 1.15)
+        self.customer_p = activity / activity.sum()
+
+    def iter_chunks(self, n_rows, chunk_size=1_000_000):
+        """Yield DataFrames totalling `n_rows` rows"""
+        next_invoice = 489434
+        for index, start in enumerate(range(0, n_rows, chunk_size)):
+            rows = min(chunk_size, n_rows - start)
+            rng = np.random.default_rng([self.seed, index])
+            chunk, next_invoice = self._generate(rng, rows, next_invoice, start / max(n_rows, 1))
+            yield chunk
+
+    @Timer.measure
+    def generate(self, n_rows, chunk_size=1_000_000):
+        """Whole extract in memory"""
+        return pd.concat(self.iter_chunks(n_rows, chunk_size), ignore_index=True)
+
+    @Timer.measure
+    def write_csv(self, path, n_rows, chunk_size=1_000_000):
+        """Stream an extract to CSV without holding it in memory"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for i, chunk in enumerate(self.iter_chunks(n_rows, chunk_size)):
+            chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        self.logger.info(f"Synthetic extract written: {path} ({n_rows} rows)")
+        return path
+
+    def _generate(self, rng, n_rows, first_invoice, progress):
+        # Invoice structure: ~19 lines per invoice, lines share date/customer/country
+        unique_rows = max(n_rows - int(n_rows * self.duplicate_rate), 1)
+        sizes = rng.geometric(1 / 19, unique_rows // 10 + 10)
+        sizes = sizes[:np.searchsorted(np.cumsum(sizes), unique_rows) + 1]
+        sizes[-1] -= sizes.sum() - unique_rows
+        n_invoices = len(sizes)
+        line_invoice = np.repeat(np.arange(n_invoices), sizes)
+
+        invoice_numbers = (first_invoice + np.arange(n_invoices)).astype(str)
+        cancelled = rng.random(n_invoices) < 0.02
+        invoice_numbers = np.where(cancelled, np.char.add('C', invoice_numbers), invoice_numbers)
+
+        span = int(self.days * 86400)
+        offsets = np.sort(rng.integers(int(progress * span), span, n_invoices))
+        invoice_date = self.start + offsets.astype('timedelta64[s]')
+        invoice_date = invoice_date.astype('datetime64[m]').astype('datetime64[s]')
+
+        invoice_customer = rng.choice(len(self.customer_ids), n_invoices, p=self.customer_p)
+        has_customer = rng.random(n_invoices) >= self.null_customer_rate
+
+        customer = invoice_customer[line_invoice]
+        known = has_customer[line_invoice]
+        product = rng.choice(len(self.stock_codes), unique_rows, p=self.product_p)
+
+        quantity = rng.geometric(0.12, unique_rows)
+        quantity[rng.random(unique_rows) < 0.001] *= rng.integers(50, 500)
+        quantity = np.where(cancelled[line_invoice], -quantity, quantity)
+
+        price = self.product_price[product] * rng.choice([1.0, 0.85, 1.15], unique_rows, p=[0.8, 0.1, 0.1])
+        price = np.round(price, 2)
+        price[rng.random(unique_rows) < 0.004] = 0.0
+        cost = price * rng.uniform(0.3, 0.8, unique_rows)
+        revenue = quantity * price
+        profit = revenue - quantity * cost
+
+        dates = invoice_date[line_invoice]
+        signup = dates - (self.customer_signup_days[customer] * 86400).astype('timedelta64[s]')
+        last_login = dates - rng.integers(1, 90 * 86400, unique_rows).astype('timedelta64[s]')
+
+        def customer_attr(values, dtype=object):
+            out = values[customer].astype(dtype)
+            out[~known] = np.nan if dtype == float else None
+            return out
+
+        country_idx = np.where(known, self.customer_country[customer],
+                               rng.choice(len(COUNTRIES), unique_rows, p=self.country_p))
+
+        df = pd.DataFrame({
+            'Invoice': invoice_numbers[line_invoice],
+            'StockCode': self.stock_codes[product],
+            'Description': self.descriptions[product].astype(object),
+            'Quantity': quantity,
+            'InvoiceDate': pd.Series(dates).astype(str),
+            'Price': price,
+            'Customer ID': np.where(known, self.customer_ids[customer], np.nan),
+            'Country': np.array(COUNTRIES)[country_idx],
+            'Customer_Age': customer_attr(self.customer_age, float),
+            'Gender': customer_attr(self.customer_gender),
+            'Signup_Date': pd.Series(signup).astype(str),
+            'Last_Login_Date': pd.Series(last_login).astype(str),
+            'Customer_Segment': customer_attr(self.customer_segment),
+            'Marketing_Channel': customer_attr(self.customer_channel),
+            'Category': self.categories[self.product_category[product]],
+            'Subcategory': self.product_subcategory[product],
+            'Cost': cost,
+            'Discount_Applied': (rng.random(unique_rows) < 0.1).astype(int),
+            'Payment_Method': rng.choice(['Credit Card', 'PayPal', 'Cash', 'Bank Transfer'], unique_rows),
+            'Promo_Applied': (rng.random(unique_rows) < 0.2).astype(int),
+            'Delivery_Time_Days': rng.integers(1, 10, unique_rows),
+            'Revenue': revenue,
+            'Profit': profit,
+            'Churn_Flag': np.where(known, self.customer_churn[customer], rng.random(unique_rows) < 0.64).astype(int),
+        }, columns=COLUMNS)
+
+        # Sparse nulls seen in the real extract
+        df.loc[rng.random(unique_rows) < 0.005, 'Description'] = np.nan
+
+        # Exact duplicate lines
+        n_duplicates = n_rows - unique_rows
+        if n_duplicates > 0:
+            duplicates = df.iloc[rng.integers(0, unique_rows, n_duplicates)]
+            df = pd.concat([df, duplicates], ignore_index=True)
+
+        return df, first_invoice + n_invoices
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', default='100k', help='Row count: 100k, 1m, 10m or an integer')
+    parser.add_argument('--output', required=True, help='Destination CSV path')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    generator = SyntheticChurnGenerator(seed=args.seed)
+    generator.write_csv(args.output, parse_size(args.rows), args.chunk_size)
+
+
+if __name__ == '__main__':
+    main()
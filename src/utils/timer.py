@@ -1,29 +1,68 @@
 import time
 from functools import wraps
 from utils.logger import Logger
+from utils.tracing import Tracer
+from utils.metrics import MetricsRegistry
+
+
+def _row_count(obj):
+    """Rows of a DataFrame-like object (or of a tuple of them), else None"""
+    if isinstance(obj, tuple):
+        counts = [_row_count(item) for item in obj]
+        counts = [c for c in counts if c is not None]
+        return sum(counts) if counts else None
+    shape = getattr(obj, 'shape', None)
+    if shape is not None and len(shape) == 2:
+        return shape[0]
+    return None
+
+
+def _record_stage(stage, elapsed, rows_in=None):
+    """Feed stage latency and throughput into the metrics registry"""
+    registry = MetricsRegistry()
+    registry.histogram('stage_duration_seconds', 'Wall time per pipeline stage', stage=stage).observe(elapsed)
+    if rows_in is not None:
+        registry.counter('rows_processed_total', 'Rows entering each pipeline stage', stage=stage).inc(rows_in)
+
 
 class Timer:
+    """Timing facade over Tracer spans; logs elapsed time on a monotonic clock"""
+    
     def __init__(self, name="Operation"):
         self.name = name
         self.start_time = None
-        self.logger = Logger().get_logger()
+        self.span = None
+        self.logger = Logger().get_logger(__name__)
     
     def __enter__(self):
-        self.start_time = time.time()
+        self.span = Tracer().span(self.name).__enter__()
+        self.start_time = time.perf_counter()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        elapsed = time.time() - self.start_time
-        self.logger.info(f"{self.name} completed in {elapsed:.4f} seconds")
+        elapsed = time.perf_counter() - self.start_time
+        self.span.__exit__(exc_type, exc_val, exc_tb)
+        _record_stage(self.name, elapsed)
+        self.logger.info("%s completed in %.4f seconds", self.name, elapsed)
     
     @staticmethod
     def measure(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            logger = Logger().get_logger()
-            start = time.time()
-            result = func(*args, **kwargs)
-            elapsed = time.time() - start
-            logger.debug(f"{func.__name__} executed in {elapsed:.4f} seconds")
+            logger = Logger().get_logger(func.__module__)
+            tracer = Tracer()
+            rows_in = next((n for n in map(_row_count, args) if n is not None), None)
+            start = time.perf_counter()
+            
+            if not tracer.enabled:
+                result = func(*args, **kwargs)
+            else:
+                with tracer.span(func.__qualname__) as span:
+                    result = func(*args, **kwargs)
+                    span.set_rows(rows_in, _row_count(result))
+            
+            elapsed = time.perf_counter() - start
+            _record_stage(func.__qualname__, elapsed, rows_in)
+            logger.info("%s executed in %.4f seconds", func.__qualname__, elapsed)
             return result
-        return wrapper
\ No newline at end of file
+        return wrapper
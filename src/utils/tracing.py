@@ -0,0 +1,221 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from utils.logger import Logger
+
+_current_span = ContextVar('current_span', default=None)
+
+
+class Span:
+    """
+    One timed region of a run (pipeline -> stage -> sub-step). CPU time is
+    the whole process's on the main thread, so a span covers the worker
+    threads it fans out to, and the span's own thread's elsewhere, so
+    concurrent spans on pool threads do not each count all threads' CPU.
+    """
+
+    def __init__(self, tracer, name, parent, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.parent = parent
+        self.path = f"{parent.path}/{name}" if parent else name
+        self.depth = parent.depth + 1 if parent else 0
+        self.attrs = attrs
+        self.thread_id = threading.get_ident()
+        self.cpu_clock = 'process' if threading.current_thread() is threading.main_thread() else 'thread'
+        self.rows_in = None
+        self.rows_out = None
+        self.peak_bytes = None
+        self.start = None
+        self.wall = None
+        self.cpu = None
+        self._token = None
+        self._cpu_start = None
+        self._mem_start = 0
+        self._mem_peak = 0
+
+    def set_rows(self, rows_in=None, rows_out=None):
+        if rows_in is not None:
+            self.rows_in = rows_in
+        if rows_out is not None:
+            self.rows_out = rows_out
+
+    def _cpu_time(self):
+        return time.process_time() if self.cpu_clock == 'process' else time.thread_time()
+
+    def __enter__(self):
+        if self.tracer.memory:
+            self.tracer._fold_peak()
+            self._mem_start = tracemalloc.get_traced_memory()[0]
+            self._mem_peak = self._mem_start
+        self._token = _current_span.set(self)
+        self._cpu_start = self._cpu_time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.wall = time.perf_counter() - self.start
+        self.cpu = self._cpu_time() - self._cpu_start
+        if self.tracer.memory:
+            self.tracer._fold_peak()
+            self.peak_bytes = max(self._mem_peak - self._mem_start, 0)
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        _current_span.reset(self._token)
+        self.tracer._record(self)
+        return False
+
+
+class _NullSpan:
+    """Shared no-op span used when tracing is disabled"""
+
+    def set_rows(self, rows_in=None, rows_out=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Process-wide hierarchical span recorder with Chrome trace and summary export"""
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(Tracer, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self.logger = Logger().get_logger(__name__)
+        self.enabled = False
+        self.memory = False
+        self.output_dir = Path('./results/traces')
+        self.spans = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._initialized = True
+
+    def configure(self, config=None):
+        """Apply a `tracing` config section (enabled, memory, output_dir)"""
+        config = config or {}
+        self.enabled = config.get('enabled', False)
+        self.memory = self.enabled and config.get('memory', False)
+        self.output_dir = Path(config.get('output_dir', self.output_dir))
+        # tracemalloc peaks are process-wide, so spans running concurrently share them
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        return self
+
+    def reset(self):
+        """Drop recorded spans so a run's reports cover only that run, not earlier phases"""
+        with self._lock:
+            self.spans = []
+        self._origin = time.perf_counter()
+
+    def span(self, name, **attrs):
+        """Context manager for a child of the current span; no-op when disabled"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, _current_span.get(), attrs)
+
+    @staticmethod
+    def current_span():
+        return _current_span.get() or _NULL_SPAN
+
+    def _fold_peak(self):
+        """Attribute the allocation peak so far to every open span, then restart peak tracking"""
+        peak = tracemalloc.get_traced_memory()[1]
+        span = _current_span.get()
+        while span is not None:
+            span._mem_peak = max(span._mem_peak, peak)
+            span = span.parent
+        tracemalloc.reset_peak()
+
+    def _record(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def chrome_trace(self):
+        """Spans as Chrome trace-event JSON (load in chrome://tracing or Perfetto)"""
+        pid = os.getpid()
+        events = []
+        for span in sorted(self.spans, key=lambda s: s.start):
+            args = {'cpu_ms': round(span.cpu * 1000, 3), 'cpu_clock': span.cpu_clock, 'path': span.path}
+            if span.rows_in is not None:
+                args['rows_in'] = span.rows_in
+            if span.rows_out is not None:
+                args['rows_out'] = span.rows_out
+            if span.peak_bytes is not None:
+                args['peak_mb'] = round(span.peak_bytes / 1024 ** 2, 3)
+            args.update({k: str(v) for k, v in span.attrs.items()})
+            events.append({
+                'name': span.name,
+                'cat': 'stage',
+                'ph': 'X',
+                'ts': round((span.start - self._origin) * 1e6, 1),
+                'dur': round(span.wall * 1e6, 1),
+                'pid': pid,
+                'tid': span.thread_id,
+                'args': args
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def summary(self):
+        """Flat per-path table: calls, wall/CPU seconds (process CPU on the main thread, thread CPU elsewhere), rows and peak memory"""
+        import pandas as pd
+
+        rows = {}
+        for span in self.spans:
+            row = rows.setdefault(span.path, {
+                'path': span.path, 'depth': span.depth, 'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0,
+                'rows_in': None, 'rows_out': None, 'peak_mb': None, 'first_start': span.start
+            })
+            row['calls'] += 1
+            row['wall_s'] += span.wall
+            row['cpu_s'] += span.cpu
+            row['first_start'] = min(row['first_start'], span.start)
+            if span.rows_in is not None:
+                row['rows_in'] = (row['rows_in'] or 0) + span.rows_in
+            if span.rows_out is not None:
+                row['rows_out'] = (row['rows_out'] or 0) + span.rows_out
+            if span.peak_bytes is not None:
+                row['peak_mb'] = max(row['peak_mb'] or 0, span.peak_bytes / 1024 ** 2)
+
+        table = pd.DataFrame(sorted(rows.values(), key=lambda r: r['first_start']))
+        if table.empty:
+            return table
+        table = table.drop(columns=['first_start'])
+        total = table.loc[table['depth'] == 0, 'wall_s'].sum()
+        table['wall_pct'] = (table['wall_s'] / total * 100).round(1) if total else None
+        return table.round({'wall_s': 4, 'cpu_s': 4, 'peak_mb': 3})
+
+    def write_reports(self, run_name):
+        """Write <run>_<timestamp>.trace.json and _summary.csv; returns the summary table"""
+        if not self.enabled or not self.spans:
+            return None
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{run_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        trace_path = self.output_dir / f"{stem}.trace.json"
+        with open(trace_path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+
+        summary = self.summary()
+        summary.to_csv(self.output_dir / f"{stem}_summary.csv", index=False)
+        self.logger.info(f"Trace written to {trace_path}\n{summary.to_string(index=False)}")
+        return summary